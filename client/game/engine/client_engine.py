@@ -7,11 +7,10 @@ from client.game.handlers.movement_handler import MovementHandler
 from client.game.handlers.system_handler import SystemHandler
 from client.game.handlers.world_state_handler import WorldStateHandler
 from client.game.systems.chat_system import ChatSystem
-from shared.protocol import decode_message
 from shared.protocol import (PACKET_POSITION_UPDATE, PACKET_AUTH_SUCCESS, PACKET_REGISTER, PACKET_AUTH, 
                              PACKET_REGISTER_SUCCESS, PACKET_REGISTER_FAIL, PACKET_AUTH_FAIL, PACKET_CHAT_MESSAGE, PACKET_SYSTEM_MESSAGE, 
-                             PACKET_ENTITY_NEW, PACKET_ENTITY_UPDATE, PACKET_ENTITY_REMOVE, PACKET_WORLD_STATE, PACKET_MAP_DATA, 
-                             PACKET_HEALTH_UPDATE, PACKET_DAMAGE, PACKET_EVOLVE, PACKET_MOVE, PACKET_ITEM_USE)
+                             PACKET_ENTITY_NEW, PACKET_ENTITY_UPDATE, PACKET_ENTITY_REMOVE, PACKET_ENTITY_BATCH, PACKET_WORLD_STATE, PACKET_MAP_DATA, 
+                             PACKET_HEALTH_UPDATE, PACKET_DAMAGE, PACKET_EVOLVE, PACKET_MOVE, PACKET_MOVE_ACK, PACKET_ITEM_USE)
 from shared.logger import get_logger
 logger = get_logger(__name__)
 
@@ -23,7 +22,9 @@ class ClientEngine:
             PACKET_ENTITY_NEW: EntityHandler(client),
             PACKET_ENTITY_UPDATE: EntityHandler(client),
             PACKET_ENTITY_REMOVE: EntityHandler(client),
+            PACKET_ENTITY_BATCH: EntityHandler(client),
             PACKET_POSITION_UPDATE: MovementHandler(client),
+            PACKET_MOVE_ACK: MovementHandler(client),
             PACKET_HEALTH_UPDATE: HealthHandler(client),
             PACKET_DAMAGE: DamageHandler(client),
             PACKET_EVOLVE: EvolveHandler(client),
@@ -43,8 +44,9 @@ class ClientEngine:
 
     async def process_incoming_packets(self):
         while True:
-            raw = await self.client.reader.readuntil(b"\n")
-            packet = decode_message(raw)
+            packet = await self.client.receive_message()
+            if packet is None:
+                break
 
             handler = self.handlers.get(packet["type"])
             if handler:
@@ -8,11 +8,24 @@ from .base_handler import BaseHandler
 from shared.logger import get_logger
 logger = get_logger(__name__)
 
+SCOPE_LABELS = {"zone": "Zone", "party": "Party", "global": "Global"}
+
+def chat_label(packet: dict, local_username: str | None) -> str:
+    """Nome exibido no chat, com o escopo (say não tem prefixo)."""
+    sender = packet.get("sender", "???")
+    scope = packet.get("scope")
+    if scope == "whisper":
+        if sender == local_username:
+            return f"[To {packet.get('to', '???')}]"
+        return f"[From {sender}]"
+    label = SCOPE_LABELS.get(scope)
+    return f"[{label}] {sender}" if label else sender
+
 class ChatHandler(BaseHandler):
 
     async def handle(self, packet):
         if packet["type"] == PACKET_CHAT_MESSAGE:
-            sender = packet.get("sender", "???")
+            sender = chat_label(packet, getattr(self.client, "username", None))
             content = packet.get("content", "")
             logger.info(f"[CHAT] {sender}: {content}")
             self.client.renderer.chat_ui.add_message(sender, content)
@@ -1,4 +1,5 @@
 from shared.protocol import (
+    PACKET_ENTITY_BATCH,
     PACKET_ENTITY_NEW,
     PACKET_ENTITY_UPDATE,
     PACKET_ENTITY_REMOVE,
@@ -21,6 +22,10 @@ class EntityHandler(BaseHandler):
                 self.client.world_state.update_entity(ent)
             return
 
+        if ptype == PACKET_ENTITY_BATCH:
+            self.client.world_state.apply_entity_batch(packet)
+            return
+
         if ptype in (PACKET_ENTITY_NEW, PACKET_ENTITY_UPDATE):
             self.client.world_state.update_entity(packet)
 
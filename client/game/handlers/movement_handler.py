@@ -1,4 +1,4 @@
-from shared.protocol import PACKET_POSITION_UPDATE
+from shared.protocol import PACKET_MOVE_ACK, PACKET_POSITION_UPDATE
 from .base_handler import BaseHandler
 
 class MovementHandler(BaseHandler):
@@ -8,3 +8,5 @@ class MovementHandler(BaseHandler):
     async def handle(self, packet):
         if packet["type"] == PACKET_POSITION_UPDATE:
             self.client.world_state.update_entity(packet)
+        elif packet["type"] == PACKET_MOVE_ACK:
+            self.client.world_state.reconcile(packet)
@@ -116,7 +116,9 @@ class WorldRenderer:
             self.camera.update({"x": player.get("x_visual", player["x"]), 
                                 "y": player.get("y_visual", player["y"])}, self.dt)
             
-        # --- 3. Desenho e Interpolação de Entidades (Lerp) ---
+        # --- 3. Desenho e Interpolação de Entidades ---
+        # Remotas: buffer de snapshots com atraso fixo (ClientWorldState)
+        self.world.interpolate_remote_entities()
         for ent in self.world.get_all_entities():
             
             # 3a. Inicializa a posição visual se for a primeira vez
@@ -124,11 +126,13 @@ class WorldRenderer:
                 ent["x_visual"] = ent["x"]
                 ent["y_visual"] = ent["y"]
             
-            move_speed = ent.get("movement_speed", 1.0)
-            lerp_factor = min(1.0, move_speed * SMOOTHING_FACTOR * self.dt)
-            
-            ent["x_visual"] += (ent["x"] - ent["x_visual"]) * lerp_factor
-            ent["y_visual"] += (ent["y"] - ent["y_visual"]) * lerp_factor
+            if ent["id"] == self.world.local_player_id:
+                # Jogador local (predição): lerp suaviza as correções do MOVE_ACK
+                move_speed = ent.get("movement_speed", 1.0)
+                lerp_factor = min(1.0, move_speed * SMOOTHING_FACTOR * self.dt)
+                
+                ent["x_visual"] += (ent["x"] - ent["x_visual"]) * lerp_factor
+                ent["y_visual"] += (ent["y"] - ent["y_visual"]) * lerp_factor
 
             x_center = ent["x_visual"] * SPRITE_SIZE
             y_center = ent["y_visual"] * SPRITE_SIZE
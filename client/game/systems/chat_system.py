@@ -3,6 +3,13 @@ from shared.protocol import (
     PACKET_SYSTEM_MESSAGE,
 )
 
+# Comandos tratados pelo servidor (escopos de chat e utilidades), enviados como digitados
+SERVER_COMMANDS = {
+    "/s", "/say", "/z", "/zone", "/p", "/party",
+    "/w", "/whisper", "/tell", "/g", "/global",
+    "/travel", "/stats",
+}
+
 class ChatSystem:
     def __init__(self, client, chat_ui, username):
         self.client = client
@@ -25,6 +32,14 @@ class ChatSystem:
         parts = message.split()
         cmd = parts[0].lower()
 
+        if cmd in SERVER_COMMANDS:
+            await self.client.send_message({
+                "type": PACKET_CHAT_MESSAGE,
+                "sender": self.username,
+                "content": message
+            })
+            return
+
         if cmd == "/evolve":
             target = parts[1] if len(parts) > 1 else ""
             await self.client.send_message({
@@ -1,9 +1,16 @@
 import time
-from shared.constants import PLAYER_ATTRS
+from collections import deque
+from shared.constants import INTERPOLATION_DELAY, PLAYER_ATTRS, REMOTE_UPDATE_INTERVAL
 from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
+SNAPSHOT_BUFFER_SIZE = 32
+# Saltos maiores que isso (respawn, teleporte) não são interpolados
+TELEPORT_DISTANCE = 5.0
+# Quanto o offset do relógio do servidor sobe por amostra mais lenta (deriva entre relógios)
+CLOCK_OFFSET_DRIFT = 0.01
+
 class ClientWorldState:
     def __init__(self):
         self.entities = {}
@@ -15,6 +22,13 @@ class ClientWorldState:
         self.tile_data = []  # 2D list
         self.tile_metadata = {}  # info de cada tile
 
+        # Predição do movimento local: inputs enviados e ainda não confirmados pelo servidor
+        self.move_seq = 0
+        self.pending_inputs = deque()  # (seq, dx, dy)
+
+        # Interpolação das entidades remotas: instante local ≈ "t" do servidor + offset
+        self.server_clock_offset = None
+
     def update_entity(self, entity_data: dict):
         entity_id = entity_data.get('id') or entity_data.get('entity_id')
         if not entity_id:
@@ -37,6 +51,9 @@ class ClientWorldState:
         if is_new:
             current_data['x_visual'] = current_data['x']
             current_data['y_visual'] = current_data['y']
+            current_data['snapshots'] = deque(maxlen=SNAPSHOT_BUFFER_SIZE)
+        if 'x' in entity_data and current_data['x'] is not None and entity_id != self.local_player_id:
+            self._push_snapshot(current_data, self._snapshot_time(entity_data))
         
         current_data['asset_type'] = entity_data.get('asset_type', current_data.get('asset_type'))
         current_data['last_update'] = time.time()
@@ -62,6 +79,65 @@ class ClientWorldState:
         #     logger.debug(f"[WORLD] Entity {entity_id} moved to ({current_data['x']:.1f}, {current_data['y']:.1f})")
             
         
+    def _snapshot_time(self, entity_data: dict) -> float:
+        """Instante local do snapshot: o "t" do servidor quando vem, senão a chegada."""
+        now = time.monotonic()
+        server_time = entity_data.get('t')
+        if server_time is None:
+            return now
+        offset = now - server_time
+        # O menor atraso visto é a melhor estimativa; sobe devagar para acompanhar deriva
+        if self.server_clock_offset is None or offset < self.server_clock_offset:
+            self.server_clock_offset = offset
+        else:
+            self.server_clock_offset += (offset - self.server_clock_offset) * CLOCK_OFFSET_DRIFT
+        return server_time + self.server_clock_offset
+
+    def _push_snapshot(self, entity: dict, t: float):
+        snapshots = entity['snapshots']
+        x, y = entity['x'], entity['y']
+        if snapshots:
+            last_t, last_x, last_y = snapshots[-1]
+            if t <= last_t:
+                t = last_t + 1e-6
+            if abs(x - last_x) > TELEPORT_DISTANCE or abs(y - last_y) > TELEPORT_DISTANCE:
+                snapshots.clear()
+                entity['x_visual'], entity['y_visual'] = x, y
+            elif t - last_t > 2 * REMOTE_UPDATE_INTERVAL:
+                # Estava parado: começa a andar um intervalo antes, não desde o último snapshot
+                snapshots.append((t - REMOTE_UPDATE_INTERVAL, last_x, last_y))
+        snapshots.append((t, x, y))
+
+    def interpolate_remote_entities(self, now: float | None = None):
+        """
+        Posiciona x_visual/y_visual das entidades remotas INTERPOLATION_DELAY no passado,
+        entre os dois snapshots que cercam esse instante. O jogador local fica de fora (predição).
+        """
+        render_time = (time.monotonic() if now is None else now) - INTERPOLATION_DELAY
+        for entity_id, entity in self.entities.items():
+            snapshots = entity.get('snapshots')
+            if entity_id == self.local_player_id or not snapshots:
+                continue
+            # Descarta o que ficou para trás, mantendo um snapshot antes do render_time
+            while len(snapshots) >= 2 and snapshots[1][0] <= render_time:
+                snapshots.popleft()
+            t0, x0, y0 = snapshots[0]
+            if len(snapshots) == 1 or render_time <= t0:
+                # Sem par para interpolar: fica no snapshot mais antigo (sem extrapolar)
+                entity['x_visual'], entity['y_visual'] = x0, y0
+                continue
+            t1, x1, y1 = snapshots[1]
+            alpha = (render_time - t0) / (t1 - t0)
+            entity['x_visual'] = x0 + (x1 - x0) * alpha
+            entity['y_visual'] = y0 + (y1 - y0) * alpha
+
+    def apply_entity_batch(self, packet: dict):
+        """ENTITY_BATCH: entradas e saídas de AOI de um tick do servidor."""
+        for entity_id in packet.get("leave", ()):
+            self.remove_entity(entity_id)
+        for entity_data in packet.get("enter", ()):
+            self.update_entity({**entity_data, "type": "ENTITY_NEW"})
+
     def remove_entity(self, entity_id: int):
         if entity_id in self.entities:
             del self.entities[entity_id]
@@ -80,7 +156,42 @@ class ClientWorldState:
             return None
         return self.entities.get(self.local_player_id)
     
+    def predict_move(self, move_packet: dict) -> dict:
+        """Numera o MOVE e já aplica o passo no jogador local, sem esperar o servidor."""
+        self.move_seq += 1
+        move_packet["seq"] = self.move_seq
+        self.pending_inputs.append((self.move_seq, move_packet["dx"], move_packet["dy"]))
+        player = self.get_local_player()
+        if player is not None:
+            self._apply_input(player, move_packet["dx"], move_packet["dy"])
+        return move_packet
+
+    def reconcile(self, ack: dict):
+        """
+        MOVE_ACK: parte da posição autoritativa e reaplica os inputs que o servidor
+        ainda não processou. Se a predição estava certa, nada muda na tela.
+        """
+        seq = ack.get("seq", 0)
+        while self.pending_inputs and self.pending_inputs[0][0] <= seq:
+            self.pending_inputs.popleft()
+        player = self.get_local_player()
+        if player is None:
+            return
+        player["x"], player["y"] = ack["x"], ack["y"]
+        for _, dx, dy in self.pending_inputs:
+            self._apply_input(player, dx, dy)
+
+    def _apply_input(self, player: dict, dx: float, dy: float):
+        new_x, new_y = player["x"] + dx, player["y"] + dy
+        # Só o tile de destino; a colisão completa fica no servidor e o ack corrige
+        if self.is_walkable(int(new_x), int(new_y)):
+            player["x"], player["y"] = new_x, new_y
+
     def set_map(self, map_packet: dict):
+        # Troca de mapa: as entidades do mapa anterior (e seus ids) não valem mais
+        self.entities.clear()
+        self.local_player_id = None
+        self.pending_inputs.clear()
         self.map_name = map_packet.get("map_name")
         self.map_width = map_packet.get("width", 0)
         self.map_height = map_packet.get("height", 0)
@@ -123,7 +123,8 @@ async def game_loop(client, client_engine, world_renderer, input_system):
                 move_packet = get_movement_packet(player_data)
                 
                 if move_packet:
-                    await client.send_message(move_packet)
+                    # Move na hora (predição); o MOVE_ACK do servidor corrige se preciso
+                    await client.send_message(client.world_state.predict_move(move_packet))
                 accumulator -= TICK_INTERVAL
 
         world_renderer.draw()
@@ -144,7 +145,7 @@ async def main():
     client = GameClient(IP, PORT, DATA_PAYLOAD_SIZE)
     await client.connect()
     
-    if not client.writer:
+    if not client.connection:
         logger.error("Failed to connect to server.")
         return
     
@@ -1,5 +1,6 @@
-import asyncio
-from shared.protocol import encode_message, decode_message
+from collections import deque
+from shared.framing import FrameTooLarge, open_framed_connection
+from shared.protocol import encode_message
 from shared.logger import get_logger
 from client.game.world_state import ClientWorldState
 
@@ -10,14 +11,14 @@ class GameClient:
         self.host = host
         self.port = port
         self.data_payload_size = data_payload_size
-        self.reader = None
-        self.writer = None
+        self.connection = None
+        self.pending_packets = deque()  # resto do último lote recebido
         self.world_state = ClientWorldState()
         self.is_closed = False
         
     async def connect(self):
         try:
-            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=self.data_payload_size)
+            self.connection = await open_framed_connection(self.host, self.port, self.data_payload_size)
             logger.info(f"Connected to server at {(self.host, self.port)}")
         except Exception as e:
             logger.error(f"Error connecting to server: {e}")
@@ -25,37 +26,30 @@ class GameClient:
     async def send_message(self, message):
         try:
             encoded_message = encode_message(message)
-            self.writer.write(encoded_message)
-            await self.writer.drain()
+            self.connection.write(encoded_message)
+            await self.connection.drain()
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             self.close()
             
     async def receive_message(self):
-        if not self.reader: return None
+        if not self.connection: return None
         try:
-            data = await self.reader.readuntil(b'\n') 
-            
-            if not data:
-                logger.info("Server closed the connection gracefully.")
-                self.close()
-                return None
-            
-            decoded_message = decode_message(data.strip())
-            return decoded_message
-            
-        except asyncio.LimitOverrunError as e:
+            while not self.pending_packets:
+                batch = await self.connection.read_batch()
+                if batch is None:
+                    logger.info("Server closed the connection gracefully.")
+                    self.close()
+                    return None
+                self.pending_packets.extend(batch[0])
+            return self.pending_packets.popleft()
             
+        except FrameTooLarge as e:
             logger.error(f"Error receiving message: Packet exceeded configured size limit ({self.data_payload_size} bytes).")
-            
-            try:
-                await self.reader.readuntil(b'\n')
-            except Exception:
-                pass
             self.close()
             return None
         
-        except (ConnectionResetError, asyncio.IncompleteReadError) as e:
+        except ConnectionResetError as e:
             logger.info("Connection closed by server (Expected disconnect after kick message).")
             self.close()
             return None
@@ -68,6 +62,6 @@ class GameClient:
     def close(self):
         if not self.is_closed:
             self.is_closed = True
-            if self.writer:
-                self.writer.close()
-            logger.info("Connection closed.")
\ No newline at end of file
+            if self.connection:
+                self.connection.close()
+            logger.info("Connection closed.")
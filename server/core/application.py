@@ -1,55 +1,222 @@
 import asyncio
+import multiprocessing
+import signal
 from server.db.database import init_db_pool
+from server.core import event_loop
 from shared.logger import get_logger
 
 logger = get_logger(__name__)
-from shared.constants import IP, PORT, DATA_PAYLOAD_SIZE
+from shared.constants import (
+    IP, PORT, DATA_PAYLOAD_SIZE, METRICS_ENABLED, METRICS_HOST, METRICS_PORT, SHARD_WORKERS, SHARD_MAPS,
+    SERVER_ROLE, GATEWAY_SOCKET, GATEWAY_PROCESSES, LOGIN_ACCEPTORS, LOGIN_HANDOFF_SOCKET, DB_BACKEND,
+)
 from server.network.server import ServerSocket
+from server.network.shard_router import ShardRouter
+from server.network.gateway import GatewayLink, GatewayServerSocket
+from server.network.gateway_hub import GatewayHub
+from server.network.login_acceptor import LoginAcceptor, SessionHandoffListener
+from server.core.metrics import metrics, MetricsServer
+from server.utils.metadata_registry import metadata_registry
 
 from server.game_engine.engine import GameEngine
         
+CHILD_JOIN_TIMEOUT = 5.0
+
 class Application:
-    def __init__(self):
+    def __init__(self, role: str = SERVER_ROLE, process_index: int | None = None):
         self.db_pool = None
         self.game_engine = None
         self.server_socket = None
+        self.gateway_hub = None
+        self.gateway_processes = []
+        self.login_listener = None
+        self.login_processes = []
+        self.metrics_server = None
         self.host = IP
         self.port = PORT
         self.data_payload_size = DATA_PAYLOAD_SIZE
+        if role == "standalone" and GATEWAY_PROCESSES > 0:
+            role = "simulation"
+        self.role = role
+        self.process_index = process_index
+        # Processos filhos locais (gateways ou logins) expõem métricas nas portas seguintes
+        self.metrics_port = METRICS_PORT if process_index is None else METRICS_PORT + 1 + process_index
         
     async def initialize(self):
         logger.info("Initializing Application...")
-        self.db_pool = await init_db_pool()
+        # Gateways e logins só usam a tabela de usuários: os dados de monstros ficam com a simulação
+        self.db_pool = await init_db_pool(load_seed_data=self.role not in ("gateway", "login"))
         if not self.db_pool:
             raise RuntimeError("Database pool is missing after initialization")
-        self.server_socket = ServerSocket(self.host, self.port, self.data_payload_size, self.db_pool, None)
-        self.game_engine = GameEngine(self.db_pool, self.server_socket)
-        self.server_socket.game_engine = self.game_engine
+
+        if self.role == "gateway":
+            # Atende e autentica clientes; a simulação roda em outro processo
+            self.server_socket = GatewayServerSocket(self.host, self.port, self.data_payload_size, self.db_pool, None, reuse_port=True)
+            self.game_engine = GatewayLink(GATEWAY_SOCKET, self.server_socket)
+            self.server_socket.game_engine = self.game_engine
+        elif self.role == "simulation":
+            self.gateway_hub = GatewayHub(GATEWAY_SOCKET)
+            self.game_engine = GameEngine(self.db_pool, self.gateway_hub)
+            self.gateway_hub.game_engine = self.game_engine
+            if SHARD_WORKERS > 0:
+                logger.warning("SHARD_WORKERS is ignored when running with gateways.")
+            if LOGIN_ACCEPTORS > 0:
+                logger.warning("LOGIN_ACCEPTORS is ignored when running with gateways; gateways already authenticate.")
+        elif self.role == "login":
+            # Só autentica; a sessão é entregue ao processo do jogo
+            self.server_socket = LoginAcceptor(self.host, self.port, self.data_payload_size, self.db_pool, LOGIN_HANDOFF_SOCKET)
+        elif self.role == "standalone":
+            self.server_socket = ServerSocket(self.host, self.port, self.data_payload_size, self.db_pool, None)
+            if SHARD_WORKERS > 0:
+                # Este processo só cuida dos sockets; os mapas rodam nos workers
+                self.game_engine = ShardRouter(self.db_pool, self.server_socket, SHARD_WORKERS, SHARD_MAPS)
+            else:
+                self.game_engine = GameEngine(self.db_pool, self.server_socket)
+            self.server_socket.game_engine = self.game_engine
+            if LOGIN_ACCEPTORS > 0:
+                self.login_listener = SessionHandoffListener(LOGIN_HANDOFF_SOCKET, self.server_socket)
+                if DB_BACKEND == "memory":
+                    logger.warning("LOGIN_ACCEPTORS with DB_BACKEND=memory: each acceptor has its own user store, "
+                                   "so accounts registered through one acceptor are unknown to the others and to "
+                                   "the game process. Use Postgres.")
+        else:
+            raise ValueError(f"Unknown SERVER_ROLE '{self.role}'. Use 'standalone', 'simulation', 'gateway' or 'login'.")
+        self._register_metrics()
 
         logger.info("Application initialized.")
         
+    def _register_metrics(self):
+        if self.role == "login":
+            metrics.gauge("mmo_login_queue_depth", "Connections waiting for authentication.",
+                          lambda: self.server_socket.pending_logins)
+            return
+        if self.server_socket is not None:
+            metrics.gauge("mmo_connected_clients", "Authenticated client connections.",
+                          lambda: len(self.server_socket.clients))
+            metrics.gauge("mmo_login_queue_depth", "Connections waiting for authentication.",
+                          lambda: self.server_socket.pending_logins)
+            metrics.gauge("mmo_send_queue_bytes", "Bytes buffered for sending, per connection.",
+                          self.server_socket.get_send_queue_depths, ("user",))
+        else:
+            metrics.gauge("mmo_connected_clients", "Clients in the game, across all gateways.",
+                          lambda: len(self.gateway_hub.clients))
+        if self.role != "gateway":
+            metrics.gauge("mmo_entities", "Entities in the world, by TypeComponent.entity_type.",
+                          self.game_engine.count_entities_by_type, ("entity_type",))
+
+    def _install_reload_handler(self):
+        # SIGHUP relê tilesets/mapas/classes sem reiniciar o servidor
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._reload_metadata)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            logger.warning("SIGHUP metadata reload is not supported on this platform.")
+
+    def _reload_metadata(self):
+        metadata_registry.reload()
+        if isinstance(self.game_engine, ShardRouter):
+            self.game_engine.reload_workers()
+
     async def start(self):
         await self.initialize()
+        self._install_reload_handler()
         
-        server_task = asyncio.create_task(self.server_socket.start())
-        engine_task = asyncio.create_task(self.game_engine.start())
+        tasks = []
+        if self.game_engine is not None:
+            tasks.append(asyncio.create_task(self.game_engine.start()))
+        if self.login_listener is not None:
+            # A porta fica com os processos de login
+            tasks.append(asyncio.create_task(self.login_listener.start()))
+            self._start_login_processes()
+        elif self.server_socket is not None:
+            tasks.append(asyncio.create_task(self.server_socket.start()))
+        if self.gateway_hub is not None:
+            tasks.append(asyncio.create_task(self.gateway_hub.start()))
+            self._start_gateway_processes()
+
+        if METRICS_ENABLED:
+            self.metrics_server = MetricsServer(METRICS_HOST, self.metrics_port)
+            tasks.append(asyncio.create_task(self.metrics_server.start()))
+
+        if self.role in ("gateway", "login"):
+            # Sem simulação/jogo não há o que servir: o fim do canal com ele encerra o processo
+            tasks[0].add_done_callback(lambda _: [task.cancel() for task in tasks[1:]])
         
-        await asyncio.gather(server_task, engine_task, return_exceptions=True)
+        await asyncio.gather(*tasks, return_exceptions=True)
         
     async def shutdown(self):
         logger.info("Shutting down Application...")
         shutdown_tasks = []
         if self.server_socket:
             shutdown_tasks.append(self.server_socket.shutdown())
+        if self.gateway_hub:
+            shutdown_tasks.append(self.gateway_hub.shutdown())
+        if self.login_listener:
+            shutdown_tasks.append(self.login_listener.shutdown())
         if self.game_engine:
             shutdown_tasks.append(self.game_engine.shutdown())
+        if self.metrics_server:
+            shutdown_tasks.append(self.metrics_server.shutdown())
         
         if shutdown_tasks:
             await asyncio.gather(*shutdown_tasks, return_exceptions=True)
         
+        # Gateways locais saem sozinhos quando o canal com a simulação fecha
+        loop = asyncio.get_running_loop()
+        for process in self.gateway_processes:
+            await loop.run_in_executor(None, process.join, CHILD_JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        # Logins não guardam estado: logins em andamento são descartados
+        for process in self.login_processes:
+            process.terminate()
+            await loop.run_in_executor(None, process.join, CHILD_JOIN_TIMEOUT)
+
         if self.db_pool:
             await self.db_pool.close()
             logger.info("Database connection pool closed.")
             
         logger.info("Application shutdown complete.")
-        
\ No newline at end of file
+
+    def _start_gateway_processes(self):
+        context = multiprocessing.get_context("spawn")
+        for index in range(GATEWAY_PROCESSES):
+            process = context.Process(target=run_gateway, args=(index,), name=f"gateway-{index}", daemon=True)
+            process.start()
+            self.gateway_processes.append(process)
+            logger.info(f"Started gateway {index} (pid {process.pid}).")
+
+    def _start_login_processes(self):
+        context = multiprocessing.get_context("spawn")
+        for index in range(LOGIN_ACCEPTORS):
+            process = context.Process(target=run_login_acceptor, args=(index,), name=f"login-{index}", daemon=True)
+            process.start()
+            self.login_processes.append(process)
+            logger.info(f"Started login acceptor {index} (pid {process.pid}).")
+
+def run_gateway(index: int):
+    """Ponto de entrada dos gateways locais (GATEWAY_PROCESSES)."""
+    # Ctrl+C chega a todo o grupo de processos; o gateway encerra quando a simulação fecha o canal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    async def main():
+        app = Application(role="gateway", process_index=index)
+        try:
+            await app.start()
+        finally:
+            await app.shutdown()
+
+    event_loop.run(main())
+
+def run_login_acceptor(index: int):
+    """Ponto de entrada dos processos de login (LOGIN_ACCEPTORS)."""
+    # Ctrl+C chega a todo o grupo de processos; quem encerra os logins é o processo do jogo
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    async def main():
+        app = Application(role="login", process_index=index)
+        try:
+            await app.start()
+        finally:
+            await app.shutdown()
+
+    event_loop.run(main())
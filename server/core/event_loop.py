@@ -0,0 +1,32 @@
+"""
+Escolha da implementação do event loop (EVENT_LOOP), feita antes de cada asyncio.run:
+no processo principal e nos processos filhos (workers, gateways, logins).
+"""
+import asyncio
+
+from shared.constants import EVENT_LOOP
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+def install_event_loop(name: str = EVENT_LOOP) -> str:
+    """Instala a policy do loop pedido e devolve o nome do que ficou em uso."""
+    if name in ("auto", "uvloop"):
+        try:
+            import uvloop
+        except ImportError:
+            if name == "uvloop":
+                logger.warning("EVENT_LOOP=uvloop but uvloop is not installed; using the default asyncio loop.")
+            return "asyncio"
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    if name != "asyncio":
+        logger.warning(f"Unknown EVENT_LOOP '{name}'; using the default asyncio loop.")
+    asyncio.set_event_loop_policy(None)
+    return "asyncio"
+
+def run(coro):
+    """asyncio.run com o loop escolhido em EVENT_LOOP."""
+    loop_name = install_event_loop()
+    logger.info(f"Using the {loop_name} event loop.")
+    return asyncio.run(coro)
@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _format_labels(labelnames: tuple, labelvalues: tuple, extra: dict | None = None) -> str:
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.extend(extra.items())
+    if not pairs:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return "{" + inner + "}"
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}  # {labelvalues: float}
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        if not self.labelnames and not self._values:
+            lines.append(f"{self.name} 0.0")
+        for labelvalues, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+class Gauge:
+    """
+    Gauge calculado no momento da coleta. A função retorna um número
+    (sem labels) ou um dict {labelvalues: valor}.
+    """
+    def __init__(self, name: str, help_text: str, func, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.func = func
+        self.labelnames = labelnames
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        try:
+            values = self.func()
+        except Exception as e:
+            logger.error(f"Error collecting gauge {self.name}: {e}")
+            return lines
+
+        if isinstance(values, dict):
+            for labelvalues, value in values.items():
+                if not isinstance(labelvalues, tuple):
+                    labelvalues = (labelvalues,)
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        elif values is not None:
+            lines.append(f"{self.name} {values}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # {labelvalues: [bucket_counts, sum, count]}
+
+    def observe(self, value: float, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = [[0] * len(self.buckets), 0.0, 0]
+            self._series[labelvalues] = series
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labelvalues, (bucket_counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, {"le": bound})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues, {"le": "+Inf"})
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, func, labelnames: tuple = ()) -> Gauge:
+        """Registra (ou substitui) um gauge calculado sob demanda."""
+        gauge = Gauge(name, help_text, func, labelnames)
+        self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+# --- Métricas de rede ---
+PACKETS_IN = metrics.counter("mmo_packets_in_total", "Packets received from clients, by packet type.", ("type",))
+PACKETS_OUT = metrics.counter("mmo_packets_out_total", "Packets sent to clients, by packet type.", ("type",))
+BYTES_IN = metrics.counter("mmo_bytes_in_total", "Bytes received from clients.")
+BYTES_OUT = metrics.counter("mmo_bytes_out_total", "Bytes sent to clients.")
+PACKETS_RATE_LIMITED = metrics.counter("mmo_packets_rate_limited_total", "Client packets dropped by the rate limiter, by packet type.", ("type",))
+MOVES_COALESCED = metrics.counter("mmo_moves_coalesced_total", "Relative MOVE packets merged into the previous one of the same batch.")
+FLOOD_DISCONNECTS = metrics.counter("mmo_flood_disconnects_total", "Connections closed for exceeding the rate limits.")
+
+# --- Métricas do game loop ---
+TICK_DURATION = metrics.histogram(
+    "mmo_tick_duration_seconds", "Time spent processing one game tick.",
+    buckets=(0.0005, 0.001, 0.002, 0.004, 0.008, 0.0166, 0.033, 0.05, 0.1, 0.25)
+)
+
+# --- Métricas do banco de dados ---
+DB_ACQUIRE_WAIT = metrics.histogram("mmo_db_pool_acquire_wait_seconds", "Time waiting for a connection from the DB pool.")
+DB_QUERY_LATENCY = metrics.histogram("mmo_db_query_duration_seconds", "DB query latency, by connection method.", ("method",))
+
+class MetricsServer:
+    """
+    Endpoint HTTP mínimo (apenas GET /metrics) no formato texto do Prometheus.
+    """
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = metrics):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_request, self.host, self.port)
+        logger.info(f"Metrics endpoint listening at http://{self.host}:{self.port}/metrics")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            # Descarta os headers até a linha em branco
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status = "200 OK"
+                body = self.registry.render().encode('utf-8')
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+                content_type = "text/plain; charset=utf-8"
+
+            header = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode('latin-1')
+            writer.write(header + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionResetError, OSError):
+            pass
+        except Exception as e:
+            logger.error(f"Error serving metrics request: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionResetError):
+                pass
+
+    async def shutdown(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            logger.info("Metrics endpoint stopped.")
@@ -0,0 +1,159 @@
+"""
+Processo worker do modo multi-processo (SHARD_WORKERS > 0).
+
+Cada worker roda um GameEngine restrito aos seus mapas. Os clientes continuam conectados
+ao processo de frente; aqui eles aparecem como RemoteWriter (um por conn_id), e o que
+o engine envia a cada um sai em lote no fim do tick. A persistência de jogadores fica na frente.
+"""
+import asyncio
+import json
+import signal
+
+from server.core import event_loop
+from server.db.database import init_db_pool
+from server.game_engine.engine import GameEngine
+from server.network.ipc import (
+    IpcChannel,
+    OP_CONNECT, OP_PACKET, OP_DISCONNECT, OP_TRANSFER_IN, OP_RELOAD,
+    OP_BROADCAST, OP_PLAYER_LEFT, OP_HANDOFF, OP_STATS, OP_WHISPER, NO_CONNECTION,
+)
+from server.network.remote import RemoteNetworkManager, RemoteWriter
+from server.utils.metadata_registry import metadata_registry
+from shared.constants import DB_BACKEND
+from shared.logger import get_logger
+from shared.protocol import decode_message
+
+logger = get_logger(__name__)
+
+STATS_INTERVAL = 1.0
+
+class WorkerNetworkManager(RemoteNetworkManager):
+    """Clientes do processo de frente, todos atrás de um único canal."""
+    def __init__(self, channel: IpcChannel):
+        super().__init__()
+        self.channel = channel
+        self.connections = {}       # {conn_id: RemoteWriter}
+
+    def attach_connection(self, conn_id: int, username: str) -> RemoteWriter:
+        writer = self.attach(conn_id, self.channel, username)
+        self.connections[conn_id] = writer
+        return writer
+
+    def detach_connection(self, conn_id: int) -> str | None:
+        writer = self.connections.pop(conn_id, None)
+        return self.detach(writer) if writer else None
+
+    async def _broadcast_encoded(self, payload: bytes, exclude_writer: RemoteWriter | None):
+        self.channel.send(OP_BROADCAST, self.exclude_conn_id(exclude_writer, self.channel), payload)
+        await self.channel.drain()
+
+class ShardWorkerEngine(GameEngine):
+    """GameEngine que devolve à frente o estado de quem sai ou troca de processo."""
+    def __init__(self, db_pool, network_manager: WorkerNetworkManager, hosted_maps):
+        super().__init__(db_pool, network_manager, hosted_maps=hosted_maps, handoff=self.handoff_player)
+        self.channel = network_manager.channel
+
+    async def save_player_state(self, username: str, state: dict):
+        writer = self.network_manager.logged_in_users.get(username)
+        conn_id = writer.conn_id if writer else NO_CONNECTION
+        self.channel.send_json(OP_PLAYER_LEFT, conn_id, {'username': username, 'state': state})
+        await self.channel.drain()
+
+    async def handoff_player(self, username: str, state: dict):
+        writer = self.network_manager.logged_in_users.get(username)
+        if writer is None:
+            return
+        self.network_manager.detach_connection(writer.conn_id)
+        self.channel.send_json(OP_HANDOFF, writer.conn_id, {'username': username, 'map_name': state['map_name'], 'state': state})
+        await self.channel.drain()
+
+    async def deliver_whisper(self, sender: str, target: str, packet: dict) -> bool | None:
+        if await super().deliver_whisper(sender, target, packet):
+            return True
+        # Destinatário em outro worker (ou offline): a frente entrega e ecoa, ou avisa quem mandou
+        writer = self.network_manager.logged_in_users.get(sender)
+        conn_id = writer.conn_id if writer else NO_CONNECTION
+        self.channel.send_json(OP_WHISPER, conn_id, {'target': target, 'packet': packet})
+        await self.channel.drain()
+        return None
+
+class ShardWorker:
+    def __init__(self, index: int, channel: IpcChannel, map_names: list, db_pool):
+        self.index = index
+        self.channel = channel
+        self.map_names = map_names
+        self.network_manager = WorkerNetworkManager(channel)
+        self.engine = ShardWorkerEngine(db_pool, self.network_manager, map_names)
+
+    async def run(self):
+        await self.engine.start()
+        stats_task = asyncio.create_task(self._report_stats())
+        logger.info(f"Shard worker {self.index} running maps: {', '.join(self.map_names)}")
+        try:
+            while True:
+                frame = await self.channel.recv()
+                if frame is None:
+                    break
+                try:
+                    await self._handle_frame(*frame)
+                except Exception as e:
+                    logger.error(f"Shard worker {self.index} failed to handle op {frame[0]}: {e}")
+        finally:
+            stats_task.cancel()
+            await self.engine.shutdown()
+        logger.info(f"Shard worker {self.index} stopped (front process closed the channel).")
+
+    async def _handle_frame(self, op: int, conn_id: int, payload: bytes):
+        if op == OP_PACKET:
+            writer = self.network_manager.connections.get(conn_id)
+            if writer is None:
+                # Pacote em trânsito de um jogador que já saiu deste worker
+                return
+            packet = decode_message(payload)
+            if isinstance(packet, dict):
+                await self.engine.process_network_packet(writer, packet)
+
+        elif op in (OP_CONNECT, OP_TRANSFER_IN):
+            data = json.loads(payload)
+            username = data['username']
+            writer = self.network_manager.attach_connection(conn_id, username)
+            player_data = data.get('player_data') if op == OP_CONNECT else data.get('state')
+            await self.engine.enter_world(writer, username, player_data)
+
+        elif op == OP_DISCONNECT:
+            writer = self.network_manager.connections.get(conn_id)
+            username = self.network_manager.get_user_by_writer(writer) if writer else None
+            if username is None:
+                return
+            # player_disconnected chama save_player_state (-> OP_PLAYER_LEFT) antes do detach
+            await self.engine.player_disconnected(username)
+            if username in self.network_manager.logged_in_users:
+                self.network_manager.detach_connection(conn_id)
+
+        elif op == OP_RELOAD:
+            metadata_registry.reload()
+
+        else:
+            logger.warning(f"Shard worker {self.index} received unknown op {op}.")
+
+    async def _report_stats(self):
+        while True:
+            counts = {key[0]: value for key, value in self.engine.count_entities_by_type().items()}
+            self.channel.send_json(OP_STATS, NO_CONNECTION, {'entities': counts})
+            await asyncio.sleep(STATS_INTERVAL)
+
+async def _worker_main(index: int, sock, map_names: list):
+    channel = await IpcChannel.open(sock)
+    # Os dados de monstros já foram carregados pela frente. No backend em memória cada
+    # processo tem o próprio armazenamento (sem corrida), então o worker carrega o seu.
+    db_pool = await init_db_pool(load_seed_data=DB_BACKEND == "memory")
+    try:
+        await ShardWorker(index, channel, map_names, db_pool).run()
+    finally:
+        await db_pool.close()
+
+def run_worker(index: int, sock, map_names: list):
+    """Ponto de entrada do multiprocessing.Process de cada worker."""
+    # Ctrl+C chega a todo o grupo de processos; quem encerra os workers é a frente
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    event_loop.run(_worker_main(index, sock, map_names))
@@ -1,15 +1,28 @@
 import asyncpg
-from shared.constants import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+from shared.constants import (
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT,
+    DB_BACKEND, DB_SIMULATED_LATENCY_MS, DB_SIMULATED_JITTER_MS, DB_SIMULATED_SEED
+)
 from shared.logger import get_logger
 from server.db.data_loader import load_monster_data
+from server.db.instrumented_pool import InstrumentedPool
+from server.db.memory_backend import MemoryPool
 logger = get_logger(__name__)
 
 db_pool = None
 
-async def init_db_pool():
-    global db_pool
-    try:
-        db_pool = await asyncpg.create_pool(
+async def create_backend_pool(backend: str = DB_BACKEND):
+    """Cria o pool do backend configurado. Todos expõem a mesma interface do pool do asyncpg."""
+    if backend == "memory":
+        logger.info(f"Using in-memory storage backend (latency {DB_SIMULATED_LATENCY_MS}ms ± {DB_SIMULATED_JITTER_MS}ms).")
+        return MemoryPool(
+            latency=DB_SIMULATED_LATENCY_MS / 1000.0,
+            jitter=DB_SIMULATED_JITTER_MS / 1000.0,
+            seed=DB_SIMULATED_SEED,
+            max_size=20
+        )
+    if backend == "postgres":
+        return await asyncpg.create_pool(
             user=DB_USER,
             password=DB_PASSWORD,
             database=DB_NAME,
@@ -18,10 +31,22 @@ async def init_db_pool():
             min_size=1,
             max_size=20
         )
+    raise ValueError(f"Unknown DB_BACKEND '{backend}'. Use 'postgres' or 'memory'.")
+
+async def init_db_pool(load_seed_data: bool = True):
+    """
+    Cria o pool e garante as tabelas. `load_seed_data` recria monster_templates/spawn_zones a
+    partir do JSON (DELETE + INSERT, sem transação): só o processo pai deve fazer isso, senão
+    um processo filho pode ler spawn_zones no meio da recarga de outro.
+    """
+    global db_pool
+    try:
+        db_pool = InstrumentedPool(await create_backend_pool())
         logger.info("Database connection pool created successfully.")
         await create_user_table()
-        await create_monster_tables()
-        await load_monster_data(db_pool)
+        if load_seed_data:
+            await create_monster_tables()
+            await load_monster_data(db_pool)
         return db_pool
     except Exception as e:
         logger.error(f"Error creating database connection pool: {e}")
@@ -70,6 +95,7 @@ async def create_user_table():
             await connection.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS intelligence INTEGER DEFAULT 1;")
             await connection.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS dexterity INTEGER DEFAULT 1;")
             await connection.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS luck INTEGER DEFAULT 1;")
+            await connection.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS map_name TEXT DEFAULT NULL;")
             
             logger.info("User table and player stats ensured in database.")
         except Exception as e:
@@ -0,0 +1,68 @@
+import time
+from server.core.metrics import DB_ACQUIRE_WAIT, DB_QUERY_LATENCY
+
+class InstrumentedConnection:
+    """
+    Envolve uma conexão do pool medindo a latência de cada query.
+    Métodos não instrumentados são repassados para a conexão original.
+    """
+    def __init__(self, connection):
+        self._connection = connection
+
+    async def _timed(self, method: str, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await getattr(self._connection, method)(*args, **kwargs)
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - start, method)
+
+    async def execute(self, *args, **kwargs):
+        return await self._timed('execute', *args, **kwargs)
+
+    async def executemany(self, *args, **kwargs):
+        return await self._timed('executemany', *args, **kwargs)
+
+    async def fetch(self, *args, **kwargs):
+        return await self._timed('fetch', *args, **kwargs)
+
+    async def fetchrow(self, *args, **kwargs):
+        return await self._timed('fetchrow', *args, **kwargs)
+
+    async def fetchval(self, *args, **kwargs):
+        return await self._timed('fetchval', *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+class _InstrumentedAcquireContext:
+    def __init__(self, pool):
+        self._pool = pool
+        self._context = None
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        self._context = self._pool.acquire()
+        connection = await self._context.__aenter__()
+        DB_ACQUIRE_WAIT.observe(time.perf_counter() - start)
+        return InstrumentedConnection(connection)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._context.__aexit__(exc_type, exc, tb)
+
+class InstrumentedPool:
+    """
+    Wrapper sobre o pool do asyncpg que expõe a mesma interface usada em server/db/*
+    (acquire() como context manager assíncrono e close()), registrando o tempo de espera
+    por conexão e a latência das queries.
+    """
+    def __init__(self, pool):
+        self._pool = pool
+
+    def acquire(self):
+        return _InstrumentedAcquireContext(self._pool)
+
+    async def close(self):
+        await self._pool.close()
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
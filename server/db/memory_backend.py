@@ -0,0 +1,243 @@
+# server/db/memory_backend.py
+"""
+Backend de armazenamento em memória com a mesma superfície de queries do pool do asyncpg
+usada em server/db/* (acquire() como context manager, execute/executemany/fetch/fetchrow,
+close()). Permite rodar o servidor completo, load tests e benchmarks sem Postgres.
+
+Só é suportado o subconjunto de SQL que o próprio servidor emite:
+  CREATE TABLE / ALTER TABLE (ignorados),
+  INSERT INTO t (cols) VALUES ($n, ...) [ON CONFLICT (col) DO UPDATE SET ... | DO NOTHING],
+  SELECT cols FROM t WHERE col = $n,
+  UPDATE t SET col = $n, ... WHERE col = $n,
+  DELETE FROM t [WHERE col = $n],
+  e o JOIN de spawn_zones com monster_templates usado em npcs.py.
+
+A latência simulada (fixa + jitter com seed) é aplicada em cada query, e o tamanho
+máximo do pool é respeitado, então contenção de conexões também pode ser estudada.
+"""
+import asyncio
+import random
+import re
+
+import asyncpg
+
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Colunas com valor padrão (espelham os CREATE TABLE de database.py)
+TABLE_DEFAULTS = {
+    "users": {
+        "class_name": "Novice", "level": 1, "xp": 0, "experience": 0, "stat_points": 0,
+        "current_health": None, "strength": 1, "agility": 1, "vitality": 1,
+        "intelligence": 1, "dexterity": 1, "luck": 1, "pos_x": 10.0, "pos_y": 10.0, "map_name": None,
+    },
+    "monster_templates": {"type": "monster"},
+    "spawn_zones": {"max_mobs_in_zone": 1, "respawn_time_seconds": 30},
+}
+
+# Colunas com restrição UNIQUE (além do id serial)
+TABLE_UNIQUE_KEYS = {
+    "users": ("username",),
+    "monster_templates": ("asset_type",),
+    "spawn_zones": ("zone_name", "monster_asset_type"),
+}
+
+_INSERT_RE = re.compile(
+    r"^INSERT INTO (\w+) \(([^)]*)\) VALUES \(([^)]*)\)(?: ON CONFLICT \(([^)]*)\) DO (UPDATE|NOTHING).*)?$",
+    re.IGNORECASE,
+)
+_SELECT_RE = re.compile(r"^SELECT (.+?) FROM (\w+) WHERE (\w+) = \$(\d+)$", re.IGNORECASE)
+_UPDATE_RE = re.compile(r"^UPDATE (\w+) SET (.+) WHERE (\w+) = \$(\d+)$", re.IGNORECASE)
+_DELETE_RE = re.compile(r"^DELETE FROM (\w+)(?: WHERE (\w+) = \$(\d+))?$", re.IGNORECASE)
+_SPAWN_JOIN_RE = re.compile(
+    r"FROM spawn_zones z JOIN monster_templates t ON z\.monster_asset_type = t\.asset_type(?: WHERE z\.map_name = \$(\d+))?$",
+    re.IGNORECASE,
+)
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split()).rstrip(";").strip()
+
+def _param(args: tuple, placeholder: str):
+    return args[int(placeholder.strip().lstrip("$")) - 1]
+
+class MemoryStore:
+    """Tabelas em memória: {nome_tabela: [linha(dict), ...]}."""
+    def __init__(self):
+        self.tables = {name: [] for name in TABLE_DEFAULTS}
+        self._next_id = {name: 1 for name in TABLE_DEFAULTS}
+
+    def rows(self, table: str) -> list:
+        return self.tables.setdefault(table, [])
+
+    def insert(self, table: str, values: dict, conflict_key: tuple | None = None, conflict_action: str | None = None):
+        rows = self.rows(table)
+        unique_keys = TABLE_UNIQUE_KEYS.get(table)
+        existing = None
+        if unique_keys and all(k in values for k in unique_keys):
+            existing = next((r for r in rows if all(r.get(k) == values[k] for k in unique_keys)), None)
+
+        if existing is not None:
+            if conflict_action == "UPDATE":
+                existing.update(values)
+                return
+            if conflict_action == "NOTHING":
+                return
+            raise asyncpg.UniqueViolationError(
+                f'duplicate key value violates unique constraint on "{table}" ({", ".join(unique_keys)})'
+            )
+
+        row = dict(TABLE_DEFAULTS.get(table, {}))
+        row["id"] = self._next_id.get(table, 1)
+        self._next_id[table] = row["id"] + 1
+        row.update(values)
+        rows.append(row)
+
+class MemoryConnection:
+    def __init__(self, pool: "MemoryPool"):
+        self._pool = pool
+        self._store = pool.store
+
+    async def _simulate_latency(self):
+        delay = self._pool.next_latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _run(self, query: str, args: tuple):
+        sql = _normalize(query)
+        keyword = sql.split(" ", 1)[0].upper()
+
+        if keyword in ("CREATE", "ALTER"):
+            return f"{keyword} TABLE", []
+
+        if keyword == "INSERT":
+            match = _INSERT_RE.match(sql)
+            if match:
+                table, columns, placeholders, conflict_cols, action = match.groups()
+                columns = [c.strip() for c in columns.split(",")]
+                values = {col: _param(args, ph) for col, ph in zip(columns, placeholders.split(","))}
+                conflict_key = tuple(c.strip() for c in conflict_cols.split(",")) if conflict_cols else None
+                self._store.insert(table, values, conflict_key, action.upper() if action else None)
+                return "INSERT 0 1", []
+
+        elif keyword == "SELECT":
+            join = _SPAWN_JOIN_RE.search(sql)
+            if join:
+                return "SELECT", self._select_spawns(_param(args, join.group(1)) if join.group(1) else None)
+            match = _SELECT_RE.match(sql)
+            if match:
+                columns, table, key, placeholder = match.groups()
+                columns = [c.strip() for c in columns.split(",")]
+                value = _param(args, placeholder)
+                rows = [r for r in self._store.rows(table) if r.get(key) == value]
+                return "SELECT", [{c: r.get(c) for c in columns} for r in rows]
+
+        elif keyword == "UPDATE":
+            match = _UPDATE_RE.match(sql)
+            if match:
+                table, assignments, key, placeholder = match.groups()
+                updates = {}
+                for assignment in assignments.split(","):
+                    column, ph = assignment.split("=")
+                    updates[column.strip()] = _param(args, ph)
+                value = _param(args, placeholder)
+                count = 0
+                for row in self._store.rows(table):
+                    if row.get(key) == value:
+                        row.update(updates)
+                        count += 1
+                return f"UPDATE {count}", []
+
+        elif keyword == "DELETE":
+            match = _DELETE_RE.match(sql)
+            if match:
+                table, key, placeholder = match.groups()
+                rows = self._store.rows(table)
+                if key:
+                    value = _param(args, placeholder)
+                    kept = [r for r in rows if r.get(key) != value]
+                else:
+                    kept = []
+                count = len(rows) - len(kept)
+                self._store.tables[table] = kept
+                return f"DELETE {count}", []
+
+        raise NotImplementedError(f"Memory backend does not support query: {sql}")
+
+    def _select_spawns(self, map_name: str | None) -> list:
+        templates = {t["asset_type"]: t for t in self._store.rows("monster_templates")}
+        records = []
+        for zone in self._store.rows("spawn_zones"):
+            if map_name is not None and zone.get("map_name") != map_name:
+                continue
+            template = templates.get(zone["monster_asset_type"])
+            if template is None:
+                continue
+            records.append({
+                "zone_name": zone["zone_name"], "map_name": zone["map_name"],
+                "min_x": zone["min_x"], "max_x": zone["max_x"],
+                "min_y": zone["min_y"], "max_y": zone["max_y"],
+                "max_mobs_in_zone": zone["max_mobs_in_zone"],
+                "asset_type": template["asset_type"], "level": template["level"],
+                "base_health": template["base_health"], "strength": template["strength"],
+                "vitality": template["vitality"],
+            })
+        return records
+
+    async def execute(self, query: str, *args):
+        await self._simulate_latency()
+        status, _ = self._run(query, args)
+        return status
+
+    async def executemany(self, query: str, args_list):
+        await self._simulate_latency()
+        for args in args_list:
+            self._run(query, tuple(args))
+
+    async def fetch(self, query: str, *args):
+        await self._simulate_latency()
+        _, rows = self._run(query, args)
+        return rows
+
+    async def fetchrow(self, query: str, *args):
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args, column: int = 0):
+        row = await self.fetchrow(query, *args)
+        return list(row.values())[column] if row else None
+
+class _MemoryAcquireContext:
+    def __init__(self, pool: "MemoryPool"):
+        self._pool = pool
+
+    async def __aenter__(self):
+        await self._pool._slots.acquire()
+        return MemoryConnection(self._pool)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._pool._slots.release()
+        return False
+
+class MemoryPool:
+    """
+    Pool em memória. `latency` e `jitter` em segundos; o jitter é uniforme em
+    [-jitter, +jitter] e gerado por um RNG com seed, para resultados reproduzíveis.
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0, max_size: int = 20, store: MemoryStore | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.store = store or MemoryStore()
+        self._rng = random.Random(seed)
+        self._slots = asyncio.Semaphore(max_size)
+
+    def next_latency(self) -> float:
+        if self.jitter:
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        return self.latency
+
+    def acquire(self):
+        return _MemoryAcquireContext(self)
+
+    async def close(self):
+        logger.info("Memory storage backend closed.")
@@ -10,10 +10,10 @@ logger = get_logger(__name__)
 # Para simplificar e seguir o padrão de injeção de dependência que você usa em outros lugares,
 # vamos fazer a função aceitar o db_pool.
 
-async def get_initial_spawns(db_pool: asyncpg.pool.Pool):
+async def get_initial_spawns(db_pool: asyncpg.pool.Pool, map_name: str | None = None):
     """
-    Busca todas as zonas de spawn do banco de dados, calcula posições aleatórias
-    dentro da zona e retorna uma lista de monstros para o WorldInitializer.
+    Busca as zonas de spawn do banco de dados (todas, ou só as de `map_name`), calcula
+    posições aleatórias dentro da zona e retorna uma lista de monstros para o WorldInitializer.
     """
     if db_pool is None:
         logger.error("Database pool is not initialized.")
@@ -25,12 +25,16 @@ async def get_initial_spawns(db_pool: asyncpg.pool.Pool):
         z.zone_name, z.min_x, z.max_x, z.min_y, z.max_y, z.max_mobs_in_zone,
         t.asset_type, t.level, t.base_health, t.strength, t.vitality
     FROM spawn_zones z
-    JOIN monster_templates t ON z.monster_asset_type = t.asset_type;
+    JOIN monster_templates t ON z.monster_asset_type = t.asset_type
     """
+    args = ()
+    if map_name is not None:
+        query += " WHERE z.map_name = $1"
+        args = (map_name,)
     
     async with db_pool.acquire() as connection:
         try:
-            records = await connection.fetch(query)
+            records = await connection.fetch(query, *args)
             
             spawn_data_list = []
             
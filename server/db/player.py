@@ -22,7 +22,8 @@ async def update_player_data(db_pool, username: str,
                              class_name: str,
                              level: int, experience: int,
                              strength: int, agility: int, vitality: int, 
-                             intelligence: int, dexterity: int, luck: int):
+                             intelligence: int, dexterity: int, luck: int,
+                             map_name: str):
     
     if db_pool is None:
         logger.error("Database pool is not initialized.")
@@ -42,8 +43,9 @@ async def update_player_data(db_pool, username: str,
         intelligence = $10,
         dexterity = $11,
         luck = $12,
-        stat_points = $13
-    WHERE username = $14;
+        stat_points = $13,
+        map_name = $14
+    WHERE username = $15;
     """
     async with db_pool.acquire() as connection:
         await connection.execute(query, 
@@ -53,6 +55,7 @@ async def update_player_data(db_pool, username: str,
                                  level, experience, 
                                  strength, agility, vitality, 
                                  intelligence, dexterity, luck, stat_points,
+                                 map_name,
                                  username)
 
 async def get_player_data(db_pool, username: str):
@@ -66,7 +69,7 @@ async def get_player_data(db_pool, username: str):
            current_health,
            strength, agility, vitality, 
            intelligence, dexterity, luck,
-           class_name 
+           class_name, map_name
     FROM users
     WHERE username = $1;
     """
@@ -86,6 +89,7 @@ async def get_player_data(db_pool, username: str):
                 'intelligence': record['intelligence'],
                 'dexterity': record['dexterity'],
                 'luck': record['luck'],
-                'class_name': record['class_name']
+                'class_name': record['class_name'],
+                'map_name': record['map_name']
             }
         return None
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Behavior trees da IA, definidos em dados (bloco "behaviors" de monster_templates.json).
+
+Cada definição é compilada uma vez num BehaviorTree imutável, compartilhado por todos os
+monstros do template: os nós ficam em pré-ordem em tuplas paralelas (tipo, fim da subárvore,
+folha, parâmetros) e a avaliação anda pelos índices, sem criar listas, dicts, iteradores ou
+closures por monstro. O estado de cada monstro fica no blackboard (AIComponent).
+
+Formato de um nó:
+    {"selector": [nós...]}   primeiro filho que não falha
+    {"sequence": [nós...]}   todos os filhos, até o primeiro que não tem sucesso
+    {"invert": nó}           troca SUCCESS e FAILURE
+    {"condition": "nome", ...parâmetros} / {"action": "nome", ...parâmetros}
+        folhas registradas em `leaves`: fn(context, entity_id, pos_comp, blackboard, params) -> status
+"""
+from types import MappingProxyType
+
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUCCESS, FAILURE, RUNNING = 0, 1, 2
+
+LEAF, SELECTOR, SEQUENCE, INVERT = 0, 1, 2, 3
+COMPOSITES = {"selector": SELECTOR, "sequence": SEQUENCE}
+LEAF_KEYS = ("condition", "action")
+
+class BehaviorTreeError(ValueError):
+    pass
+
+class BehaviorTree:
+    __slots__ = ('name', 'kinds', 'ends', 'leaves', 'params')
+
+    def __init__(self, name: str, kinds: tuple, ends: tuple, leaves: tuple, params: tuple):
+        self.name = name
+        self.kinds = kinds      # tipo de cada nó
+        self.ends = ends        # índice logo depois da subárvore de cada nó
+        self.leaves = leaves    # função da folha (None nos compostos)
+        self.params = params    # parâmetros da folha, somente leitura
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'params'):
+            raise AttributeError("BehaviorTree is immutable")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f"BehaviorTree({self.name!r}, {len(self.kinds)} nodes)"
+
+    def tick(self, context, entity_id: int, pos_comp, blackboard) -> int:
+        return self._tick(0, context, entity_id, pos_comp, blackboard)
+
+    def tick_batch(self, context, batch: 'BehaviorBatch'):
+        """Avalia a árvore para cada monstro do lote (todos deste template)."""
+        tick = self._tick
+        entity_ids, positions, blackboards = batch.entity_ids, batch.positions, batch.blackboards
+        index, count = 0, batch.count
+        while index < count:
+            tick(0, context, entity_ids[index], positions[index], blackboards[index])
+            index += 1
+
+    def _tick(self, node: int, context, entity_id: int, pos_comp, blackboard) -> int:
+        kind = self.kinds[node]
+        if kind == LEAF:
+            return self.leaves[node](context, entity_id, pos_comp, blackboard, self.params[node])
+
+        child = node + 1
+        if kind == INVERT:
+            status = self._tick(child, context, entity_id, pos_comp, blackboard)
+            return SUCCESS if status == FAILURE else FAILURE if status == SUCCESS else status
+
+        end, ends = self.ends[node], self.ends
+        # Selector continua enquanto os filhos falham; sequence, enquanto têm sucesso
+        keep_going = FAILURE if kind == SELECTOR else SUCCESS
+        while child < end:
+            status = self._tick(child, context, entity_id, pos_comp, blackboard)
+            if status != keep_going:
+                return status
+            child = ends[child]
+        return keep_going
+
+class BehaviorBatch:
+    """Monstros de uma mesma árvore a avaliar neste tick; as listas são reaproveitadas entre ticks."""
+    __slots__ = ('tree', 'entity_ids', 'positions', 'blackboards', 'count')
+
+    def __init__(self, tree: BehaviorTree):
+        self.tree = tree
+        self.entity_ids = []
+        self.positions = []
+        self.blackboards = []
+        self.count = 0
+
+    def add(self, entity_id: int, pos_comp, blackboard):
+        index = self.count
+        if index < len(self.entity_ids):
+            self.entity_ids[index] = entity_id
+            self.positions[index] = pos_comp
+            self.blackboards[index] = blackboard
+        else:
+            self.entity_ids.append(entity_id)
+            self.positions.append(pos_comp)
+            self.blackboards.append(blackboard)
+        self.count = index + 1
+
+    def reset(self):
+        self.count = 0
+
+def compile_tree(name: str, definition: dict, leaves: dict) -> BehaviorTree:
+    """Compila uma definição (formato acima) usando as folhas registradas em `leaves`."""
+    kinds, ends, leaf_fns, params = [], [], [], []
+
+    def visit(node, path):
+        if not isinstance(node, dict) or not node:
+            raise BehaviorTreeError(f"{name}: invalid node at {path}: {node!r}")
+        index = len(kinds)
+        kinds.append(None)
+        ends.append(None)
+        leaf_fns.append(None)
+        params.append(None)
+
+        composite = [key for key in node if key in COMPOSITES]
+        if composite:
+            key = composite[0]
+            children = node[key]
+            if not isinstance(children, list) or not children:
+                raise BehaviorTreeError(f"{name}: '{key}' at {path} needs a non-empty list of children.")
+            kinds[index] = COMPOSITES[key]
+            for position, child in enumerate(children):
+                visit(child, f"{path}.{key}[{position}]")
+        elif "invert" in node:
+            kinds[index] = INVERT
+            visit(node["invert"], f"{path}.invert")
+        else:
+            leaf_key = next((key for key in LEAF_KEYS if key in node), None)
+            if leaf_key is None:
+                raise BehaviorTreeError(f"{name}: unknown node at {path}: {node!r}")
+            leaf_name = node[leaf_key]
+            if leaf_name not in leaves:
+                raise BehaviorTreeError(f"{name}: unknown {leaf_key} '{leaf_name}' at {path}.")
+            kinds[index] = LEAF
+            leaf_fns[index] = leaves[leaf_name]
+            params[index] = MappingProxyType({key: value for key, value in node.items() if key != leaf_key})
+        ends[index] = len(kinds)
+
+    visit(definition, name)
+    return BehaviorTree(name, tuple(kinds), tuple(ends), tuple(leaf_fns), tuple(params))
@@ -0,0 +1,231 @@
+"""
+Canais de chat. Texto sem comando vai para CHAT_DEFAULT_SCOPE (padrão: "say").
+
+    /s, /say <msg>              jogadores cuja AOI alcança quem falou (índice espacial)
+    /z, /zone <msg>             todo o mapa (instância)
+    /p <msg>                    grupo
+    /party invite|accept|leave  gerencia o grupo; /party sozinho lista os membros
+    /w, /whisper, /tell <user> <msg>
+    /g, /global <msg>           todos os jogadores, com intervalo mínimo por jogador
+
+Cada mensagem é codificada uma vez e escrita para todos os destinatários
+(network_manager.send_packet_to_many). O pacote leva "scope" para o cliente rotular.
+"""
+import time
+
+from server.game_engine.map_instance import MapInstance
+from shared.constants import CHAT_DEFAULT_SCOPE, GLOBAL_CHAT_INTERVAL, MAX_PARTY_SIZE
+from shared.logger import get_rate_limited_logger
+from shared.protocol import PACKET_CHAT_MESSAGE
+
+chat_log = get_rate_limited_logger(f"{__name__}.messages")
+
+SCOPE_SAY = "say"
+SCOPE_ZONE = "zone"
+SCOPE_PARTY = "party"
+SCOPE_WHISPER = "whisper"
+SCOPE_GLOBAL = "global"
+
+SCOPE_COMMANDS = {
+    '/s': SCOPE_SAY, '/say': SCOPE_SAY,
+    '/z': SCOPE_ZONE, '/zone': SCOPE_ZONE,
+    '/p': SCOPE_PARTY,
+    '/w': SCOPE_WHISPER, '/whisper': SCOPE_WHISPER, '/tell': SCOPE_WHISPER,
+    '/g': SCOPE_GLOBAL, '/global': SCOPE_GLOBAL,
+}
+
+def chat_packet(scope: str, sender: str, content: str, **extra) -> dict:
+    return {'type': PACKET_CHAT_MESSAGE, 'scope': scope, 'sender': sender, 'content': content, **extra}
+
+class Party:
+    def __init__(self, leader: str):
+        self.leader = leader
+        self.members = [leader]
+
+class ChatRouter:
+    """Roteia o chat de um GameEngine. Grupos valem para os jogadores deste processo."""
+    def __init__(self, engine):
+        self.engine = engine
+        self.network_manager = engine.network_manager
+        self.parties = {}          # {username: Party}; o líder só entra quando alguém aceita
+        self.invites = {}          # {convidado: Party}
+        self.last_global = {}      # {username: instante do último /global}
+
+    def handles(self, message: str) -> bool:
+        if not message.startswith('/'):
+            return True
+        command = message.split(maxsplit=1)[0].lower()
+        return command in SCOPE_COMMANDS or command == '/party'
+
+    async def handle(self, username: str, instance: MapInstance, message: str):
+        if not message.startswith('/'):
+            await self.send(username, instance, CHAT_DEFAULT_SCOPE, message)
+            return
+
+        command, _, rest = message.partition(' ')
+        command = command.lower()
+        rest = rest.strip()
+        if command == '/party':
+            await self.handle_party_command(username, instance, rest.split())
+            return
+
+        scope = SCOPE_COMMANDS[command]
+        if scope == SCOPE_WHISPER:
+            target, _, rest = rest.partition(' ')
+            await self.whisper(username, instance, target, rest.strip())
+        else:
+            await self.send(username, instance, scope, rest)
+
+    async def send(self, username: str, instance: MapInstance, scope: str, content: str):
+        if not content:
+            await self.notify(username, instance, f"Use: /{scope} <message>")
+            return
+        entity_id = instance.get_player_entity_id(username)
+
+        if scope == SCOPE_SAY:
+            writers = instance.writers_near(entity_id)
+        elif scope == SCOPE_ZONE:
+            writers = instance.player_writers()
+        elif scope == SCOPE_PARTY:
+            party = self.parties.get(username)
+            if party is None:
+                await self.notify(username, instance, "You are not in a party. Use /party invite <user>.")
+                return
+            writers = self._writers_of(party.members)
+        elif scope == SCOPE_GLOBAL:
+            now = time.monotonic()
+            wait = self.last_global.get(username, -GLOBAL_CHAT_INTERVAL) + GLOBAL_CHAT_INTERVAL - now
+            if wait > 0:
+                await self.notify(username, instance, f"Global chat again in {wait:.0f}s.")
+                return
+            self.last_global[username] = now
+            chat_log.info("User %s sent global chat: %s", username, content)
+            await self.network_manager.broadcast_game_update(chat_packet(SCOPE_GLOBAL, username, content))
+            return
+        else:
+            await self.notify(username, instance, f"Unknown chat scope '{scope}'.")
+            return
+
+        chat_log.info("User %s sent %s chat on %s: %s", username, scope, instance.map_name, content)
+        await self.network_manager.send_packet_to_many(writers, chat_packet(scope, username, content))
+
+    async def whisper(self, username: str, instance: MapInstance, target: str, content: str):
+        if not target or not content:
+            await self.notify(username, instance, "Use: /w <user> <message>")
+            return
+        packet = chat_packet(SCOPE_WHISPER, username, content, to=target)
+        delivered = await self.engine.deliver_whisper(username, target, packet)
+        if delivered is False:
+            await self.notify(username, instance, f"User '{target}' is not online.")
+            return
+        writer = self.network_manager.logged_in_users.get(username)
+        if delivered and writer is not None and target != username:
+            # Eco para quem mandou, com o destinatário em "to"
+            await self.network_manager.send_packet(writer, packet)
+
+    # --- Grupos ---
+
+    async def handle_party_command(self, username: str, instance: MapInstance, parts: list):
+        action = parts[0].lower() if parts else ''
+        if action == 'invite' and len(parts) > 1:
+            await self.invite(username, instance, parts[1])
+        elif action == 'accept':
+            await self.accept(username, instance)
+        elif action == 'leave':
+            await self.leave(username)
+        elif not action:
+            party = self.parties.get(username)
+            if party is None:
+                await self.notify(username, instance, "You are not in a party. Use /party invite <user>.")
+            else:
+                await self.notify(username, instance, f"Party ({party.leader}): {', '.join(party.members)}")
+        else:
+            await self.notify(username, instance, "Use: /party [invite <user>|accept|leave] or /p <message>")
+
+    async def invite(self, username: str, instance: MapInstance, target: str):
+        target_writer = self.network_manager.logged_in_users.get(target)
+        if target_writer is None or target == username:
+            await self.notify(username, instance, f"User '{target}' is not online.")
+            return
+        if target in self.parties:
+            await self.notify(username, instance, f"{target} is already in a party.")
+            return
+        party = self.parties.get(username) or self._pending_party(username) or Party(username)
+        if len(party.members) >= MAX_PARTY_SIZE:
+            await self.notify(username, instance, "Your party is full.")
+            return
+        self.invites[target] = party
+        await self.notify(username, instance, f"Invited {target} to the party.")
+        await self._notify_user(target, f"{username} invited you to a party. Type /party accept to join.")
+
+    async def accept(self, username: str, instance: MapInstance):
+        party = self.invites.pop(username, None)
+        if party is None or not party.members or self.parties.get(party.leader, party) is not party:
+            # Sem convite, grupo desfeito ou o líder entrou em outro grupo
+            await self.notify(username, instance, "You have no pending party invite.")
+            return
+        if username in self.parties:
+            await self.leave(username)
+        else:
+            self._drop_pending_party(username)
+        if len(party.members) >= MAX_PARTY_SIZE:
+            await self.notify(username, instance, "That party is full.")
+            return
+        # Primeiro a aceitar: só agora o grupo passa a existir
+        self.parties[party.leader] = party
+        party.members.append(username)
+        self.parties[username] = party
+        await self._notify_party(party, f"{username} joined the party.")
+
+    async def leave(self, username: str):
+        party = self.parties.pop(username, None)
+        self.invites.pop(username, None)
+        if party is None:
+            self._drop_pending_party(username)
+            return
+        party.members.remove(username)
+        if party.leader == username and party.members:
+            party.leader = party.members[0]
+        if len(party.members) == 1:
+            # Grupo de um só deixa de existir
+            self.parties.pop(party.members[0], None)
+            await self._notify_user(party.members[0], "Your party was disbanded.")
+            party.members.clear()
+        elif party.members:
+            await self._notify_party(party, f"{username} left the party.")
+
+    async def player_left(self, username: str):
+        """Chamado quando o jogador sai do processo (desconexão ou troca de worker)."""
+        self.last_global.pop(username, None)
+        await self.leave(username)
+
+    # --- Auxiliares ---
+
+    def _pending_party(self, leader: str) -> Party | None:
+        """Grupo que `leader` convidou e ninguém aceitou ainda (só existe em self.invites)."""
+        for party in self.invites.values():
+            if party.leader == leader and party.members and leader not in self.parties:
+                return party
+        return None
+
+    def _drop_pending_party(self, leader: str):
+        party = self._pending_party(leader)
+        if party is not None:
+            party.members.clear()  # convites pendentes deixam de valer
+            for target in [target for target, invite in self.invites.items() if invite is party]:
+                del self.invites[target]
+
+    def _writers_of(self, usernames) -> list:
+        logged_in = self.network_manager.logged_in_users
+        return [logged_in[name] for name in usernames if name in logged_in]
+
+    async def notify(self, username: str, instance: MapInstance, message: str):
+        await instance.send_system_message(instance.get_player_entity_id(username), message)
+
+    async def _notify_user(self, username: str, message: str):
+        writer = self.network_manager.logged_in_users.get(username)
+        if writer is not None:
+            await self.network_manager.send_packet(writer, chat_packet(SCOPE_PARTY, "System", message))
+
+    async def _notify_party(self, party: Party, message: str):
+        await self.network_manager.send_packet_to_many(self._writers_of(party.members), chat_packet(SCOPE_PARTY, "System", message))
@@ -36,3 +36,9 @@ class SpriteCollider(BoxCollider):
             (sprite_w / 100) * scale,
             (sprite_h / 100) * scale,
         )
+
+def half_extent(shape) -> float:
+    """Maior meia-extensão do collider (raio do círculo ou maior meio lado da caixa)."""
+    if isinstance(shape, CircleCollider):
+        return shape.radius
+    return max(getattr(shape, "hw", 0.5), getattr(shape, "hh", 0.5))
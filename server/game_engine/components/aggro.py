@@ -0,0 +1,10 @@
+class AggroComponent:
+    def __init__(self, aggressive: bool = True, perception_radius: float = 6.0, leash_radius: float = 15.0):
+        # Monstros passivos só entram em combate quando recebem dano
+        self.aggressive = aggressive
+        self.perception_radius = perception_radius
+        # Distância máxima do ponto de spawn antes de desistir e voltar
+        self.leash_radius = leash_radius
+
+        # Tabela de ameaça: {entity_id: ameaça acumulada}; o maior valor é o alvo
+        self.threat: dict[int, float] = {}
@@ -3,10 +3,43 @@ from typing import Literal
 AI_STATES = Literal['idle', 'wandering', 'chasing', 'attacking', 'returning']
 
 class AIComponent:
-    def __init__(self, initial_state: AI_STATES = 'wandering', target_entity_id: int | None = None, home_x: float | None = None, home_y: float | None = None):
+    """Blackboard do monstro: o comportamento (BehaviorTree) é compartilhado pelo template."""
+    def __init__(self, initial_state: AI_STATES = 'wandering', target_entity_id: int | None = None, home_x: float | None = None, home_y: float | None = None, attack_interval: float = 1.5, think_interval: int = 6, combat_think_interval: int = 2, behavior=None):
         self.state: AI_STATES = initial_state
-        
+
         self.target_entity_id: int | None = target_entity_id
-        
+
         self.home_x: float | None = home_x
-        self.home_y: float | None = home_y
\ No newline at end of file
+        self.home_y: float | None = home_y
+
+        # BehaviorTree do template (None = árvore padrão do AISystem)
+        self.behavior = behavior
+
+        # Navegação: waypoints do Pathfinder (o caminho em cache, compartilhado: só leitura) até o tile de destino
+        self.path: list | tuple = ()
+        self.path_index: int = 0
+        self.path_goal_x: int | None = None
+        self.path_goal_y: int | None = None
+
+        # Agendamento: ticks entre avaliações (fora e dentro de combate), tick da última e
+        # quantos ticks ela cobre
+        self.think_interval: int = max(1, think_interval)
+        self.combat_think_interval: int = max(1, combat_think_interval)
+        self.last_think_tick: int | None = None
+        self.elapsed: int = 1
+
+        # Ataque: segundos entre golpes e quando o próximo pode sair (time.monotonic)
+        self.attack_interval: float = attack_interval
+        self.next_attack_at: float = 0.0
+
+        # Intenções escritas pela árvore e aplicadas pelo AISystem depois da avaliação
+        self.wants_move: bool = False
+        self.move_x: float = 0.0
+        self.move_y: float = 0.0
+        self.recenter_step: float = 0.0  # > 0: se o passo bater, tenta isso em direção ao centro do tile
+        self.wants_attack: bool = False
+
+    def clear_path(self):
+        self.path = ()
+        self.path_index = 0
+        self.path_goal_x = self.path_goal_y = None
@@ -1,8 +1,18 @@
+from shared.constants import AOI_LEAVE_MARGIN
+
 class ViewportComponent:
-    def __init__(self, radius: int = 20):
+    def __init__(self, radius: int = 20, leave_margin: float = AOI_LEAVE_MARGIN):
         self.radius = radius  
+        self.leave_radius = radius + leave_margin
         
         self.last_sent_entities = set()
+        # Entradas e saídas da AOI ainda não enviadas (um ENTITY_BATCH por tick)
+        self.pending_enters = set()
+        self.pending_leaves = set()
+        # Último POS_UPDATE de cada entidade visível, enviado no próximo lote de posições
+        self.pending_positions = {}
+        # Última posição enviada de cada entidade (tiers de atualização por distância)
+        self.sent_positions = {}
 
     def __repr__(self):
         return f"<Viewport radius={self.radius} seen={len(self.last_sent_entities)}>"
@@ -0,0 +1,182 @@
+"""
+Flow fields: um campo de distâncias por alvo, compartilhado por todos os monstros que o
+perseguem (um Dijkstra em vez de um A* por monstro).
+
+Cada campo cobre o quadrado de FLOW_FIELD_RADIUS tiles em volta do tile do alvo. Quando o
+alvo troca de tile, um campo novo é montado aos poucos, dentro do orçamento de nós do tick
+(o mesmo do Pathfinder); enquanto isso os perseguidores seguem o campo anterior. Só alvos
+com pelo menos FLOW_FIELD_MIN_PURSUERS perseguidores ganham campo; os demais usam A*.
+"""
+import heapq
+import math
+
+from server.game_engine.pathfinding import NEIGHBOURS
+from shared.constants import FLOW_FIELD_MIN_PURSUERS, FLOW_FIELD_RADIUS
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ticks sem nenhum perseguidor pedindo direção até o campo (e o perseguidor) ser esquecido
+FLOW_FIELD_IDLE_TICKS = 60
+
+class FlowField:
+    """Distâncias até o tile `root` dentro de uma região quadrada do mapa."""
+    __slots__ = ('root', 'min_x', 'min_y', 'size', 'dist', 'open')
+
+    def __init__(self, root_x: int, root_y: int, radius: int):
+        self.root = (root_x, root_y)
+        self.min_x = root_x - radius
+        self.min_y = root_y - radius
+        self.size = 2 * radius + 1
+        self.dist = [math.inf] * (self.size * self.size)
+        start = radius * self.size + radius
+        self.dist[start] = 0.0
+        self.open = [(0.0, start)]
+
+    @property
+    def complete(self) -> bool:
+        return not self.open
+
+    def local_index(self, tile_x: int, tile_y: int) -> int | None:
+        lx, ly = tile_x - self.min_x, tile_y - self.min_y
+        if 0 <= lx < self.size and 0 <= ly < self.size:
+            return ly * self.size + lx
+        return None
+
+    def expand(self, game_map, budget: int) -> int:
+        """Dijkstra a partir da raiz, até `budget` nós. Retorna os nós usados."""
+        walkable = game_map.walkable_plane
+        width, height = game_map.MAP_WIDTH, game_map.MAP_HEIGHT
+        size, min_x, min_y = self.size, self.min_x, self.min_y
+        dist, open_heap = self.dist, self.open
+        used = 0
+        while open_heap and used < budget:
+            d, current = heapq.heappop(open_heap)
+            if d > dist[current]:
+                continue
+            used += 1
+            lx, ly = current % size, current // size
+            x, y = lx + min_x, ly + min_y
+            for dx, dy, cost in NEIGHBOURS:
+                nlx, nly = lx + dx, ly + dy
+                nx, ny = x + dx, y + dy
+                if not (0 <= nlx < size and 0 <= nly < size and 0 <= nx < width and 0 <= ny < height):
+                    continue
+                if not walkable[ny * width + nx]:
+                    continue
+                if dx and dy and not (walkable[y * width + nx] and walkable[ny * width + x]):
+                    continue
+                neighbour = nly * size + nlx
+                candidate = d + cost
+                if candidate < dist[neighbour]:
+                    dist[neighbour] = candidate
+                    heapq.heappush(open_heap, (candidate, neighbour))
+        return used
+
+    def next_tile(self, game_map, tile_x: int, tile_y: int) -> tuple[int, int] | None:
+        """Tile vizinho mais perto da raiz; None se (tile_x, tile_y) está fora do campo ou isolado."""
+        here = self.local_index(tile_x, tile_y)
+        if here is None or self.dist[here] == math.inf:
+            return None
+        walkable = game_map.walkable_plane
+        width = game_map.MAP_WIDTH
+        best, best_dist = None, self.dist[here]
+        for dx, dy, _ in NEIGHBOURS:
+            nx, ny = tile_x + dx, tile_y + dy
+            neighbour = self.local_index(nx, ny)
+            if neighbour is None or self.dist[neighbour] >= best_dist:
+                continue
+            if dx and dy and not (walkable[tile_y * width + nx] and walkable[ny * width + tile_x]):
+                continue
+            best, best_dist = (nx, ny), self.dist[neighbour]
+        return best
+
+class TargetFlow:
+    """Campo em uso e campo em construção de um alvo, mais quem o persegue."""
+    __slots__ = ('current', 'building', 'pursuers')
+
+    def __init__(self):
+        self.current = None      # FlowField completo
+        self.building = None     # FlowField sendo expandido
+        self.pursuers = {}       # {entity_id: tick do último pedido}
+
+class FlowFields:
+    def __init__(self, game_map, radius: int = FLOW_FIELD_RADIUS, min_pursuers: int = FLOW_FIELD_MIN_PURSUERS):
+        self.map = game_map
+        self.radius = radius
+        self.min_pursuers = min_pursuers
+        self.targets = {}        # {target_id: TargetFlow}
+        self.ticks = 0
+        self.revision = game_map.revision
+
+    def join(self, entity_id: int, target_id: int, target_x: float, target_y: float) -> bool:
+        """
+        Registra `entity_id` como perseguidor de `target_id`. True se o alvo tem
+        perseguidores suficientes para usar flow field (senão, use o Pathfinder).
+        """
+        flow = self.targets.get(target_id)
+        if flow is None:
+            flow = self.targets[target_id] = TargetFlow()
+        flow.pursuers[entity_id] = self.ticks
+        if len(flow.pursuers) < self.min_pursuers:
+            return False
+
+        root = (int(target_x), int(target_y))
+        if flow.building is None and (flow.current is None or flow.current.root != root):
+            # Alvo trocou de tile: monta o campo novo; o atual continua valendo até ele ficar pronto.
+            # Um campo por vez: se o alvo andar de novo no meio, o próximo join começa outro.
+            # Do zero de propósito: semear com as distâncias do campo anterior (+ o passo da raiz)
+            # ainda reexpande ~85% dos nós, porque tudo à frente e dos lados da raiz encurta.
+            flow.building = FlowField(root[0], root[1], self.radius)
+        return True
+
+    def has_field(self, target_id: int) -> bool:
+        flow = self.targets.get(target_id)
+        return flow is not None and flow.current is not None
+
+    def leave(self, entity_id: int, target_id: int):
+        flow = self.targets.get(target_id)
+        if flow is not None:
+            flow.pursuers.pop(entity_id, None)
+
+    def next_waypoint(self, target_id: int, x: float, y: float, target_x: float, target_y: float) -> tuple[float, float] | None:
+        """
+        Próximo ponto a seguir a partir de (x, y): o centro do tile vizinho que desce o campo,
+        ou o próprio alvo ao chegar na raiz. None se o campo ainda não existe ou não cobre (x, y).
+        """
+        flow = self.targets.get(target_id)
+        field = flow.current if flow else None
+        if field is None:
+            return None
+        tile_x, tile_y = int(x), int(y)
+        if (tile_x, tile_y) == field.root:
+            return target_x, target_y
+        step = field.next_tile(self.map, tile_x, tile_y)
+        if step is None:
+            return None
+        return step[0] + 0.5, step[1] + 0.5
+
+    def run(self, budget: int) -> int:
+        """Expande os campos em construção dentro de `budget` nós. Retorna os nós usados."""
+        self.ticks += 1
+        if self.revision != self.map.revision:
+            # Tiles mudaram: todos os campos são refeitos a partir do próximo join
+            self.revision = self.map.revision
+            for flow in self.targets.values():
+                flow.current = flow.building = None
+
+        used = 0
+        for target_id, flow in list(self.targets.items()):
+            for entity_id, last_tick in list(flow.pursuers.items()):
+                if self.ticks - last_tick > FLOW_FIELD_IDLE_TICKS:
+                    del flow.pursuers[entity_id]
+            if not flow.pursuers:
+                del self.targets[target_id]
+                continue
+            field = flow.building
+            if field is None or used >= budget:
+                continue
+            used += field.expand(self.map, budget - used)
+            if field.complete:
+                flow.current, flow.building = field, None
+        return used
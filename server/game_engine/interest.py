@@ -0,0 +1,46 @@
+"""
+Prioridade de atualização por distância (interest management).
+
+UPDATE_TIERS = "distância:N,...": uma entidade a até `distância` tiles (|dx|, |dy|, como a AOI)
+do observador recebe a posição a cada N lotes de posições (MapInstance.flush_positions).
+Além do último tier vale o N dele. Mudanças de pelo menos SIGNIFICANT_MOVE_DISTANCE desde a
+última posição enviada àquele observador saem no próximo lote, qualquer que seja o tier.
+"""
+from shared.constants import SIGNIFICANT_MOVE_DISTANCE, UPDATE_TIERS
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+def parse_update_tiers(spec: str) -> list[tuple[float, int]]:
+    tiers = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            distance, every = item.split(':')
+            tiers.append((float(distance), max(1, int(every))))
+        except ValueError:
+            logger.error(f"Invalid UPDATE_TIERS entry '{item}' (expected distance:every). Ignoring it.")
+    return sorted(tiers) or [(float('inf'), 1)]
+
+class UpdateTiers:
+    def __init__(self, spec: str = UPDATE_TIERS, significant_distance: float = SIGNIFICANT_MOVE_DISTANCE):
+        self.tiers = parse_update_tiers(spec)
+        self.significant_distance = significant_distance
+
+    def every(self, distance: float) -> int:
+        for max_distance, every in self.tiers:
+            if distance <= max_distance:
+                return every
+        return self.tiers[-1][1]
+
+    def is_due(self, flush_index: int, entity_id: int, distance: float, last_sent, x: float, y: float) -> bool:
+        """Se a posição (x, y) da entidade deve ir a este observador neste lote."""
+        if last_sent is None:
+            return True
+        if abs(x - last_sent[0]) >= self.significant_distance or abs(y - last_sent[1]) >= self.significant_distance:
+            return True
+        every = self.every(distance)
+        # Deslocado pelo id: as entidades distantes não caem todas no mesmo lote
+        return every == 1 or (flush_index + entity_id) % every == 0
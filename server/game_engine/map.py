@@ -2,13 +2,16 @@ import json
 import os
 import random
 
+from server.game_engine.map_format import CompiledMap, encode_tiles, write_compiled_map
+from server.utils.metadata_registry import metadata_registry
 from server.utils.tile_loader import load_tileset
 from shared.logger import get_logger
 
 logger = get_logger(__name__)
 
+TILESETS_FILE_PATH = os.path.join(metadata_registry.data_dir, 'tilesets.json')
+
 class GameMap:
-    _tile_data: list[list[str]] = []
     tile_metadata: dict[str, dict] = {}
 
     def __init__(self, map_name: str, map_data: dict, load_from_file=True):
@@ -16,8 +19,19 @@ class GameMap:
         self.MAP_HEIGHT = map_data["height"]
         self.MAP_NAME = map_name
         self.MAP_FILE_PATH = os.path.join("server", "maps", map_data["file"])
+        self.COMPILED_MAP_PATH = os.path.splitext(self.MAP_FILE_PATH)[0] + ".bin"
         map_dir = os.path.dirname(self.MAP_FILE_PATH)
 
+        # Representação interna: paleta de nomes + ids por tile + plano de walkability,
+        # indexados por y * largura + x. A grade de nomes (_tile_data) é montada sob demanda.
+        self._compiled = None
+        self._palette: list[str] = []
+        self._tiles = None
+        self._walkable = None
+        self._tile_rows = None
+        # Incrementada a cada mudança de tiles (caminhos em cache deixam de valer)
+        self.revision = 0
+
         # Tileset
         tileset_key = map_data.get("tileset_key", "base")
         self.tile_metadata = load_tileset(tileset_key)
@@ -25,20 +39,16 @@ class GameMap:
             logger.error(f"FATAL: Could not load tileset '{tileset_key}' for map {map_name}. Using fallback.")
             self.tile_metadata = {"grass": {"is_walkable": True, "speed_modifier": 1.0, "asset_id": 1}}
 
-        default_tile = next(iter(self.tile_metadata.keys()), "grass")
-        self._tile_data = [[default_tile for _ in range(self.MAP_WIDTH)] for _ in range(self.MAP_HEIGHT)]
-
         if not os.path.exists(map_dir):
             os.makedirs(map_dir, exist_ok=True)
             logger.info(f"Created map directory: {map_dir}")
 
-        if load_from_file and os.path.exists(self.MAP_FILE_PATH):
+        if load_from_file and self._compiled_map_is_fresh():
+            self.load_compiled_map()
+        elif load_from_file and os.path.exists(self.MAP_FILE_PATH):
+            # load_map_data já corrige tiles inválidos (viram o tile padrão) ao codificar
             self.load_map_data()
-            # Corrige tiles inválidos automaticamente
-            self._tile_data = [
-                [t if t in self.tile_metadata else default_tile for t in row]
-                for row in self._tile_data
-            ]
+            self.compile()
             logger.info(f"Loaded and sanitized map '{self.MAP_NAME}' from file.")
         else:
             if load_from_file:
@@ -50,9 +60,32 @@ class GameMap:
 
         logger.info(f"Game Map initialized: {self.MAP_WIDTH}x{self.MAP_HEIGHT} with tileset '{tileset_key}'.")
 
+    @property
+    def _tile_data(self) -> list[list[str]]:
+        if self._tile_rows is None:
+            palette, tiles, width = self._palette, self._tiles, self.MAP_WIDTH
+            self._tile_rows = [
+                [palette[tile_id] for tile_id in tiles[y * width:(y + 1) * width]]
+                for y in range(self.MAP_HEIGHT)
+            ]
+        return self._tile_rows
+
+    @_tile_data.setter
+    def _tile_data(self, tile_rows: list[list[str]]):
+        self._release_compiled()
+        self._palette, self._tiles, self._walkable = encode_tiles(tile_rows, self.tile_metadata)
+        self._tile_rows = None
+        self.revision += 1
+
+    def _release_compiled(self):
+        if self._compiled is not None:
+            self._tiles = self._walkable = None
+            self._compiled.close()
+            self._compiled = None
+
     def _generate_default_map(self):
         default_tile = next(iter(self.tile_metadata.keys()), "grass")
-        self._tile_data = [[default_tile for _ in range(self.MAP_WIDTH)] for _ in range(self.MAP_HEIGHT)]
+        tiles = [[default_tile for _ in range(self.MAP_WIDTH)] for _ in range(self.MAP_HEIGHT)]
 
         # Função de segurança para tiles
         def safe_tile(tile_name: str):
@@ -63,7 +96,7 @@ class GameMap:
         for y in range(self.MAP_HEIGHT):
             for x in range(self.MAP_WIDTH):
                 if y == 0 or y == self.MAP_HEIGHT - 1 or x == 0 or x == self.MAP_WIDTH - 1:
-                    self._tile_data[y][x] = border_tile
+                    tiles[y][x] = border_tile
 
         # --- Área central ---
         center = self.patterns.get("center")
@@ -73,7 +106,7 @@ class GameMap:
             center_tile = safe_tile(center.get("tile", default_tile))
             for y in range(y_start, y_end):
                 for x in range(x_start, x_end):
-                    self._tile_data[y][x] = center_tile
+                    tiles[y][x] = center_tile
 
         # --- Tiles aleatórios ---
         random_cfg = self.patterns.get("random", {})
@@ -81,10 +114,11 @@ class GameMap:
         density = random_cfg.get("density", 0.05)
         for y in range(self.MAP_HEIGHT):
             for x in range(self.MAP_WIDTH):
-                if self._tile_data[y][x] == default_tile and random_tiles:
+                if tiles[y][x] == default_tile and random_tiles:
                     if random.random() < density:
-                        self._tile_data[y][x] = random.choice(random_tiles)
+                        tiles[y][x] = random.choice(random_tiles)
 
+        self._tile_data = tiles
         logger.info(f"Default map for '{self.MAP_NAME}' generated with safe tiles.")
 
     def save_map_data(self):
@@ -94,8 +128,9 @@ class GameMap:
             "tiles": self._tile_data,
         }
         with open(self.MAP_FILE_PATH, "w") as f:
-            json.dump(data, f, indent=4)
+            json.dump(data, f, separators=(",", ":"))
         logger.info(f"Map data saved to {self.MAP_FILE_PATH}.")
+        self.compile()
 
     def load_map_data(self):
         with open(self.MAP_FILE_PATH, "r") as f:
@@ -105,21 +140,75 @@ class GameMap:
             self._tile_data = data["tiles"]
         logger.info(f"Map data loaded from {self.MAP_FILE_PATH}: {self.MAP_WIDTH}x{self.MAP_HEIGHT}")
 
+    def _compiled_map_is_fresh(self) -> bool:
+        """O .bin é válido se for mais novo que o JSON fonte e que tilesets.json."""
+        if not os.path.exists(self.COMPILED_MAP_PATH):
+            return False
+        compiled_mtime = os.path.getmtime(self.COMPILED_MAP_PATH)
+        for source in (self.MAP_FILE_PATH, TILESETS_FILE_PATH):
+            if os.path.exists(source) and os.path.getmtime(source) > compiled_mtime:
+                return False
+        return True
+
+    def compile(self):
+        """Gera o mapa compilado a partir do estado atual e passa a usá-lo via mmap."""
+        write_compiled_map(self.COMPILED_MAP_PATH, self.MAP_WIDTH, self.MAP_HEIGHT, self._palette, self._tiles, self._walkable)
+        logger.info(f"Compiled map written to {self.COMPILED_MAP_PATH}.")
+        self.load_compiled_map()
+
+    def load_compiled_map(self):
+        compiled = CompiledMap(self.COMPILED_MAP_PATH)
+        if compiled.palette != list(self.tile_metadata.keys()):
+            # Tileset mudou desde a compilação: recodifica a partir do próprio .bin
+            rows = [
+                [compiled.palette[t] for t in compiled.tiles[y * compiled.width:(y + 1) * compiled.width]]
+                for y in range(compiled.height)
+            ]
+            compiled.close()
+            self.MAP_WIDTH, self.MAP_HEIGHT = len(rows[0]) if rows else 0, len(rows)
+            self._tile_data = rows
+            self.compile()
+            return
+
+        self._release_compiled()
+        self._compiled = compiled
+        self.MAP_WIDTH = compiled.width
+        self.MAP_HEIGHT = compiled.height
+        self._palette = compiled.palette
+        self._tiles = compiled.tiles
+        self._walkable = compiled.walkable
+        self._tile_rows = None
+        self.revision += 1
+        logger.info(f"Compiled map loaded from {self.COMPILED_MAP_PATH}: {self.MAP_WIDTH}x{self.MAP_HEIGHT}")
+
     def get_tile_type(self, x: float, y: float) -> str | None:
         tile_x, tile_y = int(x), int(y)
         if not (0 <= tile_x < self.MAP_WIDTH and 0 <= tile_y < self.MAP_HEIGHT):
             return None
-        return self._tile_data[tile_y][tile_x]
+        return self._palette[self._tiles[tile_y * self.MAP_WIDTH + tile_x]]
 
     def is_walkable(self, x: float, y: float) -> bool:
-        tile_type = self.get_tile_type(x, y)
-        if tile_type is None:
-            return False
-        metadata = self.tile_metadata.get(tile_type)
-        if not metadata:
-            logger.error(f"Tile type '{tile_type}' has no metadata!")
+        tile_x, tile_y = int(x), int(y)
+        if not (0 <= tile_x < self.MAP_WIDTH and 0 <= tile_y < self.MAP_HEIGHT):
             return False
-        return metadata["is_walkable"]
+        return self._walkable[tile_y * self.MAP_WIDTH + tile_x] != 0
+
+    @property
+    def walkable_plane(self):
+        """Walkability por tile (0 = bloqueado), indexada por y * largura + x. Usada pelo pathfinding."""
+        return self._walkable
+
+    def set_tile(self, x: int, y: int, tile_name: str):
+        if tile_name not in self.tile_metadata:
+            raise ValueError(f"Tile type '{tile_name}' is not in the tileset of map {self.MAP_NAME}.")
+        if not (0 <= x < self.MAP_WIDTH and 0 <= y < self.MAP_HEIGHT):
+            raise ValueError(f"Tile ({x}, {y}) is outside map {self.MAP_NAME}.")
+        index = y * self.MAP_WIDTH + x
+        self._tiles[index] = self._palette.index(tile_name)
+        self._walkable[index] = 1 if self.tile_metadata[tile_name].get("is_walkable") else 0
+        if self._tile_rows is not None:
+            self._tile_rows[y][x] = tile_name
+        self.revision += 1
 
     def get_map_data_for_client(self) -> dict:
         return {
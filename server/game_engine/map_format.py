@@ -0,0 +1,143 @@
+"""
+Formato de mapa compilado (.bin), gerado a partir do JSON fonte e aberto com mmap.
+
+Layout (little-endian):
+    header      struct HEADER_FORMAT (magic, versão, bytes por tile, largura, altura,
+                nº de entradas da paleta, offset dos tiles, offset da walkability)
+    paleta      para cada tile: u16 tamanho + nome em utf-8
+    tiles       largura * altura ids (uint8, ou uint16 se a paleta tiver > 256 tiles)
+    walkability largura * altura bytes (1 = andável, 0 = bloqueado)
+
+As seções de dados são alinhadas em 8 bytes. O arquivo é mapeado com
+mmap.ACCESS_COPY: páginas não modificadas são compartilhadas entre processos
+e alterações (set_tile) ficam privadas ao processo.
+
+Uso: python -m server.game_engine.map_format   (compila todos os mapas conhecidos)
+"""
+import array
+import mmap
+import os
+import struct
+import sys
+
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'MMOM'
+VERSION = 1
+HEADER_FORMAT = '<4sHBxIIHII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ALIGNMENT = 8
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def encode_tiles(tile_rows: list[list[str]], tile_metadata: dict[str, dict]) -> tuple[list[str], array.array, bytearray]:
+    """
+    Converte a grade de nomes em (paleta, ids, walkability). Tiles desconhecidos
+    viram o primeiro tile do tileset (mesma regra de sanitização do GameMap).
+    """
+    palette = list(tile_metadata.keys())
+    index = {name: i for i, name in enumerate(palette)}
+    typecode = 'B' if len(palette) <= 256 else 'H'
+
+    tiles = array.array(typecode)
+    for row in tile_rows:
+        tiles.extend(index.get(name, 0) for name in row)
+
+    walk_by_id = bytes(1 if tile_metadata[name].get("is_walkable") else 0 for name in palette)
+    if typecode == 'B':
+        walkable = bytearray(tiles.tobytes().translate(walk_by_id.ljust(256, b'\x00')))
+    else:
+        walkable = bytearray(walk_by_id[tile_id] for tile_id in tiles)
+
+    return palette, tiles, walkable
+
+def write_compiled_map(path: str, width: int, height: int, palette: list[str], tiles: array.array, walkable: bytearray):
+    palette_blob = b''.join(struct.pack('<H', len(encoded)) + encoded for encoded in (n.encode('utf-8') for n in palette))
+    tiles_offset = _align(HEADER_SIZE + len(palette_blob))
+    tile_bytes = tiles.itemsize
+    walk_offset = _align(tiles_offset + width * height * tile_bytes)
+
+    tile_data = tiles
+    if tile_bytes > 1 and sys.byteorder != 'little':
+        tile_data = array.array(tiles.typecode, tiles)
+        tile_data.byteswap()
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, tile_bytes, width, height, len(palette), tiles_offset, walk_offset)
+
+    # Escreve num arquivo temporário e troca atomicamente: processos que já
+    # mapearam a versão antiga continuam com as páginas antigas. O nome leva o pid
+    # porque workers que sobem juntos podem compilar o mesmo mapa ao mesmo tempo.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(palette_blob)
+            f.write(b'\x00' * (tiles_offset - HEADER_SIZE - len(palette_blob)))
+            f.write(tile_data.tobytes())
+            f.write(b'\x00' * (walk_offset - tiles_offset - width * height * tile_bytes))
+            f.write(bytes(walkable))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class CompiledMap:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, tile_bytes, width, height, palette_count, tiles_offset, walk_offset = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a compiled map (version {VERSION}).")
+
+        self.width = width
+        self.height = height
+
+        self.palette = []
+        offset = HEADER_SIZE
+        for _ in range(palette_count):
+            (length,) = struct.unpack_from('<H', self._mmap, offset)
+            offset += 2
+            self.palette.append(self._mmap[offset:offset + length].decode('utf-8'))
+            offset += length
+
+        view = memoryview(self._mmap)
+        tile_count = width * height
+        raw_tiles = view[tiles_offset:tiles_offset + tile_count * tile_bytes]
+        if tile_bytes == 1:
+            self.tiles = raw_tiles
+        elif sys.byteorder == 'little':
+            self.tiles = raw_tiles.cast('H')
+        else:
+            self.tiles = array.array('H', raw_tiles.tobytes())
+            self.tiles.byteswap()
+        self.walkable = view[walk_offset:walk_offset + tile_count]
+
+    def close(self):
+        self.tiles = None
+        self.walkable = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Ainda há memoryviews vivos; o mmap será liberado pelo GC
+            pass
+
+def main():
+    from server.game_engine.map import GameMap
+    from server.utils.metadata_registry import metadata_registry
+
+    for map_name in metadata_registry.get_map_names():
+        game_map = GameMap(map_name, metadata_registry.get_map(map_name))
+        game_map.compile()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,689 @@
+import time
+
+from server.game_engine.components.player_class import ClassComponent
+from server.game_engine.components.collision import CollisionComponent
+from server.game_engine.components.health import HealthComponent
+from server.game_engine.components.stats import StatsComponent
+from server.game_engine.components.type import TypeComponent
+from server.game_engine.components.position import PositionComponent
+from server.game_engine.components.network import NetworkComponent
+from server.game_engine.components.viewport import ViewportComponent
+from server.game_engine.collision.shapes import BoxCollider
+from server.game_engine.interest import UpdateTiers
+from server.game_engine.flow_field import FlowFields
+from server.game_engine.map import GameMap
+from server.game_engine.pathfinding import Pathfinder
+from server.game_engine.serialization import packet_builder
+from server.game_engine.world import World
+from server.systems.aggro_system import AggroSystem
+from server.systems.ai_system import AISystem
+from server.systems.collision import CollisionSystem
+from server.systems.combat_system import CombatSystem
+from server.systems.evolution import EvolutionSystem
+from server.systems.movement_system import MovementSystem
+from server.systems.world_initializer import WorldInitializer
+from server.utils.class_loader import get_class_metadata
+from shared.constants import A_O_I_RANGE, REMOTE_UPDATE_INTERVAL, STAT_ALIAS_MAP
+from shared.logger import get_logger
+from shared.protocol import (
+    PACKET_DAMAGE,
+    PACKET_ENTITY_BATCH,
+    PACKET_ENTITY_NEW,
+    PACKET_ENTITY_REMOVE,
+    PACKET_ENTITY_UPDATE,
+    PACKET_EVOLVE,
+    PACKET_MAP_DATA,
+    PACKET_MOVE,
+    PACKET_POSITION_UPDATE,
+    PACKET_CHAT_MESSAGE,
+    PACKET_ITEM_USE,
+    PACKET_SYSTEM_MESSAGE,
+)
+
+logger = get_logger(__name__)
+
+class MapInstance:
+    """
+    Simulação de um único mapa: World (com índice espacial), GameMap, colisão, movimento,
+    combate, IA e evolução próprios. O GameEngine só coordena as instâncias e move
+    jogadores entre elas; nada aqui enxerga outro mapa.
+    """
+    def __init__(self, map_name: str, map_data: dict, db_pool, network_manager, load_from_file=True):
+        self.map_name = map_name
+        self.db_pool = db_pool
+        self.network_manager = network_manager
+        self.world = World()
+        self.player_entity_map = {}  # {username: entity_id}
+        self.observers = {}          # {entity_id: set(player_id)}: quem tem a entidade em last_sent_entities
+        self._next_position_flush = 0.0
+        self._position_flushes = 0
+        self.update_tiers = UpdateTiers()
+        self.map = GameMap(map_name, map_data, load_from_file=load_from_file)
+        self.spawn_point = (
+            map_data.get("initial_player_spawn_x", 10.0),
+            map_data.get("initial_player_spawn_y", 10.0),
+        )
+
+        self.collision_system = CollisionSystem(self.map)
+        self.pathfinder = Pathfinder(self.map)
+        self.flow_fields = FlowFields(self.map)
+        self.world_initializer = WorldInitializer(self.world, self.map, self.db_pool)
+        self.aggro_system = AggroSystem(self.world, self.flow_fields)
+        self.combat_system = CombatSystem(
+            self.world,
+            self.network_manager,
+            self.send_aoi_update,
+            self.send_system_message,
+            respawn_point=self.spawn_point,
+            add_threat_func=self.aggro_system.add_threat,
+            forget_threat_func=self.aggro_system.forget
+        )
+        self.movement_system = MovementSystem(
+            self.world,
+            self.network_manager,
+            self.collision_system,
+            self.send_aoi_update
+        )
+        self.ai_system = AISystem(
+            self.world,
+            self.movement_system,
+            self.send_aoi_update,
+            self.pathfinder,
+            self.flow_fields,
+            attack_func=self.combat_system.handle_damage_request
+        )
+        self.evolution_system = EvolutionSystem(self.world, self)
+        logger.info(f"Map instance '{map_name}' initialized.")
+
+    async def start(self):
+        await self.world_initializer.initialize_world()
+        logger.info(f"Map instance '{self.map_name}' started with {len(self.world.entities)} entities.")
+
+    @property
+    def is_idle(self) -> bool:
+        return not self.player_entity_map
+
+    async def tick(self):
+        # Mapas sem jogadores não simulam nada
+        if self.is_idle:
+            # Sem observadores não há AOI para reavaliar
+            self.world.spatial_index.take_crossed()
+            return
+        self.aggro_system.run()
+        await self.ai_system.run()
+        await self.movement_system.flush_acks()
+        self.update_visibility()
+        await self.flush_visibility()
+        await self.flush_positions()
+
+    # --- Entrada e saída de jogadores ---
+
+    async def add_player(self, writer, username: str, player_data: dict) -> int:
+        """
+        Cria a entidade do jogador neste mapa a partir de `player_data` (mesmo formato de
+        get_player_data + base_health/class_bonus) e envia mapa, o próprio jogador e a AOI inicial.
+        """
+        map_packet = {
+            "type": PACKET_MAP_DATA,
+            "map_name": self.map.MAP_NAME,
+            "width": self.map.MAP_WIDTH,
+            "height": self.map.MAP_HEIGHT,
+            "tiles": self.map._tile_data,
+            "metadata": self.map.tile_metadata
+        }
+        await self.network_manager.send_packet(writer, map_packet)
+        logger.info(f"Sent map '{self.map.MAP_NAME}' to player {username}.")
+
+        entity_id = self.world.create_entity()
+
+        self.world.add_component(entity_id, ClassComponent(player_data['class_name']))
+
+        stats_comp = StatsComponent(
+            level=player_data['level'],
+            experience=player_data['experience'],
+            stat_points=player_data['stat_points'],
+
+            base_health=player_data['base_health'],
+
+            strength=player_data['strength'],
+            agility=player_data['agility'],
+            vitality=player_data['vitality'],
+            intelligence=player_data['intelligence'],
+            dexterity=player_data['dexterity'],
+            luck=player_data['luck'],
+
+            class_bonus=player_data['class_bonus']
+        )
+        self.world.add_component(entity_id, stats_comp)
+
+        self.world.add_component(entity_id, TypeComponent('player'))
+        self.world.add_component(entity_id, PositionComponent(player_data['pos_x'], player_data['pos_y']))
+        self.world.add_component(entity_id, NetworkComponent(writer, username))
+        self.world.add_component(entity_id, CollisionComponent(BoxCollider(1, 1)))
+        self.world.add_component(entity_id, ViewportComponent(radius=A_O_I_RANGE))
+
+        max_hp = stats_comp.get_max_health_for_level()
+        saved_hp = player_data.get('current_health')
+
+        if saved_hp is None or saved_hp <= 0:
+            initial_hp = max_hp
+        elif saved_hp > max_hp:
+            initial_hp = max_hp
+        else:
+            initial_hp = saved_hp
+
+        self.world.add_component(entity_id, HealthComponent(max_health=max_hp, initial_health=initial_hp))
+
+        self.player_entity_map[username] = entity_id
+        logger.info(f"Entity {entity_id} created for player {username} on map '{self.map_name}'.")
+
+        entity_data = packet_builder.serialize_entity(self.world, entity_id)
+
+        # Pacote para o próprio jogador (is_local_player: True)
+        local_player_packet = {
+            "type": PACKET_ENTITY_NEW,
+            "is_local_player": True,
+            **entity_data
+        }
+        await self.network_manager.send_packet(writer, local_player_packet)
+
+        await self._receive_initial_aoi(entity_id, writer)
+        # Os vizinhos recebem o novo jogador no próximo tick (update_visibility: ele acabou de entrar no índice)
+        return entity_id
+
+    def get_player_state(self, username: str) -> dict | None:
+        """Estado persistente do jogador, no formato usado por add_player e update_player_data."""
+        entity_id = self.player_entity_map.get(username)
+        if entity_id is None:
+            return None
+        pos_comp = self.world.get_component(entity_id, PositionComponent)
+        health_comp = self.world.get_component(entity_id, HealthComponent)
+        stats_comp = self.world.get_component(entity_id, StatsComponent)
+        class_comp = self.world.get_component(entity_id, ClassComponent)
+        if not (pos_comp and health_comp and stats_comp and class_comp):
+            return None
+
+        metadata = get_class_metadata(class_comp.class_name) or {}
+        return {
+            'map_name': self.map_name,
+            'pos_x': pos_comp.x,
+            'pos_y': pos_comp.y,
+            'current_health': health_comp.current_health,
+            'class_name': class_comp.class_name,
+            'level': stats_comp.level,
+            'experience': stats_comp.experience,
+            'stat_points': stats_comp.stat_points,
+            'strength': stats_comp.strength,
+            'agility': stats_comp.agility,
+            'vitality': stats_comp.vitality,
+            'intelligence': stats_comp.intelligence,
+            'dexterity': stats_comp.dexterity,
+            'luck': stats_comp.luck,
+            'base_health': metadata.get("base_health", stats_comp.base_health),
+            'class_bonus': metadata.get("class_bonus", {}),
+        }
+
+    async def remove_player(self, username: str) -> int | None:
+        """Remove a entidade do jogador deste mapa e avisa quem estava vendo."""
+        entity_id = self.player_entity_map.pop(username, None)
+        if entity_id is None:
+            return None
+
+        viewport = self.world.get_component(entity_id, ViewportComponent)
+        if viewport:
+            for seen_id in viewport.last_sent_entities:
+                self._discard_observer(seen_id, entity_id)
+        # Só quem já recebeu (ou vai receber) a entidade precisa saber; sai no próximo ENTITY_BATCH
+        self._remove_from_views(entity_id)
+
+        self.world.remove_entity(entity_id)
+        logger.info(f"Entity {entity_id} removed for player {username} from map '{self.map_name}'.")
+        return entity_id
+
+    def get_player_entity_id(self, username: str) -> int | None:
+        return self.player_entity_map.get(username)
+
+    # --- Pacotes ---
+
+    async def process_network_packet(self, writer, user: str, packet: dict):
+        pkt_type = packet.get('type')
+        entity_id = self.get_player_entity_id(user)
+        if entity_id is None:
+            logger.warning(f"Packet from {user}, who is not on map '{self.map_name}'.")
+            return
+
+        if pkt_type == PACKET_CHAT_MESSAGE:
+            parts = packet.get('content', '').strip().split()
+            command = parts[0].lower() if parts else ''
+
+            if command == '/stats':
+                await self.handle_command_stats(entity_id)
+            elif command == '/evolve':
+                await self.handle_command_evolve(entity_id, parts)
+            elif command == '/add':
+                await self.handle_command_add_stat(entity_id, parts)
+            else:
+                await self.send_system_message(entity_id, f"Comando desconhecido: {command}")
+
+        elif pkt_type == PACKET_DAMAGE:
+            target_id = packet.get('target_entity_id')
+            if target_id is None:
+                logger.warning(f"Malformed DAMAGE packet from {user}.")
+            else:
+                await self.combat_system.handle_damage_request(entity_id, target_id)
+
+        elif pkt_type == PACKET_MOVE:
+            x = packet.get('x')
+            y = packet.get('y')
+
+            if x is None or y is None:
+                 dx = packet.get('dx')
+                 dy = packet.get('dy')
+                 seq = packet.get('seq')
+                 if not isinstance(seq, int) or isinstance(seq, bool):
+                     seq = None
+                 if dx is not None and dy is not None:
+                     await self.movement_system.handle_move_request(entity_id, writer, dx, dy, seq)
+                 else:
+                     logger.warning("Malformed move packet: missing coordinates.")
+                     return
+            else:
+                 await self.movement_system.handle_move_request(entity_id, writer, x, y)
+
+        elif pkt_type == PACKET_EVOLVE:
+            target_class_name = packet.get('class_name')
+            if target_class_name:
+                await self.evolution_system.change_class(entity_id, target_class_name)
+
+                entity_data = packet_builder.serialize_entity(self.world, entity_id)
+                update_packet = {
+                    "type": PACKET_ENTITY_UPDATE,
+                    **entity_data
+                }
+                await self.send_aoi_update(entity_id, update_packet)
+            else:
+                logger.warning(f"Malformed EVOLVE packet from {user}: missing class_name.")
+                await self.send_system_message(entity_id, "Error: Target class name missing for evolution.")
+
+        elif pkt_type == PACKET_ITEM_USE:
+            pass
+        else:
+            logger.warning(f"Unknown packet type received: {pkt_type}")
+
+    async def handle_command_add_stat(self, entity_id: int, parts: list):
+        if len(parts) < 2:
+            await self.send_system_message(entity_id, f"Use: /add <{ '|'.join(STAT_ALIAS_MAP.keys()) }>")
+            return
+
+        stat_alias = parts[1].lower()
+        stats_comp = self.world.get_component(entity_id, StatsComponent)
+        if not stats_comp:
+            return
+
+        if stats_comp.stat_points <= 0:
+            await self.send_system_message(entity_id, "You do not have enough stat points.")
+            return
+
+        if stat_alias not in STAT_ALIAS_MAP:
+            await self.send_system_message(entity_id, f"Invalid attribute. Use: {', '.join(STAT_ALIAS_MAP.keys())}")
+            return
+
+        attr_name = STAT_ALIAS_MAP[stat_alias]
+
+        current_val = getattr(stats_comp, attr_name)
+        setattr(stats_comp, attr_name, current_val + 1)
+        stats_comp.stat_points -= 1
+
+        if attr_name == "vitality":
+            health_comp = self.world.get_component(entity_id, HealthComponent)
+            if health_comp:
+                health_comp.max_health = stats_comp.get_max_health_for_level()
+
+        await self.send_system_message(
+            entity_id, f"{attr_name.capitalize()} increased to {current_val + 1}. Remaining points: {stats_comp.stat_points}"
+        )
+
+        entity_data = packet_builder.serialize_entity(self.world, entity_id)
+        update_packet = {
+            "type": PACKET_ENTITY_UPDATE,
+            **entity_data
+        }
+        await self.send_aoi_update(entity_id, update_packet)
+
+    async def handle_command_evolve(self, entity_id: int, parts: list):
+        if not self.is_player(entity_id):
+            await self.send_system_message(entity_id, "Erro: Apenas jogadores podem evoluir.")
+            return
+
+        if len(parts) < 2:
+            await self.send_system_message(entity_id, "Uso: /evolve <ClasseAlvo>")
+            class_comp = self.world.get_component(entity_id, ClassComponent)
+            if class_comp:
+                metadata = get_class_metadata(class_comp.class_name)
+                evolution = metadata.get('evolution')
+                if evolution:
+                    targets = ", ".join(evolution.get('to_classes', []))
+                    await self.send_system_message(entity_id, f"Evoluções disponíveis (Nível {evolution.get('level')}): {targets}")
+            return
+
+        target_class_name = parts[1]
+
+        # Chama o sistema de evolução para processar a mudança
+        success = await self.evolution_system.change_class(entity_id, target_class_name)
+
+        if success:
+            # Depois da evolução, envia pacote atualizado usando serialize_entity
+            entity_data = packet_builder.serialize_entity(self.world, entity_id)
+            update_packet = {
+                "type": PACKET_ENTITY_UPDATE,
+                **entity_data
+            }
+            await self.send_aoi_update(entity_id, update_packet)
+
+    async def handle_command_stats(self, entity_id: int):
+
+        stats_comp = self.world.get_component(entity_id, StatsComponent)
+        health_comp = self.world.get_component(entity_id, HealthComponent)
+        network_comp = self.world.get_component(entity_id, NetworkComponent)
+
+        if not stats_comp or not health_comp or not network_comp:
+            await self.send_system_message(entity_id, "Error: Health/Stats Components not found.")
+            return
+
+        try:
+            attack_power = stats_comp.get_attack_power()
+        except AttributeError:
+            attack_power = "N/A (Missing get_attack_power)"
+
+        message = (
+            f"--- STATUS OF {network_comp.username.upper()} ---\n"
+            f"Map: {self.map_name}\n"
+            f"Level: {stats_comp.level} | EXP: {stats_comp.experience}\n"
+            f"Health: {health_comp.current_health}/{health_comp.max_health}\n"
+            f"Attack: {attack_power}\n"
+            f"STR: {stats_comp.strength} | AGI: {stats_comp.agility} | VIT: {stats_comp.vitality}\n"
+            f"INT: {stats_comp.intelligence} | DEX: {stats_comp.dexterity} | LUC: {stats_comp.luck}\n"
+            f"Stat Points Available: {stats_comp.stat_points}"
+        )
+
+        await self.send_system_message(entity_id, message)
+
+    # --- AOI ---
+
+    async def send_aoi_update(self, source_entity_id: int, packet: dict, exclude_writer=None):
+            """
+            Envia a mudança de estado de uma entidade a quem a vê (self.observers).
+
+            Quem vê o quê é decidido por update_visibility, uma vez por tick; aqui só se
+            distribui o pacote. ENTITY_NEW não precisa passar por aqui: a entidade nova entra
+            no índice espacial e aparece para os vizinhos no próximo ENTITY_BATCH.
+            """
+            pkt_type = packet.get("type")
+            if pkt_type == PACKET_ENTITY_NEW:
+                return
+            if pkt_type == PACKET_ENTITY_REMOVE:
+                # Entidade saindo do mundo (ex.: monstro morto)
+                self._remove_from_views(source_entity_id)
+                return
+
+            # Posições de quem já está visível vão no próximo lote, com o instante da mudança
+            batch_position = pkt_type == PACKET_POSITION_UPDATE
+            if batch_position:
+                packet = {**packet, "t": time.monotonic()}
+
+            # O próprio jogador não passa pela AOI: recebe a mudança direto
+            source_net = self.world.get_component(source_entity_id, NetworkComponent)
+            if source_net and source_net.writer and source_net.writer != exclude_writer:
+                await self.network_manager.send_packet(source_net.writer, packet)
+
+            # Cópia: o envio faz awaits e a visão pode mudar no meio
+            for player_id in list(self.observers.get(source_entity_id, ())):
+                net = self.world.get_component(player_id, NetworkComponent)
+                viewport = self.world.get_component(player_id, ViewportComponent)
+                if not net or not viewport or net.writer == exclude_writer:
+                    continue
+                if batch_position:
+                    viewport.pending_positions[source_entity_id] = packet
+                elif source_entity_id not in viewport.pending_enters:
+                    # Quem ainda vai receber a entidade no lote já recebe o estado atual
+                    await self.network_manager.send_packet(net.writer, packet)
+
+    def update_visibility(self):
+        """
+        AOI incremental: só quem entrou no índice espacial ou trocou de célula desde o último
+        tick é reavaliado. Um jogador que cruzou uma célula refaz a própria visão; qualquer
+        entidade que cruzou é comparada com quem a vê e com os jogadores próximos.
+        Entra a até `radius`, sai além de `leave_radius` (histerese). As diferenças em
+        last_sent_entities viram o ENTITY_BATCH de flush_visibility.
+        """
+        crossed = self.world.spatial_index.take_crossed()
+        if not crossed:
+            return
+        player_ids = set(self.player_entity_map.values())
+        for entity_id in crossed:
+            pos = self.world.get_component(entity_id, PositionComponent)
+            if not pos:
+                continue
+            if entity_id in player_ids:
+                viewport = self.world.get_component(entity_id, ViewportComponent)
+                if viewport:
+                    self._refresh_view(entity_id, viewport, pos)
+            self._refresh_observers(entity_id, pos, player_ids)
+
+    def _refresh_view(self, player_id: int, viewport: ViewportComponent, pos: PositionComponent):
+        """Recalcula tudo o que o jogador vê a partir da posição dele."""
+        kept = set()
+        for other_id, other_pos in self.world.get_entities_near(pos.x, pos.y, viewport.leave_radius):
+            if other_id == player_id:
+                continue
+            if other_id in viewport.last_sent_entities:
+                kept.add(other_id)
+            elif max(abs(other_pos.x - pos.x), abs(other_pos.y - pos.y)) <= viewport.radius:
+                self._queue_enter(player_id, viewport, other_id)
+                kept.add(other_id)
+        # O que não apareceu na consulta até leave_radius saiu da AOI
+        for other_id in viewport.last_sent_entities - kept:
+            self._queue_leave(player_id, viewport, other_id)
+
+    def _refresh_observers(self, entity_id: int, pos: PositionComponent, player_ids: set):
+        """Atualiza quem vê a entidade depois que ela trocou de célula."""
+        observers = self.observers.get(entity_id, set())
+        for player_id in list(observers):
+            viewport = self.world.get_component(player_id, ViewportComponent)
+            player_pos = self.world.get_component(player_id, PositionComponent)
+            if not viewport or not player_pos:
+                continue
+            if max(abs(player_pos.x - pos.x), abs(player_pos.y - pos.y)) > viewport.leave_radius:
+                self._queue_leave(player_id, viewport, entity_id)
+
+        for player_id, player_pos in self.world.get_entities_near(pos.x, pos.y, A_O_I_RANGE):
+            if player_id == entity_id or player_id not in player_ids or player_id in observers:
+                continue
+            viewport = self.world.get_component(player_id, ViewportComponent)
+            if viewport and max(abs(player_pos.x - pos.x), abs(player_pos.y - pos.y)) <= viewport.radius:
+                self._queue_enter(player_id, viewport, entity_id)
+
+    def _queue_enter(self, player_id: int, viewport: ViewportComponent, entity_id: int):
+        viewport.last_sent_entities.add(entity_id)
+        self.observers.setdefault(entity_id, set()).add(player_id)
+        if entity_id in viewport.pending_leaves:
+            # Saiu e voltou no mesmo tick: o cliente nem chegou a remover
+            viewport.pending_leaves.discard(entity_id)
+        else:
+            viewport.pending_enters.add(entity_id)
+
+    def _queue_leave(self, player_id: int, viewport: ViewportComponent, entity_id: int):
+        viewport.last_sent_entities.discard(entity_id)
+        self._discard_observer(entity_id, player_id)
+        viewport.pending_positions.pop(entity_id, None)
+        viewport.sent_positions.pop(entity_id, None)
+        if entity_id in viewport.pending_enters:
+            # Entrou e saiu no mesmo tick: o cliente nunca soube dela
+            viewport.pending_enters.discard(entity_id)
+        else:
+            viewport.pending_leaves.add(entity_id)
+
+    def _discard_observer(self, entity_id: int, player_id: int):
+        observers = self.observers.get(entity_id)
+        if observers is not None:
+            observers.discard(player_id)
+            if not observers:
+                del self.observers[entity_id]
+
+    def _remove_from_views(self, entity_id: int):
+        """A entidade some do mundo: sai da visão de todos que a viam."""
+        for player_id in list(self.observers.get(entity_id, ())):
+            viewport = self.world.get_component(player_id, ViewportComponent)
+            if viewport:
+                self._queue_leave(player_id, viewport, entity_id)
+        self.observers.pop(entity_id, None)
+
+    async def flush_visibility(self):
+        """Um ENTITY_BATCH por jogador com as entradas e saídas de AOI acumuladas no tick."""
+        serialized = {}  # cada entidade é serializada uma vez, para todos que a veem entrar
+        for player_id in list(self.player_entity_map.values()):
+            viewport = self.world.get_component(player_id, ViewportComponent)
+            net = self.world.get_component(player_id, NetworkComponent)
+            if not viewport or not net or not (viewport.pending_enters or viewport.pending_leaves):
+                continue
+
+            enters = []
+            for entity_id in viewport.pending_enters:
+                entity_data = serialized.get(entity_id)
+                if entity_data is None:
+                    if entity_id not in self.world.entities:
+                        viewport.last_sent_entities.discard(entity_id)
+                        self._discard_observer(entity_id, player_id)
+                        continue
+                    entity_data = serialized[entity_id] = packet_builder.serialize_entity(self.world, entity_id)
+                enters.append(entity_data)
+            leaves = list(viewport.pending_leaves)
+            viewport.pending_enters.clear()
+            viewport.pending_leaves.clear()
+
+            if enters or leaves:
+                await self.network_manager.send_packet(net.writer, {
+                    "type": PACKET_ENTITY_BATCH,
+                    "enter": enters,
+                    "leave": leaves,
+                })
+
+    async def flush_positions(self):
+        """
+        A cada REMOTE_UPDATE_INTERVAL, envia a última posição de cada entidade a quem a vê.
+        Entidades distantes do observador só entram a cada N lotes (UpdateTiers); as que
+        ficam para depois continuam pendentes, sempre com a posição mais nova.
+        """
+        now = time.monotonic()
+        if now < self._next_position_flush:
+            return
+        self._next_position_flush = now + REMOTE_UPDATE_INTERVAL
+        self._position_flushes += 1
+        tiers = self.update_tiers
+
+        # Mesmo pacote para vários jogadores: codificado uma vez só
+        recipients = {}  # {id(pacote): (pacote, [writers])}
+        for player_id in self.player_entity_map.values():
+            viewport = self.world.get_component(player_id, ViewportComponent)
+            net = self.world.get_component(player_id, NetworkComponent)
+            pos = self.world.get_component(player_id, PositionComponent)
+            if not viewport or not net or not pos or not viewport.pending_positions:
+                continue
+            pending, viewport.pending_positions = viewport.pending_positions, {}
+            for entity_id, packet in pending.items():
+                if entity_id not in viewport.last_sent_entities:
+                    continue
+                x, y = packet["x"], packet["y"]
+                distance = max(abs(x - pos.x), abs(y - pos.y))
+                if not tiers.is_due(self._position_flushes, entity_id, distance,
+                                    viewport.sent_positions.get(entity_id), x, y):
+                    viewport.pending_positions[entity_id] = packet
+                    continue
+                viewport.sent_positions[entity_id] = (x, y)
+                recipients.setdefault(id(packet), (packet, []))[1].append(net.writer)
+
+        for packet, writers in recipients.values():
+            await self.network_manager.send_packet_to_many(writers, packet)
+
+    async def send_system_message(self, target_entity_id: int, message: str):
+        network_comp = self.world.get_component(target_entity_id, NetworkComponent)
+        if network_comp and network_comp.writer:
+            packet = {
+                "type": PACKET_SYSTEM_MESSAGE,
+                "content": message
+            }
+            await self.network_manager.send_packet(network_comp.writer, packet)
+
+    async def _receive_initial_aoi(self, entity_id, writer):
+            """
+            Envia visão inicial do mapa para o jogador recém-chegado, usando o índice espacial.
+            """
+            pos = self.world.get_component(entity_id, PositionComponent)
+            viewport = self.world.get_component(entity_id, ViewportComponent)
+
+            if not pos or not viewport:
+                return
+
+            visible = []
+            for other_id, _ in self.world.get_entities_near(pos.x, pos.y, viewport.radius):
+                if other_id == entity_id:
+                    continue
+                visible.append(packet_builder.serialize_entity(self.world, other_id))
+
+            # Atualiza o last_sent_entities do NOVO jogador com quem ele VÊ.
+            viewport.last_sent_entities = set(e.get("id") or e.get("entity_id") for e in visible)
+            for other_id in viewport.last_sent_entities:
+                self.observers.setdefault(other_id, set()).add(entity_id)
+
+            # Visão inicial inteira num único pacote
+            await self.network_manager.send_packet(writer, {
+                "type": PACKET_ENTITY_BATCH,
+                "enter": visible,
+                "leave": [],
+            })
+
+    # --- Consultas ---
+
+    def writers_near(self, entity_id: int) -> list:
+        """Writers dos jogadores dentro do raio de visão da entidade (índice espacial)."""
+        pos = self.world.get_component(entity_id, PositionComponent)
+        viewport = self.world.get_component(entity_id, ViewportComponent)
+        if not pos:
+            return []
+        radius = viewport.radius if viewport else A_O_I_RANGE
+        writers = []
+        for other_id, _ in self.world.get_entities_near(pos.x, pos.y, radius):
+            net = self.world.get_component(other_id, NetworkComponent)
+            if net and net.writer:
+                writers.append(net.writer)
+        return writers
+
+    def player_writers(self) -> list:
+        writers = []
+        for player_id in self.player_entity_map.values():
+            net = self.world.get_component(player_id, NetworkComponent)
+            if net and net.writer:
+                writers.append(net.writer)
+        return writers
+
+    def count_entities_by_type(self) -> dict:
+        counts = {}
+        for _, (type_comp,) in self.world.get_components_of_type(TypeComponent):
+            key = (type_comp.entity_type,)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def get_type_comp(self, entity_id: int):
+        type_comp = self.world.get_component(entity_id, TypeComponent)
+        if type_comp:
+            return type_comp
+
+        return None
+
+    def is_player(self, entity_id: int) -> bool:
+        type_comp = self.get_type_comp(entity_id)
+        return type_comp and type_comp.entity_type == 'player'
+
+    def is_monster(self, entity_id: int) -> bool:
+        type_comp = self.get_type_comp(entity_id)
+        return type_comp and type_comp.entity_type == 'monster'
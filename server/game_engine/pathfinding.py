@@ -0,0 +1,199 @@
+"""
+Pathfinding na grade de tiles do GameMap (A*, 8 direções, sem cortar quinas).
+
+As buscas não bloqueiam o tick: find_path só registra o pedido e Pathfinder.run()
+expande no máximo PATHFINDING_NODE_BUDGET nós por tick, somando todas as buscas do mapa.
+Pedidos iguais (mesma célula de origem e de destino) compartilham a mesma busca, e os
+caminhos prontos ficam num cache LRU que é descartado quando GameMap.revision muda.
+Cada solicitante (ex.: o id do monstro) tem no máximo uma busca pendente: pedir outra
+(origem ou destino mudou de tile) descarta a anterior se ninguém mais espera por ela.
+"""
+import heapq
+import math
+from collections import OrderedDict
+
+from shared.constants import PATH_CACHE_SIZE, PATHFINDING_MAX_NODES, PATHFINDING_NODE_BUDGET
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+SQRT2 = math.sqrt(2)
+
+# (dx, dy, custo)
+NEIGHBOURS = (
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2),
+)
+
+class PathSearch:
+    """Estado de uma busca A* em andamento (índices de tile: y * largura + x)."""
+    __slots__ = ('start', 'goal', 'goal_x', 'goal_y', 'open', 'g', 'came_from', 'expanded', 'requesters')
+
+    def __init__(self, start: int, goal: int, width: int):
+        self.start = start
+        self.goal = goal
+        self.goal_x, self.goal_y = goal % width, goal // width
+        self.open = [(0.0, 0.0, start)]   # (f, g, índice)
+        self.g = {start: 0.0}
+        self.came_from = {start: -1}
+        self.expanded = 0
+        self.requesters = set()
+
+class Pathfinder:
+    def __init__(self, game_map, node_budget: int = PATHFINDING_NODE_BUDGET,
+                 max_nodes: int = PATHFINDING_MAX_NODES, cache_size: int = PATH_CACHE_SIZE):
+        self.map = game_map
+        self.node_budget = node_budget
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+        self.cache = OrderedDict()      # {(origem, destino): [(x, y), ...]}; [] = sem caminho
+        self.searches = OrderedDict()   # {(origem, destino): PathSearch}, atendidas em ordem de chegada
+        self.pending = {}               # {solicitante: (origem, destino)} da busca que ele espera
+        self.revision = game_map.revision
+
+    def find_path(self, start_x: float, start_y: float, goal_x: float, goal_y: float, requester=None) -> list | None:
+        """
+        Waypoints (centros de tile) de (start_x, start_y) até o tile de (goal_x, goal_y).
+        None enquanto a busca não terminou (chame de novo nos próximos ticks);
+        lista vazia quando não há caminho. Com `requester`, este pedido substitui a busca
+        pendente anterior dele.
+        """
+        self._check_revision()
+        width = self.map.MAP_WIDTH
+        start = self._tile_index(start_x, start_y)
+        goal = self._tile_index(goal_x, goal_y)
+        key = (start, goal)
+        if requester is not None and self.pending.get(requester, key) != key:
+            self.release(requester)
+        if start is None or goal is None or not self.map.walkable_plane[goal]:
+            return []
+        if start == goal:
+            return [(goal % width + 0.5, goal // width + 0.5)]
+
+        path = self.cache.get(key)
+        if path is not None:
+            self.cache.move_to_end(key)
+            return path
+        search = self.searches.get(key)
+        if search is None:
+            search = self.searches[key] = PathSearch(start, goal, width)
+        search.requesters.add(requester)  # None: pedido anônimo, a busca só termina quando acha
+        if requester is not None:
+            self.pending[requester] = key
+        return None
+
+    def release(self, requester):
+        """Esquece a busca pendente de `requester`; ela some se mais ninguém espera por ela."""
+        key = self.pending.pop(requester, None)
+        search = self.searches.get(key) if key is not None else None
+        if search is None:
+            return
+        search.requesters.discard(requester)
+        if not search.requesters:
+            del self.searches[key]
+
+    def run(self, budget: int | None = None) -> int:
+        """Avança as buscas pendentes até gastar o orçamento de nós do tick. Retorna os nós usados."""
+        self._check_revision()
+        budget = self.node_budget if budget is None else budget
+        total = 0
+        while self.searches and total < budget:
+            key, search = next(iter(self.searches.items()))
+            path, used = self._expand(search, budget - total)
+            total += used
+            if path is None:
+                continue
+            del self.searches[key]
+            for requester in search.requesters:
+                self.pending.pop(requester, None)
+            self._store(key, path)
+        return total
+
+    def invalidate(self):
+        if self.cache or self.searches:
+            logger.info(f"Map '{self.map.MAP_NAME}' changed: dropping {len(self.cache)} cached paths and {len(self.searches)} searches.")
+        self.cache.clear()
+        self.searches.clear()
+        self.pending.clear()
+        self.revision = self.map.revision
+
+    # --- Auxiliares ---
+
+    def _check_revision(self):
+        if self.revision != self.map.revision:
+            self.invalidate()
+
+    def _tile_index(self, x: float, y: float) -> int | None:
+        tile_x, tile_y = int(x), int(y)
+        if not (0 <= tile_x < self.map.MAP_WIDTH and 0 <= tile_y < self.map.MAP_HEIGHT):
+            return None
+        return tile_y * self.map.MAP_WIDTH + tile_x
+
+    def _store(self, key: tuple, path: list):
+        self.cache[key] = path
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _expand(self, search: PathSearch, budget: int) -> tuple[list | None, int]:
+        """Expande até `budget` nós. Retorna (caminho ou None se ainda em andamento, nós usados)."""
+        walkable = self.map.walkable_plane
+        width, height = self.map.MAP_WIDTH, self.map.MAP_HEIGHT
+        open_heap, g_score, came_from = search.open, search.g, search.came_from
+        goal, goal_x, goal_y = search.goal, search.goal_x, search.goal_y
+        used = 0
+
+        while open_heap and used < budget:
+            _, g, current = heapq.heappop(open_heap)
+            if g > g_score[current]:
+                continue  # entrada velha no heap
+            if current == goal:
+                return self._reconstruct(came_from, goal, width), used
+            used += 1
+            search.expanded += 1
+            if search.expanded > self.max_nodes:
+                return [], used
+
+            x, y = current % width, current // width
+            for dx, dy, cost in NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbour = ny * width + nx
+                if not walkable[neighbour]:
+                    continue
+                # Diagonal só com os dois lados livres (não corta quina de obstáculo)
+                if dx and dy and not (walkable[y * width + nx] and walkable[ny * width + x]):
+                    continue
+                tentative = g + cost
+                if tentative < g_score.get(neighbour, math.inf):
+                    g_score[neighbour] = tentative
+                    came_from[neighbour] = current
+                    # Heurística octil (admissível com os custos acima)
+                    hx, hy = abs(nx - goal_x), abs(ny - goal_y)
+                    h = max(hx, hy) + (SQRT2 - 1) * min(hx, hy)
+                    heapq.heappush(open_heap, (tentative + h, tentative, neighbour))
+
+        if not open_heap:
+            return [], used
+        return None, used
+
+    @staticmethod
+    def _reconstruct(came_from: dict, goal: int, width: int) -> list:
+        """Centros dos tiles do caminho (sem o de origem), só nos pontos onde a direção muda."""
+        cells = []
+        current = goal
+        while came_from[current] != -1:
+            cells.append(current)
+            current = came_from[current]
+        cells.reverse()
+
+        waypoints = []
+        previous, direction = current, None
+        for index, cell in enumerate(cells):
+            step = cell - previous
+            if index and step == direction:
+                waypoints[-1] = cell  # mesma direção: estende o segmento
+            else:
+                waypoints.append(cell)
+            previous, direction = cell, step
+        return [(cell % width + 0.5, cell // width + 0.5) for cell in waypoints]
@@ -0,0 +1,76 @@
+import math
+
+class SpatialGrid:
+    """
+    Índice espacial em grade uniforme: cada entidade com posição fica registrada
+    na célula (floor(x / cell_size), floor(y / cell_size)). As consultas são
+    quadradas (mesma métrica da AOI: |dx| <= r e |dy| <= r).
+
+    Entidades inseridas ou que trocaram de célula ficam em `crossed` até take_crossed():
+    é o que a AOI incremental (MapInstance.update_visibility) reavalia a cada tick.
+    """
+    def __init__(self, cell_size: float = 4.0):
+        self.cell_size = cell_size
+        self.cells = {}         # {(cx, cy): set(entity_id)}
+        self.entity_cells = {}  # {entity_id: (cx, cy)}
+        self.crossed = set()
+
+    def cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, entity_id: int, x: float, y: float):
+        if entity_id in self.entity_cells:
+            self.move(entity_id, x, y)
+            return
+        cell = self.cell_of(x, y)
+        self.entity_cells[entity_id] = cell
+        self.cells.setdefault(cell, set()).add(entity_id)
+        self.crossed.add(entity_id)
+
+    def move(self, entity_id: int, x: float, y: float) -> bool:
+        """Atualiza a célula da entidade. Retorna True se ela mudou de célula."""
+        new_cell = self.cell_of(x, y)
+        old_cell = self.entity_cells.get(entity_id)
+        if old_cell == new_cell:
+            return False
+        if old_cell is not None:
+            self._discard(entity_id, old_cell)
+        self.entity_cells[entity_id] = new_cell
+        self.cells.setdefault(new_cell, set()).add(entity_id)
+        self.crossed.add(entity_id)
+        return True
+
+    def remove(self, entity_id: int):
+        cell = self.entity_cells.pop(entity_id, None)
+        self.crossed.discard(entity_id)
+        if cell is not None:
+            self._discard(entity_id, cell)
+
+    def _discard(self, entity_id: int, cell: tuple[int, int]):
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(entity_id)
+            if not members:
+                del self.cells[cell]
+
+    def take_crossed(self) -> set:
+        """Entidades que entraram ou trocaram de célula desde a última chamada."""
+        crossed, self.crossed = self.crossed, set()
+        return crossed
+
+    def query_radius(self, x: float, y: float, radius: float):
+        """
+        Gera os ids das entidades nas células que cobrem o quadrado de lado 2 * radius
+        centrado em (x, y). É uma fase ampla: quem precisa da distância exata filtra depois.
+        """
+        min_cx, min_cy = self.cell_of(x - radius, y - radius)
+        max_cx, max_cy = self.cell_of(x + radius, y + radius)
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                members = cells.get((cx, cy))
+                if members:
+                    yield from members
+
+    def __len__(self):
+        return len(self.entity_cells)
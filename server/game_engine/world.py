@@ -1,9 +1,18 @@
+from server.game_engine.collision.shapes import half_extent
+from server.game_engine.components.collision import CollisionComponent
+from server.game_engine.components.position import PositionComponent
+from server.game_engine.spatial_grid import SpatialGrid
+from shared.constants import SPATIAL_CELL_SIZE
+
 class World:
-    def __init__(self):
+    def __init__(self, cell_size: float = SPATIAL_CELL_SIZE):
         self.next_entity_id = 1
         self.entities = {}  # {entity_id: {ComponentType: ComponentInstance}}
         # Ex: {1: {PositionComponent: PositionComponent(0,0), NetworkComponent: NetworkComponent(writer, username)}}
-        
+        self.spatial_index = SpatialGrid(cell_size)
+        # Maior meia-extensão de collider já vista: margem das consultas de colisão (só cresce)
+        self.max_collider_half_extent = 0.0
+
     def create_entity(self):
         entity_id = self.next_entity_id
         self.next_entity_id += 1
@@ -15,21 +24,47 @@ class World:
             raise ValueError(f"Entity ID {entity_id} does not exist.")
         component_type = type(component)
         self.entities[entity_id][component_type] = component
-    
+        if component_type is PositionComponent:
+            self.spatial_index.insert(entity_id, component.x, component.y)
+        elif component_type is CollisionComponent:
+            self.max_collider_half_extent = max(self.max_collider_half_extent, half_extent(component.shape))
+
     def get_component(self, entity_id: int, component_type):
         return self.entities.get(entity_id, {}).get(component_type, None)
-    
+
+    def move_entity(self, entity_id: int, x: float, y: float) -> bool:
+        """
+        Atualiza a posição da entidade mantendo o índice espacial em dia.
+        Toda mudança de PositionComponent deve passar por aqui.
+        Retorna True se a entidade mudou de célula no índice.
+        """
+        pos_comp = self.get_component(entity_id, PositionComponent)
+        if pos_comp is None:
+            return False
+        pos_comp.x = x
+        pos_comp.y = y
+        return self.spatial_index.move(entity_id, x, y)
+
     def remove_entity(self, entity_id: int):
         if entity_id in self.entities:
             del self.entities[entity_id]
-            
+            self.spatial_index.remove(entity_id)
+
     def get_entities_with_components(self, component_types: tuple):
         for entity_id, components in self.entities.items():
             if all(comp_type in components for comp_type in component_types):
                 yield entity_id, [components[comp_type] for comp_type in component_types]
-                
+
     def get_components_of_type(self, component_type):
         for entity_id, components in self.entities.items():
             if component_type in components:
                 component_instance = components[component_type]
-                yield entity_id, (component_instance,)
\ No newline at end of file
+                yield entity_id, (component_instance,)
+
+    def get_entities_near(self, x: float, y: float, radius: float):
+        """Entidades com posição dentro do quadrado |dx| <= radius, |dy| <= radius."""
+        entities = self.entities
+        for entity_id in self.spatial_index.query_radius(x, y, radius):
+            pos = entities[entity_id].get(PositionComponent)
+            if pos is not None and abs(pos.x - x) <= radius and abs(pos.y - y) <= radius:
+                yield entity_id, pos
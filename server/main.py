@@ -1,6 +1,6 @@
-import asyncio
 from shared.logger import get_logger
 from server.core.application import Application
+from server.core import event_loop
 
 logger = get_logger(__name__)
 
@@ -18,7 +18,7 @@ async def main():
           
 def sync_main():
     try:
-        asyncio.run(main())
+        event_loop.run(main())
     except KeyboardInterrupt:
         # Se Ctrl+C for pressionado antes do asyncio.run() iniciar, ele é capturado aqui
         pass
@@ -0,0 +1,110 @@
+"""
+Comandos compactos que o gateway envia à simulação (OP_COMMAND).
+
+O gateway decodifica o JSON do cliente, valida os campos e reduz o pacote a
+u8 código + corpo binário; a simulação expande de volta para o mesmo dict que o
+engine sempre recebeu, sem passar por json.loads. Pacotes inválidos nem saem do gateway.
+"""
+import math
+import struct
+
+from shared.protocol import (
+    PACKET_CHAT_MESSAGE,
+    PACKET_DAMAGE,
+    PACKET_EVOLVE,
+    PACKET_ITEM_USE,
+    PACKET_MOVE,
+)
+
+MAX_CHAT_LENGTH = 256
+MAX_NAME_LENGTH = 64
+
+CMD_MOVE_DELTA = 1   # '<ff' dx, dy
+CMD_MOVE_TO = 2      # '<ff' x, y
+CMD_DAMAGE = 3       # '<I' target_entity_id
+CMD_CHAT = 4         # utf-8 content
+CMD_EVOLVE = 5       # utf-8 class_name
+CMD_ITEM_USE = 6     # sem corpo
+CMD_MOVE_DELTA_SEQ = 7  # '<ffI' dx, dy, seq (cliente com predição)
+
+_PAIR = struct.Struct('<ff')
+_PAIR_SEQ = struct.Struct('<ffI')
+_ENTITY_ID = struct.Struct('<I')
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def _text(value, max_length: int) -> bool:
+    return isinstance(value, str) and 0 < len(value) <= max_length
+
+def compact_packet(packet: dict) -> bytes | None:
+    """Pacote do cliente -> comando compacto. None se o pacote for inválido."""
+    pkt_type = packet.get('type')
+
+    if pkt_type == PACKET_MOVE:
+        x, y = packet.get('x'), packet.get('y')
+        if x is not None or y is not None:
+            if _number(x) and _number(y):
+                return bytes((CMD_MOVE_TO,)) + _PAIR.pack(x, y)
+            return None
+        dx, dy = packet.get('dx'), packet.get('dy')
+        if not (_number(dx) and _number(dy)):
+            return None
+        seq = packet.get('seq')
+        if seq is None:
+            return bytes((CMD_MOVE_DELTA,)) + _PAIR.pack(dx, dy)
+        if isinstance(seq, int) and not isinstance(seq, bool) and 0 <= seq <= 0xFFFFFFFF:
+            return bytes((CMD_MOVE_DELTA_SEQ,)) + _PAIR_SEQ.pack(dx, dy, seq)
+        return None
+
+    if pkt_type == PACKET_DAMAGE:
+        target = packet.get('target_entity_id')
+        if isinstance(target, int) and not isinstance(target, bool) and 0 < target <= 0xFFFFFFFF:
+            return bytes((CMD_DAMAGE,)) + _ENTITY_ID.pack(target)
+        return None
+
+    if pkt_type == PACKET_CHAT_MESSAGE:
+        content = packet.get('content')
+        if isinstance(content, str):
+            content = content.strip()
+            if _text(content, MAX_CHAT_LENGTH):
+                return bytes((CMD_CHAT,)) + content.encode('utf-8')
+        return None
+
+    if pkt_type == PACKET_EVOLVE:
+        class_name = packet.get('class_name')
+        if _text(class_name, MAX_NAME_LENGTH):
+            return bytes((CMD_EVOLVE,)) + class_name.encode('utf-8')
+        return None
+
+    if pkt_type == PACKET_ITEM_USE:
+        return bytes((CMD_ITEM_USE,))
+
+    return None
+
+def expand_command(payload) -> dict | None:
+    """Comando compacto -> dict no formato dos pacotes do cliente."""
+    view = memoryview(payload)
+    if not view:
+        return None
+    code, body = view[0], view[1:]
+
+    if code == CMD_MOVE_DELTA:
+        dx, dy = _PAIR.unpack(body)
+        return {'type': PACKET_MOVE, 'dx': dx, 'dy': dy}
+    if code == CMD_MOVE_DELTA_SEQ:
+        dx, dy, seq = _PAIR_SEQ.unpack(body)
+        return {'type': PACKET_MOVE, 'dx': dx, 'dy': dy, 'seq': seq}
+    if code == CMD_MOVE_TO:
+        x, y = _PAIR.unpack(body)
+        return {'type': PACKET_MOVE, 'x': x, 'y': y}
+    if code == CMD_DAMAGE:
+        (target,) = _ENTITY_ID.unpack(body)
+        return {'type': PACKET_DAMAGE, 'target_entity_id': target}
+    if code == CMD_CHAT:
+        return {'type': PACKET_CHAT_MESSAGE, 'content': bytes(body).decode('utf-8')}
+    if code == CMD_EVOLVE:
+        return {'type': PACKET_EVOLVE, 'class_name': bytes(body).decode('utf-8')}
+    if code == CMD_ITEM_USE:
+        return {'type': PACKET_ITEM_USE}
+    return None
@@ -0,0 +1,143 @@
+"""
+Processo gateway (SERVER_ROLE=gateway): termina as conexões dos clientes, autentica,
+decodifica e valida os pacotes e repassa comandos compactos ao processo de simulação
+por um socket Unix. Recebe de volta um lote de bytes pronto por cliente por tick.
+
+Vários gateways podem atender a mesma porta (SO_REUSEPORT) e falar com a mesma simulação.
+Com DB_BACKEND=memory cada processo tem o seu armazenamento: use Postgres para que
+logins e estado dos jogadores sejam os mesmos em todos eles.
+"""
+import asyncio
+import itertools
+
+from server.core.metrics import PACKETS_OUT, BYTES_OUT
+from server.network.commands import compact_packet
+from server.network.ipc import (
+    IpcChannel, unpack_typed, pack_typed,
+    OP_CONNECT, OP_DISCONNECT, OP_COMMAND, OP_BROADCAST_REQUEST,
+    OP_SEND_BATCH, OP_BROADCAST, OP_CLOSE, NO_CONNECTION,
+)
+from server.network.remote import unpack_batch
+from server.network.server import ServerSocket
+from shared.logger import get_logger, get_rate_limited_logger
+from shared.protocol import PACKET_SYSTEM_MESSAGE, encode_message
+
+logger = get_logger(__name__)
+invalid_log = get_rate_limited_logger(f"{__name__}.invalid")
+
+CONNECT_RETRY_INTERVAL = 0.5
+
+class GatewayServerSocket(ServerSocket):
+    """ServerSocket cujos broadcasts passam pela simulação para chegar a todos os gateways."""
+    async def broadcast_system_message(self, message: str, exclude_writer=None):
+        await self.game_engine.request_broadcast({'type': PACKET_SYSTEM_MESSAGE, 'content': message}, exclude_writer)
+
+    async def broadcast_game_update(self, packet: dict, exclude_writer=None):
+        await self.game_engine.request_broadcast(packet, exclude_writer)
+
+class GatewayLink:
+    """Ocupa o lugar do GameEngine para o ServerSocket do gateway."""
+    def __init__(self, socket_path: str, network_manager: ServerSocket):
+        self.socket_path = socket_path
+        self.network_manager = network_manager
+        self.channel = None
+        self._connected = asyncio.Event()
+        self._next_conn_id = itertools.count(1)
+        self.conn_ids = {}       # {writer: conn_id}
+        self.connections = {}    # {conn_id: writer}
+        self.player_conns = {}   # {username: conn_id}
+
+    async def start(self):
+        while self.channel is None:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                self.channel = IpcChannel(reader, writer)
+            except (FileNotFoundError, ConnectionRefusedError):
+                logger.info(f"Waiting for the simulation process at {self.socket_path}...")
+                await asyncio.sleep(CONNECT_RETRY_INTERVAL)
+        self._connected.set()
+        logger.info(f"Gateway connected to the simulation process at {self.socket_path}.")
+        await self._read_simulation()
+
+    # --- Interface usada pelo ServerSocket ---
+
+    async def player_connected(self, writer, username):
+        await self._connected.wait()
+        conn_id = next(self._next_conn_id)
+        self.conn_ids[writer] = conn_id
+        self.connections[conn_id] = writer
+        self.player_conns[username] = conn_id
+        self.channel.send_json(OP_CONNECT, conn_id, {'username': username})
+        await self.channel.drain()
+
+    async def player_disconnected(self, username):
+        conn_id = self.player_conns.pop(username, None)
+        if conn_id is None:
+            return None, None
+        writer = self.connections.pop(conn_id, None)
+        self.conn_ids.pop(writer, None)
+        self.channel.send(OP_DISCONNECT, conn_id)
+        await self.channel.drain()
+        return conn_id, username
+
+    async def process_network_packet(self, writer, packet):
+        conn_id = self.conn_ids.get(writer)
+        if conn_id is None:
+            return
+        command = compact_packet(packet)
+        if command is None:
+            invalid_log.warning("Dropped invalid %s packet from connection %s.", packet.get('type'), conn_id)
+            return
+        self.channel.send(OP_COMMAND, conn_id, command)
+        await self.channel.drain()
+
+    async def request_broadcast(self, packet: dict, exclude_writer=None):
+        await self._connected.wait()
+        exclude = self.conn_ids.get(exclude_writer, NO_CONNECTION)
+        self.channel.send(OP_BROADCAST_REQUEST, exclude, pack_typed(packet.get('type'), encode_message(packet)))
+        await self.channel.drain()
+
+    def count_entities_by_type(self) -> dict:
+        # Entidades vivem na simulação; as métricas delas são expostas lá
+        return {}
+
+    # --- Frames vindos da simulação ---
+
+    async def _read_simulation(self):
+        while True:
+            frame = await self.channel.recv()
+            if frame is None:
+                logger.error("Simulation process closed the gateway channel. Shutting the gateway down.")
+                await self.network_manager.shutdown()
+                return
+            op, conn_id, payload = frame
+            try:
+                if op == OP_SEND_BATCH:
+                    writer = self.connections.get(conn_id)
+                    if writer is not None and not writer.is_closing():
+                        count, message = unpack_batch(payload)
+                        writer.write(message)
+                        PACKETS_OUT.inc('BATCHED', amount=count)
+                        BYTES_OUT.inc(amount=len(message))
+                elif op == OP_BROADCAST:
+                    packet_type, message = unpack_typed(payload)
+                    exclude_writer = self.connections.get(conn_id)
+                    recipients = 0
+                    for writer in list(self.connections.values()):
+                        if writer is not exclude_writer and not writer.is_closing():
+                            writer.write(message)
+                            recipients += 1
+                    self.network_manager._record_outgoing({'type': packet_type}, len(message), recipients)
+                elif op == OP_CLOSE:
+                    writer = self.connections.get(conn_id)
+                    if writer is not None:
+                        # O loop de leitura do ServerSocket percebe o fechamento e faz a limpeza
+                        writer.close()
+                else:
+                    logger.warning(f"Unknown op {op} from the simulation process.")
+            except Exception as e:
+                logger.error(f"Error handling op {op} from the simulation process: {e}")
+
+    async def shutdown(self):
+        if self.channel is not None:
+            self.channel.close()
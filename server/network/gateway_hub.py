@@ -0,0 +1,147 @@
+"""
+Lado da simulação no modo com gateways (SERVER_ROLE=simulation): aceita os gateways
+num socket Unix e serve de interface de rede para o GameEngine. O que o engine envia a
+cada cliente é acumulado e sai num lote por cliente por tick (RemoteNetworkManager.flush).
+"""
+import asyncio
+import json
+import os
+
+from server.network.commands import expand_command
+from server.network.ipc import (
+    IpcChannel,
+    OP_CONNECT, OP_DISCONNECT, OP_COMMAND, OP_BROADCAST_REQUEST,
+    OP_BROADCAST, OP_CLOSE,
+)
+from server.network.remote import RemoteNetworkManager, RemoteWriter
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+class GatewayHub(RemoteNetworkManager):
+    def __init__(self, socket_path: str):
+        super().__init__()
+        self.socket_path = socket_path
+        self.game_engine = None
+        self.server = None
+        self.channels = set()
+        self.connections = {}   # {(channel, conn_id): RemoteWriter}
+        self._pending = {}      # {(channel, conn_id): Task} conexão/desconexão em andamento
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self._handle_gateway, self.socket_path)
+        logger.info(f"Simulation listening for gateways at {self.socket_path}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_gateway(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        channel = IpcChannel(reader, writer)
+        self.channels.add(channel)
+        logger.info(f"Gateway connected ({len(self.channels)} total).")
+        try:
+            while True:
+                frame = await channel.recv()
+                if frame is None:
+                    break
+                op, conn_id, payload = frame
+                try:
+                    await self._handle_frame(channel, op, conn_id, payload)
+                except Exception as e:
+                    logger.error(f"Error handling op {op} from gateway: {e}")
+        finally:
+            self.channels.discard(channel)
+            # Gateway caiu: todos os clientes dele saem do jogo
+            for key in [key for key in self.connections if key[0] is channel]:
+                await self._disconnect(self.connections.get(key), key)
+            channel.close()
+            logger.info(f"Gateway disconnected ({len(self.channels)} left).")
+
+    async def _handle_frame(self, channel: IpcChannel, op: int, conn_id: int, payload: bytes):
+        key = (channel, conn_id)
+
+        if op == OP_COMMAND:
+            packet = expand_command(payload)
+            if packet is None:
+                return
+            await self._run_in_order(key, lambda: self._command(key, packet))
+
+        elif op == OP_CONNECT:
+            username = json.loads(payload)['username']
+            self._start_in_order(key, lambda: self._connect(channel, conn_id, username))
+
+        elif op == OP_DISCONNECT:
+            self._start_in_order(key, lambda: self._disconnect(self.connections.get(key), key))
+
+        elif op == OP_BROADCAST_REQUEST:
+            await self._broadcast_encoded(payload, self.connections.get(key))
+
+        else:
+            logger.warning(f"Unknown op {op} from gateway.")
+
+    # Uma conexão lenta (carregar/salvar no banco) não pode travar os outros clientes do
+    # mesmo gateway, mas os frames de cada conexão precisam ser tratados em ordem.
+    def _start_in_order(self, key, action):
+        previous = self._pending.get(key)
+        task = asyncio.create_task(self._after(previous, action))
+        self._pending[key] = task
+        task.add_done_callback(lambda t: self._pending.pop(key, None) if self._pending.get(key) is t else None)
+
+    async def _run_in_order(self, key, action):
+        if key in self._pending:
+            self._start_in_order(key, action)
+        else:
+            await action()
+
+    @staticmethod
+    async def _after(previous, action):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await action()
+        except Exception as e:
+            logger.error(f"Error handling gateway connection event: {e}")
+
+    async def _connect(self, channel: IpcChannel, conn_id: int, username: str):
+        old_writer = self.logged_in_users.get(username)
+        if old_writer is not None:
+            # Mesmo usuário logado por outro gateway (ou conexão): derruba a sessão antiga
+            logger.warning(f"User '{username}' logged in again; closing the previous session.")
+            old_key = (old_writer.channel, old_writer.conn_id)
+            await self._disconnect(old_writer, old_key)
+            old_writer.channel.send(OP_CLOSE, old_writer.conn_id)
+
+        writer = self.attach(conn_id, channel, username)
+        self.connections[(channel, conn_id)] = writer
+        await self.game_engine.player_connected(writer, username)
+
+    async def _command(self, key, packet: dict):
+        writer = self.connections.get(key)
+        if writer is not None:
+            await self.game_engine.process_network_packet(writer, packet)
+
+    async def _disconnect(self, writer: RemoteWriter | None, key):
+        if writer is None or self.connections.get(key) is not writer:
+            return
+        del self.connections[key]
+        username = self.get_user_by_writer(writer)
+        if username is not None:
+            await self.game_engine.player_disconnected(username)
+        self.detach(writer)
+
+    async def _broadcast_encoded(self, payload: bytes, exclude_writer: RemoteWriter | None):
+        for channel in list(self.channels):
+            channel.send(OP_BROADCAST, self.exclude_conn_id(exclude_writer, channel), payload)
+        for channel in list(self.channels):
+            await channel.drain()
+
+    async def shutdown(self):
+        for channel in list(self.channels):
+            channel.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("Gateway hub has been shut down.")
@@ -0,0 +1,84 @@
+"""
+Canal entre o processo de frente (dono dos sockets dos clientes) e os workers que
+rodam as instâncias de mapa.
+
+Também é o canal entre gateways e o processo de simulação (server/network/gateway.py).
+
+Cada frame é: header struct FRAME_HEADER (tamanho do payload, op, conn_id) + payload.
+Os pacotes de saída viajam já codificados no formato de fio do cliente (encode_message, com frame),
+então quem tem o socket só copia bytes; mensagens de controle levam JSON no payload.
+"""
+import asyncio
+import json
+import socket
+import struct
+
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_HEADER = '<IBI'
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER)
+
+# Frente -> worker
+OP_CONNECT = 1        # conn_id, {"username", "player_data"}
+OP_PACKET = 2         # conn_id, pacote do cliente (JSON)
+OP_DISCONNECT = 3     # conn_id
+OP_TRANSFER_IN = 4    # conn_id, {"username", "state"}: jogador vindo de outro worker
+OP_RELOAD = 5         # recarrega metadados (SIGHUP na frente)
+OP_COMMAND = 6        # conn_id, comando compacto já validado (server/network/commands.py)
+OP_BROADCAST_REQUEST = 7  # gateway pede um broadcast para todos os gateways (payload de OP_BROADCAST)
+
+# Worker -> frente
+OP_SEND_BATCH = 10    # conn_id, u16 nº de pacotes + pacotes codificados (server/network/remote.py)
+OP_BROADCAST = 11     # conn_id a excluir (0 = nenhum), u8 tamanho do tipo + tipo + pacote codificado
+OP_PLAYER_LEFT = 12   # conn_id, {"username", "state"}: estado a persistir
+OP_HANDOFF = 13       # conn_id, {"username", "map_name", "state"}
+OP_STATS = 14         # {"entities": {entity_type: n}}
+OP_CLOSE = 15         # conn_id: derruba a conexão do cliente (login duplicado em outro gateway)
+OP_WHISPER = 16       # conn_id de quem mandou, {"target", "packet"}: sussurro para jogador de outro worker
+
+NO_CONNECTION = 0
+
+def pack_typed(packet_type: str, encoded_message: bytes) -> bytes:
+    """Payload de OP_BROADCAST: o tipo vai junto para as métricas de quem tem os sockets."""
+    type_bytes = (packet_type or 'UNKNOWN').encode('ascii')[:255]
+    return bytes((len(type_bytes),)) + type_bytes + encoded_message
+
+def unpack_typed(payload) -> tuple[str, memoryview]:
+    view = memoryview(payload)
+    type_len = view[0]
+    return bytes(view[1:1 + type_len]).decode('ascii'), view[1 + type_len:]
+
+class IpcChannel:
+    """Uma ponta do socketpair, com envio e leitura de frames."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, sock: socket.socket) -> "IpcChannel":
+        reader, writer = await asyncio.open_connection(sock=sock)
+        return cls(reader, writer)
+
+    def send(self, op: int, conn_id: int = NO_CONNECTION, payload: bytes = b''):
+        self.writer.write(struct.pack(FRAME_HEADER, len(payload), op, conn_id) + payload)
+
+    def send_json(self, op: int, conn_id: int, data: dict):
+        self.send(op, conn_id, json.dumps(data).encode('utf-8'))
+
+    async def drain(self):
+        await self.writer.drain()
+
+    async def recv(self) -> tuple[int, int, bytes] | None:
+        """Próximo frame (op, conn_id, payload), ou None se a outra ponta fechou."""
+        try:
+            header = await self.reader.readexactly(FRAME_HEADER_SIZE)
+            length, op, conn_id = struct.unpack(FRAME_HEADER, header)
+            payload = await self.reader.readexactly(length) if length else b''
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            return None
+        return op, conn_id, payload
+
+    def close(self):
+        self.writer.close()
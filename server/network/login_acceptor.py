@@ -0,0 +1,199 @@
+"""
+Processos de login (LOGIN_ACCEPTORS > 0): aceitam conexões na porta do jogo com
+SO_REUSEPORT, fazem a autenticação (JSON, bcrypt, banco) fora do loop do jogo e passam
+o socket já autenticado para o processo do jogo (SCM_RIGHTS via socket.send_fds).
+
+Cada handoff é uma mensagem num socket Unix SOCK_SEQPACKET:
+struct HANDOFF_HEADER (tamanho do JSON) + JSON {"username"} + bytes que o cliente já
+tinha mandado depois do login e ainda não foram tratados (FramedConnection.take_unread_bytes),
+com o fd anexado.
+
+Com DB_BACKEND=memory cada processo tem o seu armazenamento: uma conta registrada num
+acceptor não existe nos outros nem no processo do jogo. Use Postgres.
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+
+from server.network.server import ServerSocket, tune_transport
+from shared.framing import FramedConnection
+from shared.logger import get_logger, get_rate_limited_logger
+
+logger = get_logger(__name__)
+connection_log = get_rate_limited_logger(f"{__name__}.connections")
+
+HANDOFF_HEADER = '<H'
+HANDOFF_HEADER_SIZE = struct.calcsize(HANDOFF_HEADER)
+MAX_HANDOFF_SIZE = 256 * 1024
+CONNECT_RETRY_INTERVAL = 0.5
+
+def pack_handoff(username: str, leftover: bytes) -> bytes:
+    header = json.dumps({'username': username}).encode('utf-8')
+    return struct.pack(HANDOFF_HEADER, len(header)) + header + leftover
+
+def unpack_handoff(message: bytes) -> tuple[dict, bytes]:
+    (header_len,) = struct.unpack_from(HANDOFF_HEADER, message)
+    header_end = HANDOFF_HEADER_SIZE + header_len
+    return json.loads(message[HANDOFF_HEADER_SIZE:header_end]), message[header_end:]
+
+async def _wait_writable(sock: socket.socket):
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    loop.add_writer(sock, lambda: ready.done() or ready.set_result(None))
+    try:
+        await ready
+    finally:
+        loop.remove_writer(sock)
+
+class LoginAcceptor(ServerSocket):
+    """ServerSocket que só autentica: a sessão segue no processo do jogo."""
+    def __init__(self, host, port, data_payload_size, db_pool, handoff_path: str):
+        super().__init__(host, port, data_payload_size, db_pool, None, reuse_port=True)
+        self.handoff_path = handoff_path
+        self.handoff_sock = None
+        self._send_lock = asyncio.Lock()
+
+    async def start(self):
+        await self._connect_handoff()
+        await super().start()
+
+    async def _connect_handoff(self):
+        loop = asyncio.get_running_loop()
+        while self.handoff_sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, self.handoff_path)
+                self.handoff_sock = sock
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                logger.info(f"Waiting for the game process at {self.handoff_path}...")
+                await asyncio.sleep(CONNECT_RETRY_INTERVAL)
+        # O processo do jogo nunca escreve aqui: legível significa que ele fechou o canal
+        loop.add_reader(self.handoff_sock, self._on_handoff_closed)
+        logger.info(f"Login acceptor connected to the game process at {self.handoff_path}.")
+
+    def _on_handoff_closed(self):
+        asyncio.get_running_loop().remove_reader(self.handoff_sock)
+        logger.error("Game process closed the login handoff channel. Shutting the acceptor down.")
+        asyncio.create_task(self.shutdown())
+
+    async def handle_client(self, writer: FramedConnection):
+        addr = writer.get_extra_info('peername')
+        connection_log.info("New connection from %s. Starting authentication.", addr)
+        # TCP_NODELAY fica no socket e vale também no processo do jogo
+        tune_transport(writer)
+        self.limit_rate(writer)
+        self.pending_logins += 1
+        try:
+            username = await self.handle_authentication(writer)
+            if username:
+                await writer.drain()
+                # Daqui em diante quem lê o socket é o processo do jogo
+                writer.transport.pause_reading()
+                leftover = writer.take_unread_bytes()
+                await self._hand_off(writer.get_extra_info('socket').fileno(), username, leftover)
+                connection_log.info("Handed %s (%s) off to the game process.", username, addr)
+        except Exception as e:
+            logger.error(f"Failed to hand off connection from {addr}: {e}")
+        finally:
+            self.pending_logins -= 1
+            # Fecha só a cópia deste processo; o processo do jogo tem o seu próprio fd
+            writer.close()
+
+    async def _hand_off(self, fd: int, username: str, leftover: bytes):
+        message = pack_handoff(username, leftover)
+        async with self._send_lock:
+            while True:
+                try:
+                    socket.send_fds(self.handoff_sock, [message], [fd])
+                    return
+                except BlockingIOError:
+                    await _wait_writable(self.handoff_sock)
+
+    async def shutdown(self):
+        if self.handoff_sock is not None:
+            asyncio.get_running_loop().remove_reader(self.handoff_sock)
+            self.handoff_sock.close()
+            self.handoff_sock = None
+        await super().shutdown()
+
+class SessionHandoffListener:
+    """Lado do processo do jogo: recebe os sockets autenticados e entrega ao ServerSocket."""
+    def __init__(self, handoff_path: str, server_socket: ServerSocket):
+        self.handoff_path = handoff_path
+        self.server_socket = server_socket
+        self.listen_sock = None
+        self.acceptors = set()
+        self._sessions = set()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        if os.path.exists(self.handoff_path):
+            os.unlink(self.handoff_path)
+        self.listen_sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.listen_sock.bind(self.handoff_path)
+        self.listen_sock.listen()
+        self.listen_sock.setblocking(False)
+        logger.info(f"Game process waiting for login acceptors at {self.handoff_path}")
+        while True:
+            sock, _ = await loop.sock_accept(self.listen_sock)
+            sock.setblocking(False)
+            self.acceptors.add(sock)
+            loop.add_reader(sock, self._on_readable, sock)
+            logger.info(f"Login acceptor connected ({len(self.acceptors)} total).")
+
+    def _on_readable(self, sock: socket.socket):
+        try:
+            message, fds, _, _ = socket.recv_fds(sock, MAX_HANDOFF_SIZE, 1)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Error reading from login acceptor: {e}")
+            message, fds = b'', []
+
+        if not message:
+            self._drop_acceptor(sock)
+            for fd in fds:
+                os.close(fd)
+            return
+        if not fds:
+            logger.warning("Login handoff without a socket; ignoring.")
+            return
+
+        session = asyncio.create_task(self._adopt(message, fds[0]))
+        self._sessions.add(session)
+        session.add_done_callback(self._sessions.discard)
+
+    def _drop_acceptor(self, sock: socket.socket):
+        asyncio.get_running_loop().remove_reader(sock)
+        self.acceptors.discard(sock)
+        sock.close()
+        logger.info(f"Login acceptor disconnected ({len(self.acceptors)} left).")
+
+    async def _adopt(self, message: bytes, fd: int):
+        loop = asyncio.get_running_loop()
+        client_sock = socket.socket(fileno=fd)
+        try:
+            header, leftover = unpack_handoff(message)
+            # A conexão já começa com o que o acceptor leu e não consumiu
+            connection = FramedConnection(self.server_socket.data_payload_size, initial_data=leftover)
+            await loop.create_connection(lambda: connection, sock=client_sock)
+            tune_transport(connection)
+        except Exception as e:
+            logger.error(f"Failed to adopt a session from a login acceptor: {e}")
+            client_sock.close()
+            return
+        await self.server_socket.adopt_session(connection, header['username'])
+
+    async def shutdown(self):
+        for sock in list(self.acceptors):
+            self._drop_acceptor(sock)
+        if self.listen_sock is not None:
+            self.listen_sock.close()
+            self.listen_sock = None
+        if os.path.exists(self.handoff_path):
+            os.unlink(self.handoff_path)
+        logger.info("Login handoff listener has been shut down.")
@@ -0,0 +1,117 @@
+"""
+Proteção contra flood por conexão: token buckets total e por tipo de pacote
+(RATE_LIMIT_TOTAL / RATE_LIMITS) e coalescência de MOVEs relativos de um mesmo lote.
+
+O limitador é consultado pela FramedConnection antes de decodificar cada frame
+(o tipo é lido do início do JSON), então pacote descartado não custa json.loads.
+"""
+import time
+
+from server.core.metrics import PACKETS_RATE_LIMITED, MOVES_COALESCED, FLOOD_DISCONNECTS
+from shared.constants import RATE_LIMIT_TOTAL, RATE_LIMITS, RATE_LIMIT_STRIKES
+from shared.logger import get_logger, get_rate_limited_logger
+from shared.protocol import PACKET_MOVE
+
+logger = get_logger(__name__)
+flood_log = get_rate_limited_logger(f"{__name__}.flood")
+
+STRIKE_WINDOW = 10.0        # segundos para a reserva de descartes se recompor por inteiro
+MAX_COALESCED_MOVES = 10    # MOVEs somados num só, para o deslocamento continuar pequeno
+
+def parse_rate(spec: str) -> tuple[float, float]:
+    """'taxa:rajada' -> (taxa por segundo, rajada). Sem rajada, ela é igual à taxa."""
+    rate, _, burst = spec.partition(':')
+    rate = float(rate)
+    return rate, float(burst) if burst else rate
+
+def parse_limits(spec: str) -> dict:
+    """'MOVE=75:120,CHAT_MESSAGE=1:5' -> {'MOVE': (75.0, 120.0), ...}"""
+    limits = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            pkt_type, rate = item.split('=', 1)
+            limits[pkt_type.strip()] = parse_rate(rate.strip())
+        except ValueError:
+            logger.warning(f"Ignoring invalid RATE_LIMITS entry '{item}'.")
+    return limits
+
+TOTAL_LIMIT = parse_rate(RATE_LIMIT_TOTAL)
+TYPE_LIMITS = parse_limits(RATE_LIMITS)
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> bool:
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens >= cost:
+            self.tokens = tokens - cost
+            return True
+        self.tokens = tokens
+        return False
+
+class ConnectionRateLimiter:
+    """Buckets de uma conexão. on_flood() é chamado uma vez, quando a reserva de descartes acaba."""
+    def __init__(self, addr, on_flood, total_limit=TOTAL_LIMIT, type_limits=TYPE_LIMITS, strikes=RATE_LIMIT_STRIKES):
+        now = time.monotonic()
+        self.addr = addr
+        self.on_flood = on_flood
+        self.type_limits = type_limits
+        self.total = TokenBucket(*total_limit, now)
+        self.buckets = {}
+        self.strikes = TokenBucket(strikes / STRIKE_WINDOW, strikes, now)
+        self.flooding = False
+
+    def admit(self, pkt_type: str | None) -> bool:
+        if self.flooding:
+            return False
+        now = time.monotonic()
+        bucket = self.buckets.get(pkt_type)
+        if bucket is None and pkt_type in self.type_limits:
+            bucket = self.buckets[pkt_type] = TokenBucket(*self.type_limits[pkt_type], now)
+        if self.total.take(now) and (bucket is None or bucket.take(now)):
+            return True
+
+        PACKETS_RATE_LIMITED.inc(pkt_type or 'UNKNOWN')
+        if not self.strikes.take(now):
+            self.flooding = True
+            FLOOD_DISCONNECTS.inc()
+            flood_log.warning("Disconnecting %s for flooding (last packet type: %s).", self.addr, pkt_type)
+            self.on_flood()
+        return False
+
+def _is_relative_move(packet) -> bool:
+    return (
+        isinstance(packet, dict) and packet.get('type') == PACKET_MOVE and 'x' not in packet
+        and isinstance(packet.get('dx'), (int, float)) and isinstance(packet.get('dy'), (int, float))
+    )
+
+def coalesce_moves(packets: list) -> list:
+    """Soma MOVEs relativos consecutivos do lote: uma checagem de colisão em vez de várias."""
+    if len(packets) < 2:
+        return packets
+    result = []
+    merged = 0
+    for packet in packets:
+        if merged < MAX_COALESCED_MOVES and result and _is_relative_move(packet) and _is_relative_move(result[-1]):
+            previous = result[-1]
+            result[-1] = {'type': PACKET_MOVE, 'dx': previous['dx'] + packet['dx'], 'dy': previous['dy'] + packet['dy']}
+            if 'seq' in packet:
+                # O ack do MOVE somado confirma até o último input do grupo
+                result[-1]['seq'] = packet['seq']
+            merged += 1
+        else:
+            merged = 0
+            result.append(packet)
+    if len(result) != len(packets):
+        MOVES_COALESCED.inc(amount=len(packets) - len(result))
+    return result
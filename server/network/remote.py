@@ -0,0 +1,138 @@
+"""
+Clientes remotos: conexões que vivem em outro processo (processo de frente ou gateway)
+e chegam a este por um IpcChannel. O engine usa RemoteNetworkManager exatamente como
+usaria o ServerSocket; os pacotes de cada cliente são acumulados e enviados como um
+único lote (OP_SEND_BATCH) por tick em flush().
+"""
+import abc
+import struct
+
+from server.core.metrics import PACKETS_OUT
+from server.network.ipc import IpcChannel, pack_typed, OP_SEND_BATCH, NO_CONNECTION
+from shared.protocol import PACKET_SYSTEM_MESSAGE, encode_message
+
+BATCH_HEADER = '<H'
+BATCH_HEADER_SIZE = struct.calcsize(BATCH_HEADER)
+MAX_BATCH_PACKETS = 0xFFFF
+
+def unpack_batch(payload) -> tuple[int, memoryview]:
+    """(nº de pacotes, bytes prontos para o socket do cliente) de um OP_SEND_BATCH."""
+    view = memoryview(payload)
+    (count,) = struct.unpack_from(BATCH_HEADER, view)
+    return count, view[BATCH_HEADER_SIZE:]
+
+class RemoteWriter:
+    """Substituto do StreamWriter de um cliente conectado em outro processo."""
+    def __init__(self, conn_id: int, channel: IpcChannel, manager: "RemoteNetworkManager"):
+        self.conn_id = conn_id
+        self.channel = channel
+        self.manager = manager
+        self.closed = False
+        self._buffer = bytearray()
+        self._count = 0
+
+    def write_packet(self, encoded_message: bytes):
+        if self.closed:
+            return
+        if not self._buffer:
+            self.manager._dirty.add(self)
+        self._buffer += encoded_message
+        self._count += 1
+        if self._count == MAX_BATCH_PACKETS:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.channel.send(OP_SEND_BATCH, self.conn_id, struct.pack(BATCH_HEADER, self._count) + self._buffer)
+            self._buffer = bytearray()
+            self._count = 0
+
+    async def drain(self):
+        await self.channel.drain()
+
+    def get_extra_info(self, name, default=None):
+        return ('remote', self.conn_id) if name == 'peername' else default
+
+    def close(self):
+        self.flush()
+        self.closed = True
+
+class RemoteNetworkManager(abc.ABC):
+    """
+    Interface de rede do engine (send_packet, broadcasts, usuários) para clientes remotos.
+    Subclasses definem como um broadcast chega a todos os clientes (_broadcast_encoded).
+    """
+    def __init__(self):
+        self.clients = {}           # {RemoteWriter: {'user': username}}
+        self.logged_in_users = {}   # {username: RemoteWriter}
+        self._dirty = set()         # writers com pacotes no buffer
+
+    def attach(self, conn_id: int, channel: IpcChannel, username: str) -> RemoteWriter:
+        writer = RemoteWriter(conn_id, channel, self)
+        self.clients[writer] = {'user': username}
+        self.logged_in_users[username] = writer
+        return writer
+
+    def detach(self, writer: RemoteWriter) -> str | None:
+        user_info = self.clients.pop(writer, None)
+        if user_info is None:
+            return None
+        writer.close()
+        self._dirty.discard(writer)
+        username = user_info['user']
+        if self.logged_in_users.get(username) is writer:
+            del self.logged_in_users[username]
+        return username
+
+    def get_user_by_writer(self, writer):
+        user_info = self.clients.get(writer)
+        return user_info['user'] if user_info else None
+
+    async def send_packet(self, writer: RemoteWriter, packet: dict):
+        writer.write_packet(encode_message(packet))
+        PACKETS_OUT.inc(packet.get('type') or 'UNKNOWN')
+
+    async def send_packet_to_many(self, writers, packet: dict):
+        encoded_message = encode_message(packet)
+        recipients = 0
+        for writer in writers:
+            writer.write_packet(encoded_message)
+            recipients += 1
+        if recipients:
+            PACKETS_OUT.inc(packet.get('type') or 'UNKNOWN', amount=recipients)
+
+    async def flush(self):
+        """Envia o lote de cada cliente com pacotes pendentes. Chamado uma vez por tick."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        channels = set()
+        for writer in dirty:
+            writer.flush()
+            channels.add(writer.channel)
+        for channel in channels:
+            await channel.drain()
+
+    async def _broadcast(self, packet: dict, exclude_writer=None):
+        # Lotes pendentes saem antes, para o broadcast não passar na frente deles
+        for writer in self._dirty:
+            writer.flush()
+        self._dirty.clear()
+        exclude = exclude_writer if isinstance(exclude_writer, RemoteWriter) else None
+        await self._broadcast_encoded(pack_typed(packet.get('type'), encode_message(packet)), exclude)
+
+    @abc.abstractmethod
+    async def _broadcast_encoded(self, payload: bytes, exclude_writer: RemoteWriter | None):
+        """Envia `payload` (já empacotado) a todos os clientes, menos `exclude_writer`."""
+
+    async def broadcast_system_message(self, message: str, exclude_writer=None):
+        await self._broadcast({'type': PACKET_SYSTEM_MESSAGE, 'content': message}, exclude_writer)
+
+    async def broadcast_game_update(self, packet: dict, exclude_writer=None):
+        await self._broadcast(packet, exclude_writer)
+
+    @staticmethod
+    def exclude_conn_id(exclude_writer: RemoteWriter | None, channel: IpcChannel) -> int:
+        if exclude_writer is not None and exclude_writer.channel is channel:
+            return exclude_writer.conn_id
+        return NO_CONNECTION
@@ -1,24 +1,36 @@
 from shared.protocol import (
     PACKET_AUTH,
-    PACKET_ENTITY_REMOVE,
     PACKET_SYSTEM_MESSAGE,
     encode_message,
-    decode_message, 
-    PACKET_CHAT_MESSAGE,
     PACKET_REGISTER_SUCCESS,
     PACKET_REGISTER_FAIL,
     PACKET_AUTH_SUCCESS,
     PACKET_AUTH_FAIL,
     PACKET_REGISTER
 )
-from shared.logger import get_logger
-import asyncio
+from shared.logger import get_logger, get_rate_limited_logger
+from shared.framing import FramedConnection, FrameTooLarge, start_framed_server
 from server.db.login import authenticate_user, create_user
+from server.network.rate_limit import ConnectionRateLimiter, coalesce_moves
+from server.core.metrics import PACKETS_IN, PACKETS_OUT, BYTES_IN, BYTES_OUT
+from shared.constants import TCP_NODELAY, WRITE_BUFFER_HIGH, WRITE_BUFFER_LOW
+import socket
 
 logger = get_logger(__name__)
+connection_log = get_rate_limited_logger(f"{__name__}.connections")
+
+def tune_transport(writer: FramedConnection):
+    """Aplica TCP_NODELAY e as marcas d'água de escrita a uma conexão de cliente."""
+    sock = writer.get_extra_info('socket')
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if TCP_NODELAY else 0)
+        except OSError as e:
+            logger.warning(f"Could not set TCP_NODELAY: {e}")
+    writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH, low=WRITE_BUFFER_LOW)
 
 class ServerSocket:
-    def __init__(self, host, port, data_payload_size, db_pool, game_engine):
+    def __init__(self, host, port, data_payload_size, db_pool, game_engine, reuse_port=False):
         self.host = host
         self.port = port
         self.server_address = (host, port)
@@ -28,21 +40,34 @@ class ServerSocket:
         self.db_pool = db_pool
         self.server = None
         self.logged_in_users = {}
+        self.pending_logins = 0
+        self.reuse_port = reuse_port  # vários gateways na mesma porta
     
     async def start(self):
-        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.server = await start_framed_server(self.handle_client, self.host, self.port,
+                                                self.data_payload_size, reuse_port=self.reuse_port)
         logger.info(f"Server started at {self.server_address}")
         async with self.server:
             await self.server.serve_forever()
     
-    async def send_packet(self, writer: asyncio.StreamWriter, packet: dict):
+    def _record_incoming_packet(self, packet):
+        pkt_type = packet.get('type') if isinstance(packet, dict) else None
+        PACKETS_IN.inc(pkt_type or 'UNKNOWN')
+
+    def _record_outgoing(self, packet: dict, size: int, recipients: int = 1):
+        PACKETS_OUT.inc(packet.get('type') or 'UNKNOWN', amount=recipients)
+        BYTES_OUT.inc(amount=size * recipients)
+
+    async def send_packet(self, writer: FramedConnection, packet: dict):
         try:
-            writer.write(encode_message(packet))
+            encoded_message = encode_message(packet)
+            writer.write(encoded_message)
+            self._record_outgoing(packet, len(encoded_message))
             await writer.drain()
         except Exception as e:
             logger.error(f"Error sending packet to {writer.get_extra_info('peername')}: {e}")
     
-    async def disconnect_user(self, writer: asyncio.StreamWriter):
+    async def disconnect_user(self, writer: FramedConnection):
         user_info = self.clients.pop(writer, None)
         user = user_info['user'] if user_info else None
         addr = writer.get_extra_info('peername')
@@ -51,18 +76,10 @@ class ServerSocket:
             if user in self.logged_in_users and self.logged_in_users[user] == writer:
                 del self.logged_in_users[user]
 
-            logger.info(f"User {user} disconnected from {addr} (Cleaning up).")
-
-            # Remove do engine
-            entity_id = self.game_engine.get_player_entity_id(user)
-            if entity_id:
-                remove_packet = {
-                    "type": PACKET_ENTITY_REMOVE,
-                    "entity_id": entity_id
-                }
+            connection_log.info("User %s disconnected from %s (Cleaning up).", user, addr)
 
-                await self.game_engine.send_aoi_update(entity_id, remove_packet, exclude_writer=writer)
-                await self.game_engine.player_disconnected(user)
+            # Remove do engine (a instância do mapa avisa quem estava vendo o jogador)
+            await self.game_engine.player_disconnected(user)
 
             await self.broadcast_system_message(f"User {user} has left.", exclude_writer=writer)
 
@@ -71,160 +88,188 @@ class ServerSocket:
             await writer.wait_closed()
         except (OSError, ConnectionResetError):
             pass
-        logger.info(f"Connection closed from {addr}")
+        connection_log.info("Connection closed from %s", addr)
             
-    async def handle_authentication(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    def limit_rate(self, writer: FramedConnection):
+        # Descarta o excesso antes de decodificar; flood persistente derruba a conexão
+        writer.admit = ConnectionRateLimiter(writer.get_extra_info('peername'), writer.close).admit
+
+    async def kick_existing_session(self, username: str):
+        old_writer = self.logged_in_users.get(username)
+        if old_writer is None:
+            return
+        await self.send_packet(old_writer, {'type': PACKET_SYSTEM_MESSAGE, 'content': 'You logged in from another session.'})
+        logger.warning(f"User '{username}' already connected. Kicking old session from {old_writer.get_extra_info('peername')}.")
+        await self.disconnect_user(old_writer)
+
+    async def handle_authentication(self, writer: FramedConnection):
         addr = writer.get_extra_info('peername')
         while True:
             try:
-                data = await reader.readuntil(b'\n')
-                if not data:
+                batch = await writer.read_batch()
+                if batch is None:
                     return None
-                
-                packet = decode_message(data.strip())
-                
-                if isinstance(packet, dict):
-                    pkt_type = packet.get('type')
-                    username = packet.get('username')
-                    raw_password = packet.get('password')
-                    if pkt_type == PACKET_AUTH:
-                        logger.info(f"Authentication attempt from {addr} with username: {username}")
-                        if username in self.logged_in_users:
-                            old_writer = self.logged_in_users[username]
-                            await self.send_packet(old_writer, {'type': PACKET_SYSTEM_MESSAGE, 'content': 'You logged in from another session.'})
-                            
-                            logger.warning(f"User '{username}' already connected. Kicking old session from {old_writer.get_extra_info('peername')}.")
-                            
-                            await self.disconnect_user(old_writer) 
-                        if await authenticate_user(self.db_pool, username, raw_password):
-                            await self.send_packet(writer, {'type': PACKET_AUTH_SUCCESS, 'status': 'success'})
-                            logger.info(f"User '{username}' authenticated successfully from {addr}")
-                            return username
-                        else:
-                            await self.send_packet(writer, {'type': PACKET_AUTH_FAIL, 'status': 'failure'})
-                            logger.warning(f"User '{username}' failed to authenticate from {addr}")
-                            continue
-                    elif pkt_type == PACKET_REGISTER:
-                        logger.info(f"Registration attempt from {addr} with username: {username}")
-                        if await create_user(self.db_pool, username, raw_password):
-                            await self.send_packet(writer, {'type': PACKET_REGISTER_SUCCESS, 'status': 'success'})
-                            logger.info(f"User '{username}' registered successfully from {addr}")
-                            return username
-                        else:
-                            await self.send_packet(writer, {'type': PACKET_REGISTER_FAIL, 'status': 'failure'})
-                            logger.warning(f"User '{username}' failed to register from {addr}")
-                            continue
-                    else:
-                        await self.send_packet(writer, {'type': PACKET_AUTH_FAIL, 'message': 'Invalid authentication packet'})
-                        logger.warning(f"Invalid authentication packet from {addr}: {packet}")
-            except asyncio.LimitOverrunError as e:
+                packets, size = batch
+                BYTES_IN.inc(amount=size)
+
+                for index, packet in enumerate(packets):
+                    self._record_incoming_packet(packet)
+                    username = await self._handle_auth_packet(writer, addr, packet)
+                    if username:
+                        # O que chegou no mesmo lote depois do login já é da sessão
+                        writer.unread(packets[index + 1:])
+                        return username
+            except FrameTooLarge as e:
                 logger.error(f"Authentication packet from {addr} exceeded limit ({self.data_payload_size} bytes): {e}")
                 await self.send_packet(writer, {'type': PACKET_AUTH_FAIL, 'message': 'Packet too large.'})
                 return None
             except Exception as e:
                 logger.error(f"Error during authentication from {addr}: {e}")
                 return None
+
+    async def _handle_auth_packet(self, writer: FramedConnection, addr, packet) -> str | None:
+        if not isinstance(packet, dict):
+            return None
+        pkt_type = packet.get('type')
+        username = packet.get('username')
+        raw_password = packet.get('password')
+        if pkt_type == PACKET_AUTH:
+            logger.info(f"Authentication attempt from {addr} with username: {username}")
+            await self.kick_existing_session(username)
+            if await authenticate_user(self.db_pool, username, raw_password):
+                await self.send_packet(writer, {'type': PACKET_AUTH_SUCCESS, 'status': 'success'})
+                logger.info(f"User '{username}' authenticated successfully from {addr}")
+                return username
+            await self.send_packet(writer, {'type': PACKET_AUTH_FAIL, 'status': 'failure'})
+            logger.warning(f"User '{username}' failed to authenticate from {addr}")
+        elif pkt_type == PACKET_REGISTER:
+            logger.info(f"Registration attempt from {addr} with username: {username}")
+            if await create_user(self.db_pool, username, raw_password):
+                await self.send_packet(writer, {'type': PACKET_REGISTER_SUCCESS, 'status': 'success'})
+                logger.info(f"User '{username}' registered successfully from {addr}")
+                return username
+            await self.send_packet(writer, {'type': PACKET_REGISTER_FAIL, 'status': 'failure'})
+            logger.warning(f"User '{username}' failed to register from {addr}")
+        else:
+            await self.send_packet(writer, {'type': PACKET_AUTH_FAIL, 'message': 'Invalid authentication packet'})
+            logger.warning(f"Invalid authentication packet from {addr}: {packet}")
+        return None
     
-    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    async def handle_client(self, writer: FramedConnection):
         addr = writer.get_extra_info('peername')
         authenticated_user = None
         
-        logger.info(f"New connection from {addr}. Starting authentication.")
-        authenticated_user = await self.handle_authentication(reader, writer)
+        connection_log.info("New connection from %s. Starting authentication.", addr)
+        tune_transport(writer)
+        self.limit_rate(writer)
+        self.pending_logins += 1
+        try:
+            authenticated_user = await self.handle_authentication(writer)
+        finally:
+            self.pending_logins -= 1
         
         if authenticated_user:
-            user_info = {'user': authenticated_user, 'addr': addr}
-            self.clients[writer] = user_info
-            self.logged_in_users[authenticated_user] = writer
-            logger.info(f"User {authenticated_user} connected from {addr}")
+            await self.serve_session(writer, authenticated_user)
+        else:
+            writer.close()
             try:
-                await self.game_engine.player_connected(writer, authenticated_user)
-            except Exception as e:
-                logger.error(f"Engine error for {authenticated_user}: {e}")
-                await self.disconnect_user(writer)
-            
-            await self.broadcast_system_message(f"User {authenticated_user} has joined.", exclude_writer=writer)
+                await writer.wait_closed()
+            except (OSError, ConnectionResetError):
+                pass
+            connection_log.info("Connection closed from %s", addr)
+
+    async def adopt_session(self, writer: FramedConnection, username: str):
+        """Sessão já autenticada por um processo de login (LOGIN_ACCEPTORS)."""
+        self.limit_rate(writer)
+        await self.kick_existing_session(username)
+        await self.serve_session(writer, username)
+
+    async def serve_session(self, writer: FramedConnection, authenticated_user: str):
+        addr = writer.get_extra_info('peername')
+        user_info = {'user': authenticated_user, 'addr': addr}
+        self.clients[writer] = user_info
+        self.logged_in_users[authenticated_user] = writer
+        connection_log.info("User %s connected from %s", authenticated_user, addr)
+        try:
+            await self.game_engine.player_connected(writer, authenticated_user)
+        except Exception as e:
+            logger.error(f"Engine error for {authenticated_user}: {e}")
+            await self.disconnect_user(writer)
         
-            try:
-                while True:
-                    data = await reader.readuntil(b'\n')
-                        
-                    if not data:
-                        break
-                    
-                    packet = decode_message(data.strip())
+        await self.broadcast_system_message(f"User {authenticated_user} has joined.", exclude_writer=writer)
+        
+        try:
+            while True:
+                batch = await writer.read_batch()
+                if batch is None:
+                    break
+
+                # Todos os frames completos de um data_received chegam juntos
+                packets, size = batch
+                BYTES_IN.inc(amount=size)
+                for packet in coalesce_moves(packets):
+                    self._record_incoming_packet(packet)
                     if isinstance(packet, dict):
                         pkt_type = packet.get('type')
-                    
+
                         if pkt_type in [PACKET_AUTH, PACKET_REGISTER]:
                             logger.warning(f"Received unexpected auth/register packet from authenticated user {authenticated_user} at {addr}")
                             continue
-                    
+
                         await self.game_engine.process_network_packet(writer, packet)
 
                     else:
                         logger.warning(f"Unknown or malformed packet from {addr}: {packet}")
-            except asyncio.LimitOverrunError as e:
-                logger.error(f"Packet from {authenticated_user} exceeded size limit ({self.data_payload_size} bytes): {e}")
-            except (OSError, ConnectionResetError, asyncio.IncompleteReadError) as e:
-                pass
-            except Exception as e:
-                logger.error(f"Error handling client {addr}: {e}")
-            finally:
-                if authenticated_user:
-                    await self.disconnect_user(writer)
-                else:
-                    writer.close()
-                    try:
-                        await writer.wait_closed()
-                    except (OSError, ConnectionResetError):
-                        pass
-                    logger.info(f"Connection closed from {addr}")
-                
-    def get_user_by_writer(self, writer: asyncio.StreamWriter):
+        except FrameTooLarge as e:
+            logger.error(f"Packet from {authenticated_user} exceeded size limit ({self.data_payload_size} bytes): {e}")
+        except (OSError, ConnectionResetError) as e:
+            pass
+        except Exception as e:
+            logger.error(f"Error handling client {addr}: {e}")
+        finally:
+            await self.disconnect_user(writer)
+            
+    def get_send_queue_depths(self) -> dict:
+        """Bytes pendentes no buffer de escrita de cada conexão autenticada."""
+        depths = {}
+        for writer, user_info in self.clients.items():
+            transport = writer.transport
+            if transport is not None and not transport.is_closing():
+                depths[(user_info['user'],)] = transport.get_write_buffer_size()
+        return depths
+
+    async def flush(self):
+        # Escrita direta nos sockets: não há lote pendente no fim do tick
+        pass
+
+    def get_user_by_writer(self, writer: FramedConnection):
         user_info = self.clients.get(writer)
         return user_info['user'] if user_info else None
             
-    async def broadcast_chat_message(self, sender: str, message: str, exclude_writer=None):
-        chat_packet = {
-            'type': PACKET_CHAT_MESSAGE,
-            'sender': sender,
-            'content': message
-        }
-        encoded_message = encode_message(chat_packet)
-
-        for writer in self.clients.keys():
-            if writer != exclude_writer:
-                try:
-                    writer.write(encoded_message)
-                    await writer.drain()
-                except Exception as e:
-                    logger.error(f"Error broadcasting to client: {e}")
+    async def send_packet_to_many(self, writers, packet: dict):
+        """Codifica uma vez e escreve para todos os writers, sem drain por destinatário."""
+        encoded_message = encode_message(packet)
+        recipients = 0
+        for writer in writers:
+            if writer.is_closing():
+                continue
+            try:
+                writer.write(encoded_message)
+                recipients += 1
+            except Exception as e:
+                logger.error(f"Error sending packet to {writer.get_extra_info('peername')}: {e}")
+        if recipients:
+            self._record_outgoing(packet, len(encoded_message), recipients)
+
+    async def _broadcast(self, packet: dict, exclude_writer=None):
+        # Cópia: clientes podem (des)conectar durante o envio
+        await self.send_packet_to_many([writer for writer in list(self.clients) if writer is not exclude_writer], packet)
 
     async def broadcast_system_message(self, message: str, exclude_writer=None):
-        system_packet = {'type': PACKET_SYSTEM_MESSAGE, 'content': message}
-        encoded_message = encode_message(system_packet)
-        for writer in self.clients.keys():
-            if writer != exclude_writer:
-                try:
-                    writer.write(encoded_message)
-                    await writer.drain()
-                except Exception as e:
-                    logger.error(f"Error broadcasting system message: {e}")
-                    
+        await self._broadcast({'type': PACKET_SYSTEM_MESSAGE, 'content': message}, exclude_writer)
+
     async def broadcast_game_update(self, packet: dict, exclude_writer=None):
-        try: 
-            encoded_message = encode_message(packet)
-            
-            for writer in self.clients.keys():
-                if writer != exclude_writer:
-                    try:
-                        writer.write(encoded_message)
-                        await writer.drain()
-                    except Exception:
-                        logger.error(f"Error sending broadcast: {e}")
-        except Exception as e:
-            logger.error(f"Error during game update broadcast: {e}")
+        await self._broadcast(packet, exclude_writer)
     
     async def shutdown(self):
         logger.info("Server shutting down.")
@@ -0,0 +1,253 @@
+"""
+Lado da frente do modo multi-processo: ocupa o lugar do GameEngine para o ServerSocket,
+sobe um processo worker por grupo de mapas e roteia os pacotes de cada conexão para o
+worker que simula o mapa do jogador. Frames vindos dos workers são escritos direto nos
+sockets dos clientes (OP_SEND_BATCH, um lote por cliente por tick) ou em todos eles (OP_BROADCAST, usado por chat e mensagens
+de sistema). A persistência dos jogadores acontece aqui, então o backend em memória
+continua consistente mesmo com vários processos.
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import socket
+
+from server.core.metrics import PACKETS_OUT, BYTES_OUT
+from server.core.shard_worker import run_worker
+from server.db.player import get_player_data, update_player_data
+from server.network.ipc import (
+    IpcChannel, unpack_typed,
+    OP_CONNECT, OP_PACKET, OP_DISCONNECT, OP_TRANSFER_IN, OP_RELOAD,
+    OP_SEND_BATCH, OP_BROADCAST, OP_PLAYER_LEFT, OP_HANDOFF, OP_STATS, OP_WHISPER,
+)
+from server.network.remote import unpack_batch
+from server.utils.metadata_registry import metadata_registry
+from shared.constants import DEFAULT_MAP_NAME
+from shared.logger import get_logger
+from shared.protocol import PACKET_SYSTEM_MESSAGE, encode_payload
+
+logger = get_logger(__name__)
+
+LEAVE_TIMEOUT = 5.0
+WORKER_JOIN_TIMEOUT = 5.0
+
+def assign_maps(map_names: list, worker_count: int, explicit: str = "") -> dict:
+    """
+    {map_name: índice do worker}. `explicit` ("Mapa=0,Outro=1") fixa mapas em workers;
+    os demais são distribuídos em round-robin.
+    """
+    assignment = {}
+    for item in filter(None, (part.strip() for part in explicit.split(","))):
+        name, _, index = item.partition("=")
+        assignment[name.strip()] = int(index) % worker_count
+    remaining = (name for name in map_names if name not in assignment)
+    for slot, name in enumerate(remaining):
+        assignment[name] = slot % worker_count
+    return assignment
+
+class ShardRouter:
+    def __init__(self, db_pool, network_manager, worker_count: int, explicit_assignment: str = ""):
+        self.db_pool = db_pool
+        self.network_manager = network_manager
+        map_names = metadata_registry.get_map_names()
+        self.worker_count = max(1, min(worker_count, len(map_names)))
+        self.map_assignment = assign_maps(map_names, self.worker_count, explicit_assignment)
+        self.processes = []
+        self.channels = []
+        self._reader_tasks = []
+        self._ready = asyncio.Event()
+        self._next_conn_id = itertools.count(1)
+        self.conn_ids = {}       # {writer: conn_id}
+        self.connections = {}    # {conn_id: writer}
+        self.conn_workers = {}   # {conn_id: índice do worker}
+        self.player_conns = {}   # {username: conn_id}
+        self._pending_leaves = {}  # {conn_id: Future}
+        self._entity_counts = [{} for _ in range(self.worker_count)]
+
+    async def start(self):
+        context = multiprocessing.get_context("spawn")
+        for index in range(self.worker_count):
+            map_names = sorted(name for name, worker in self.map_assignment.items() if worker == index)
+            front_sock, worker_sock = socket.socketpair()
+            process = context.Process(target=run_worker, args=(index, worker_sock, map_names),
+                                      name=f"shard-worker-{index}", daemon=True)
+            process.start()
+            worker_sock.close()
+            channel = await IpcChannel.open(front_sock)
+            self.processes.append(process)
+            self.channels.append(channel)
+            self._reader_tasks.append(asyncio.create_task(self._read_worker(index, channel)))
+            logger.info(f"Started shard worker {index} (pid {process.pid}) for maps: {', '.join(map_names)}")
+        self._ready.set()
+
+    def _worker_for_map(self, map_name: str | None) -> int:
+        index = self.map_assignment.get(map_name)
+        return index if index is not None else self.map_assignment[DEFAULT_MAP_NAME]
+
+    # --- Interface usada pelo ServerSocket ---
+
+    async def player_connected(self, writer, username):
+        await self._ready.wait()
+        player_data = await get_player_data(self.db_pool, username)
+        index = self._worker_for_map(player_data.get('map_name') if player_data else None)
+
+        conn_id = next(self._next_conn_id)
+        self.conn_ids[writer] = conn_id
+        self.connections[conn_id] = writer
+        self.conn_workers[conn_id] = index
+        self.player_conns[username] = conn_id
+        self.channels[index].send_json(OP_CONNECT, conn_id, {'username': username, 'player_data': player_data})
+        await self.channels[index].drain()
+
+    async def player_disconnected(self, username):
+        conn_id = self.player_conns.pop(username, None)
+        if conn_id is None:
+            return None, None
+        writer = self.connections.pop(conn_id, None)
+        self.conn_ids.pop(writer, None)
+        index = self.conn_workers.pop(conn_id)
+
+        # Espera o worker devolver o estado (e ele ser salvo) antes de liberar um novo login
+        leave = asyncio.get_running_loop().create_future()
+        self._pending_leaves[conn_id] = leave
+        self.channels[index].send(OP_DISCONNECT, conn_id)
+        await self.channels[index].drain()
+        try:
+            await asyncio.wait_for(leave, LEAVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"Shard worker {index} did not return the state of {username} in time; it was not saved.")
+        finally:
+            self._pending_leaves.pop(conn_id, None)
+        return conn_id, username
+
+    async def process_network_packet(self, writer, packet):
+        conn_id = self.conn_ids.get(writer)
+        if conn_id is None:
+            logger.warning("Received packet from a connection that is not on any shard.")
+            return
+        channel = self.channels[self.conn_workers[conn_id]]
+        channel.send(OP_PACKET, conn_id, encode_payload(packet))
+        await channel.drain()
+
+    def count_entities_by_type(self) -> dict:
+        counts = {}
+        for worker_counts in self._entity_counts:
+            for entity_type, value in worker_counts.items():
+                counts[(entity_type,)] = counts.get((entity_type,), 0) + value
+        return counts
+
+    def reload_workers(self):
+        for channel in self.channels:
+            channel.send(OP_RELOAD)
+
+    # --- Frames vindos dos workers ---
+
+    async def _read_worker(self, index: int, channel: IpcChannel):
+        while True:
+            frame = await channel.recv()
+            if frame is None:
+                logger.error(f"Shard worker {index} closed its channel.")
+                return
+            op, conn_id, payload = frame
+            try:
+                if op == OP_SEND_BATCH:
+                    self._relay(conn_id, payload)
+                elif op == OP_BROADCAST:
+                    self._relay_broadcast(conn_id, payload)
+                elif op == OP_PLAYER_LEFT:
+                    data = json.loads(payload)
+                    await self._save_state(data['username'], data['state'])
+                    self._resolve_leave(conn_id)
+                elif op == OP_HANDOFF:
+                    await self._handoff(conn_id, json.loads(payload))
+                elif op == OP_STATS:
+                    self._entity_counts[index] = json.loads(payload).get('entities', {})
+                elif op == OP_WHISPER:
+                    await self._whisper(conn_id, json.loads(payload))
+                else:
+                    logger.warning(f"Unknown op {op} from shard worker {index}.")
+            except Exception as e:
+                logger.error(f"Error handling op {op} from shard worker {index}: {e}")
+
+    def _relay(self, conn_id: int, payload: bytes):
+        writer = self.connections.get(conn_id)
+        if writer is None or writer.is_closing():
+            return
+        count, message = unpack_batch(payload)
+        writer.write(message)
+        # Os tipos dos pacotes de um lote são contados pelo worker
+        PACKETS_OUT.inc('BATCHED', amount=count)
+        BYTES_OUT.inc(amount=len(message))
+
+    def _relay_broadcast(self, exclude_conn_id: int, payload: bytes):
+        packet_type, message = unpack_typed(payload)
+        exclude_writer = self.connections.get(exclude_conn_id)
+        recipients = 0
+        for writer in list(self.network_manager.clients):
+            if writer is not exclude_writer and not writer.is_closing():
+                writer.write(message)
+                recipients += 1
+        self.network_manager._record_outgoing({'type': packet_type}, len(message), recipients)
+
+    async def _whisper(self, conn_id: int, data: dict):
+        target_writer = self.network_manager.logged_in_users.get(data['target'])
+        sender_writer = self.connections.get(conn_id)
+        if target_writer is not None:
+            await self.network_manager.send_packet(target_writer, data['packet'])
+            if sender_writer is not None:
+                await self.network_manager.send_packet(sender_writer, data['packet'])
+        elif sender_writer is not None:
+            await self.network_manager.send_packet(sender_writer, {
+                'type': PACKET_SYSTEM_MESSAGE,
+                'content': f"User '{data['target']}' is not online.",
+            })
+
+    async def _handoff(self, conn_id: int, data: dict):
+        username, state = data['username'], data['state']
+        if conn_id not in self.connections:
+            # O cliente caiu durante a troca de processo: só persiste
+            await self._save_state(username, state)
+            self._resolve_leave(conn_id)
+            return
+        index = self._worker_for_map(data['map_name'])
+        self.conn_workers[conn_id] = index
+        self.channels[index].send_json(OP_TRANSFER_IN, conn_id, {'username': username, 'state': state})
+        await self.channels[index].drain()
+
+    async def _save_state(self, username: str, state: dict):
+        if state['pos_x'] is None or state['pos_y'] is None:
+            # Saiu no meio de uma transferência sem posição definida: volta ao spawn do mapa
+            map_data = metadata_registry.get_map(state['map_name']) or {}
+            state['pos_x'] = map_data.get("initial_player_spawn_x", 10.0)
+            state['pos_y'] = map_data.get("initial_player_spawn_y", 10.0)
+        await update_player_data(
+            self.db_pool, username,
+            state['pos_x'], state['pos_y'], state['current_health'], state['stat_points'],
+            state['class_name'], state['level'], state['experience'],
+            state['strength'], state['agility'], state['vitality'],
+            state['intelligence'], state['dexterity'], state['luck'],
+            state['map_name'],
+        )
+        logger.info(f"Saved player {username}'s state: Map {state['map_name']}, Pos ({state['pos_x']:.1f}, {state['pos_y']:.1f}), Lvl {state['level']}")
+
+    def _resolve_leave(self, conn_id: int):
+        leave = self._pending_leaves.get(conn_id)
+        if leave is not None and not leave.done():
+            leave.set_result(True)
+
+    async def shutdown(self):
+        # Deixa os desconectes em andamento terminarem de salvar os jogadores
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LEAVE_TIMEOUT
+        while (self.player_conns or self._pending_leaves) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+
+        for task in self._reader_tasks:
+            task.cancel()
+        for channel in self.channels:
+            channel.close()
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, WORKER_JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        logger.info("Shard workers stopped.")
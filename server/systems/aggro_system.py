@@ -0,0 +1,136 @@
+"""
+Aggro dos monstros: percepção de jogadores e tabela de ameaça.
+
+A cada tick só uma fatia dos monstros (1 em AGGRO_CHECK_INTERVAL) procura jogadores pelo
+índice espacial, então o custo por tick fica estável com mais monstros. Dano recebido
+(CombatSystem._apply_damage -> add_threat) entra na tabela na hora. O alvo é sempre quem
+tem mais ameaça; longe demais de casa (leash_radius), o monstro esquece tudo e volta.
+"""
+import math
+
+from server.game_engine.components.aggro import AggroComponent
+from server.game_engine.components.ai import AIComponent
+from server.game_engine.components.health import HealthComponent
+from server.game_engine.components.position import PositionComponent
+from server.game_engine.components.type import TypeComponent
+from server.game_engine.flow_field import FlowFields
+from server.game_engine.world import World
+from shared.constants import AGGRO_CHECK_INTERVAL, AGGRO_PERCEPTION_THREAT
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENGAGED_STATES = ('chasing', 'attacking')
+
+class AggroSystem:
+    def __init__(self, world: World, flow_fields: FlowFields, check_interval: int = AGGRO_CHECK_INTERVAL):
+        self.world = world
+        self.flow_fields = flow_fields
+        self.check_interval = check_interval
+        self.ticks = 0
+        self.schedule = []  # ids com AggroComponent, refeito no início de cada ciclo
+
+    def run(self):
+        slot = self.ticks % self.check_interval
+        if slot == 0:
+            self.schedule = [entity_id for entity_id, _ in self.world.get_entities_with_components((AggroComponent, AIComponent))]
+        self.ticks += 1
+
+        entities = self.world.entities
+        for entity_id in self.schedule[slot::self.check_interval]:
+            components = entities.get(entity_id)
+            if components is None:
+                continue  # morreu no meio do ciclo
+            pos_comp = components.get(PositionComponent)
+            if pos_comp is not None:
+                self._evaluate(entity_id, components[AggroComponent], components[AIComponent], pos_comp)
+
+    def add_threat(self, target_entity_id: int, source_entity_id: int | None, amount: float):
+        """Chamado pelo CombatSystem quando `target_entity_id` recebe dano de `source_entity_id`."""
+        if source_entity_id is None:
+            return
+        aggro = self.world.get_component(target_entity_id, AggroComponent)
+        ai_comp = self.world.get_component(target_entity_id, AIComponent)
+        if aggro is None or ai_comp is None or ai_comp.state == 'returning':
+            return  # voltando para casa: não reage
+        aggro.threat[source_entity_id] = aggro.threat.get(source_entity_id, 0.0) + amount
+        if ai_comp.state not in ENGAGED_STATES:
+            # Apanhou: reage agora, sem esperar a vez na fatia de percepção
+            self._engage(target_entity_id, ai_comp, source_entity_id)
+
+    def forget(self, entity_id: int):
+        """Tira `entity_id` de todas as tabelas de ameaça (ex.: jogador morreu e renasceu)."""
+        for monster_id, (aggro, ai_comp) in self.world.get_entities_with_components((AggroComponent, AIComponent)):
+            if aggro.threat.pop(entity_id, None) is not None and ai_comp.target_entity_id == entity_id:
+                self._retarget(monster_id, aggro, ai_comp)
+
+    # --- Auxiliares ---
+
+    def _evaluate(self, entity_id: int, aggro: AggroComponent, ai_comp: AIComponent, pos_comp: PositionComponent):
+        threat = aggro.threat
+        if ai_comp.state == 'returning':
+            threat.clear()
+            return
+
+        for target_id in [target_id for target_id in threat if not self._is_valid_target(target_id)]:
+            del threat[target_id]
+
+        if ai_comp.state in ENGAGED_STATES and ai_comp.home_x is not None:
+            if math.hypot(pos_comp.x - ai_comp.home_x, pos_comp.y - ai_comp.home_y) > aggro.leash_radius:
+                logger.debug(f"Monster {entity_id} leashed back to ({ai_comp.home_x}, {ai_comp.home_y}).")
+                self._disengage(entity_id, aggro, ai_comp)
+                return
+
+        if not threat and aggro.aggressive:
+            nearest = self._nearest_player(pos_comp.x, pos_comp.y, aggro.perception_radius)
+            if nearest is not None:
+                threat[nearest] = AGGRO_PERCEPTION_THREAT
+
+        self._retarget(entity_id, aggro, ai_comp)
+
+    def _retarget(self, entity_id: int, aggro: AggroComponent, ai_comp: AIComponent):
+        if aggro.threat:
+            self._engage(entity_id, ai_comp, max(aggro.threat, key=aggro.threat.get))
+        elif ai_comp.state in ENGAGED_STATES:
+            self._disengage(entity_id, aggro, ai_comp)
+
+    def _engage(self, entity_id: int, ai_comp: AIComponent, target_id: int):
+        if ai_comp.target_entity_id != target_id:
+            if ai_comp.target_entity_id is not None:
+                self.flow_fields.leave(entity_id, ai_comp.target_entity_id)
+            ai_comp.target_entity_id = target_id
+            ai_comp.clear_path()
+        if ai_comp.state not in ENGAGED_STATES:
+            ai_comp.state = 'chasing'
+
+    def _disengage(self, entity_id: int, aggro: AggroComponent, ai_comp: AIComponent):
+        aggro.threat.clear()
+        if ai_comp.target_entity_id is not None:
+            self.flow_fields.leave(entity_id, ai_comp.target_entity_id)
+        ai_comp.state = 'returning'
+        ai_comp.target_entity_id = None
+        ai_comp.clear_path()
+
+    def _is_valid_target(self, entity_id: int) -> bool:
+        components = self.world.entities.get(entity_id)
+        if components is None or PositionComponent not in components:
+            return False
+        health_comp = components.get(HealthComponent)
+        return health_comp is None or not health_comp.is_dead
+
+    def _nearest_player(self, x: float, y: float, radius: float) -> int | None:
+        """Jogador vivo mais perto de (x, y) dentro de `radius`, pelo índice espacial."""
+        entities = self.world.entities
+        nearest, nearest_distance = None, radius
+        for entity_id, pos in self.world.get_entities_near(x, y, radius):
+            components = entities[entity_id]
+            type_comp = components.get(TypeComponent)
+            if type_comp is None or type_comp.entity_type != 'player':
+                continue
+            health_comp = components.get(HealthComponent)
+            if health_comp is not None and health_comp.is_dead:
+                continue
+            distance = math.hypot(pos.x - x, pos.y - y)
+            if distance <= nearest_distance:
+                nearest, nearest_distance = entity_id, distance
+        return nearest
@@ -0,0 +1,233 @@
+"""
+Folhas (condições e ações) das behavior trees dos monstros e a compilação das árvores do
+bloco "behaviors" de monster_templates.json.
+
+As folhas não movem nem atacam: escrevem a intenção no blackboard (AIComponent) e o
+AISystem a aplica depois de avaliar o lote. Assinatura: fn(ai_system, entity_id, pos_comp,
+ai_comp, params) -> SUCCESS | FAILURE | RUNNING. Os parâmetros vêm do próprio nó na
+definição (ex.: {"action": "wander", "radius": 3.0}).
+"""
+import math
+import random
+import time
+
+from server.game_engine.behavior_tree import FAILURE, RUNNING, SUCCESS, BehaviorTree, BehaviorTreeError, compile_tree
+from server.game_engine.components.ai import AIComponent
+from server.game_engine.components.position import PositionComponent
+from server.utils.metadata_registry import metadata_registry
+from shared.constants import ATTACK_RANGE
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Padrões das folhas (por tick de IA; multiplicados pelos ticks desde a última avaliação)
+NPC_CHASE_STEP = 0.1     # Distância por tick ao seguir um caminho (perseguindo ou voltando)
+WANDER_CHANCE = 0.1      # Chance por tick de dar um passo de patrulha
+WANDER_DISTANCE = 0.5    # Deslocamento máximo em x e y de um passo de patrulha
+WANDER_RADIUS = 5.0      # Raio de patrulha em volta do ponto de spawn
+
+DEFAULT_BEHAVIOR_NAME = "default"
+
+# Usada quando o template não indica árvore (ou a indicada não existe / não compila)
+DEFAULT_BEHAVIOR = {
+    "selector": [
+        {"sequence": [{"condition": "is_state", "state": "returning"}, {"action": "return_home"}]},
+        {"sequence": [
+            {"condition": "has_target"},
+            {"selector": [
+                {"sequence": [{"condition": "target_in_range"}, {"action": "attack"}]},
+                {"action": "chase"}
+            ]}
+        ]},
+        {"sequence": [{"condition": "is_engaged"}, {"action": "give_up"}]},
+        {"condition": "is_state", "state": "idle"},
+        {"action": "wander"}
+    ]
+}
+
+LEAVES = {}
+
+def leaf(name: str):
+    def register(fn):
+        LEAVES[name] = fn
+        return fn
+    return register
+
+_compiled = {}  # {nome: (definição, BehaviorTree)}
+
+def get_behavior_tree(name: str | None = None) -> BehaviorTree:
+    """Árvore compilada de `name` (compilada uma vez e compartilhada entre templates e mapas)."""
+    name = name or DEFAULT_BEHAVIOR_NAME
+    definition = metadata_registry.get_behavior(name)
+    if definition is None:
+        if name != DEFAULT_BEHAVIOR_NAME:
+            logger.warning(f"Behavior '{name}' not found. Using '{DEFAULT_BEHAVIOR_NAME}'.")
+            return get_behavior_tree(DEFAULT_BEHAVIOR_NAME)
+        definition = DEFAULT_BEHAVIOR
+
+    cached = _compiled.get(name)
+    if cached is not None and cached[0] is definition:
+        return cached[1]
+    try:
+        tree = compile_tree(name, definition, LEAVES)
+    except BehaviorTreeError as e:
+        if definition is DEFAULT_BEHAVIOR:
+            raise
+        logger.error(f"Invalid behavior '{name}': {e}. Using the built-in default.")
+        definition = DEFAULT_BEHAVIOR
+        tree = compile_tree(name, definition, LEAVES)
+    _compiled[name] = (definition, tree)
+    return tree
+
+# --- Condições ---
+
+@leaf("is_state")
+def is_state(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    return SUCCESS if ai_comp.state == params.get("state") else FAILURE
+
+@leaf("is_engaged")
+def is_engaged(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    return SUCCESS if ai_comp.state == 'chasing' or ai_comp.state == 'attacking' else FAILURE
+
+@leaf("has_target")
+def has_target(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    return SUCCESS if _target_position(ai_system, ai_comp) is not None else FAILURE
+
+@leaf("target_in_range")
+def target_in_range(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    target_pos = _target_position(ai_system, ai_comp)
+    if target_pos is None:
+        return FAILURE
+    in_range = math.hypot(target_pos.x - pos_comp.x, target_pos.y - pos_comp.y) <= params.get("range", ATTACK_RANGE)
+    return SUCCESS if in_range else FAILURE
+
+# --- Ações ---
+
+@leaf("idle")
+def idle(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    return SUCCESS
+
+@leaf("attack")
+def attack(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    ai_comp.state = 'attacking'
+    now = time.monotonic()
+    if now >= ai_comp.next_attack_at:
+        ai_comp.next_attack_at = now + ai_comp.attack_interval
+        ai_comp.wants_attack = True
+    return RUNNING
+
+@leaf("chase")
+def chase(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    target_pos = _target_position(ai_system, ai_comp)
+    if target_pos is None:
+        start_returning(ai_system, entity_id, ai_comp)
+        return FAILURE
+    ai_comp.state = 'chasing'
+    step = params.get("step", NPC_CHASE_STEP) * ai_comp.elapsed
+
+    # Vários monstros atrás do mesmo alvo: todos descem o mesmo flow field
+    flow_fields = ai_system.flow_fields
+    target_id = ai_comp.target_entity_id
+    if flow_fields.join(entity_id, target_id, target_pos.x, target_pos.y):
+        if not flow_fields.has_field(target_id):
+            return RUNNING  # primeiro campo ainda sendo montado
+        waypoint = flow_fields.next_waypoint(target_id, pos_comp.x, pos_comp.y, target_pos.x, target_pos.y)
+        if waypoint is not None:
+            ai_comp.path_goal_x = ai_comp.path_goal_y = None
+            ai_system.pathfinder.release(entity_id)  # busca de antes do campo não serve mais
+            move_towards(pos_comp, ai_comp, waypoint[0], waypoint[1], step)
+            # Fora do centro do tile o caminho reto até o próximo pode raspar numa quina
+            ai_comp.recenter_step = step
+            return RUNNING
+
+    if navigate(ai_system, entity_id, pos_comp, ai_comp, target_pos.x, target_pos.y, step) is None:
+        logger.debug(f"Monster {entity_id} cannot reach target {target_id}. Returning home.")
+        start_returning(ai_system, entity_id, ai_comp)
+        return FAILURE
+    return RUNNING
+
+@leaf("give_up")
+def give_up(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    start_returning(ai_system, entity_id, ai_comp)
+    return SUCCESS
+
+@leaf("return_home")
+def return_home(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    if ai_comp.home_x is not None:
+        step = params.get("step", NPC_CHASE_STEP) * ai_comp.elapsed
+        arrived = navigate(ai_system, entity_id, pos_comp, ai_comp, ai_comp.home_x, ai_comp.home_y, step)
+        if arrived is False:
+            return RUNNING
+    # Chegou (ou não há caminho de volta): retoma a patrulha dali
+    ai_comp.state = 'wandering'
+    ai_comp.clear_path()
+    return SUCCESS
+
+@leaf("wander")
+def wander(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, params) -> int:
+    ai_comp.state = 'wandering'
+    if random.random() < params.get("chance", WANDER_CHANCE) * ai_comp.elapsed:
+        distance = params.get("distance", WANDER_DISTANCE)
+        ai_comp.move_x = pos_comp.x + random.uniform(-distance, distance)
+        ai_comp.move_y = pos_comp.y + random.uniform(-distance, distance)
+        ai_comp.wants_move = True
+
+    # Se afastou demais do ponto de spawn: volta pelo caminho
+    if ai_comp.home_x is not None and math.hypot(pos_comp.x - ai_comp.home_x, pos_comp.y - ai_comp.home_y) > params.get("radius", WANDER_RADIUS):
+        ai_comp.state = 'returning'
+    return SUCCESS
+
+# --- Auxiliares ---
+
+def start_returning(ai_system, entity_id: int, ai_comp: AIComponent):
+    if ai_comp.target_entity_id is not None:
+        ai_system.flow_fields.leave(entity_id, ai_comp.target_entity_id)
+    ai_comp.state = 'returning'
+    ai_comp.target_entity_id = None
+    ai_comp.clear_path()
+
+def navigate(ai_system, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent, goal_x: float, goal_y: float, step: float) -> bool | None:
+    """
+    Anda `step` em direção a (goal_x, goal_y) pelos waypoints do Pathfinder.
+    True ao chegar, False a caminho (ou esperando a busca), None se não há caminho.
+    """
+    goal_tile_x, goal_tile_y = int(goal_x), int(goal_y)
+    if ai_comp.path_goal_x != goal_tile_x or ai_comp.path_goal_y != goal_tile_y:
+        # Destino mudou de tile: pede um caminho novo a partir de onde está
+        path = ai_system.pathfinder.find_path(pos_comp.x, pos_comp.y, goal_x, goal_y, requester=entity_id)
+        if path is None:
+            if ai_comp.path_index >= len(ai_comp.path):
+                return False
+            # Busca em andamento: segue o caminho antigo enquanto isso
+        elif not path:
+            return None
+        else:
+            ai_comp.path = path  # em cache e compartilhado: só avança o índice
+            ai_comp.path_index = 0
+            ai_comp.path_goal_x, ai_comp.path_goal_y = goal_tile_x, goal_tile_y
+
+    # Waypoint atual; depois do último, vai direto ao ponto exato do destino
+    if ai_comp.path_index < len(ai_comp.path):
+        waypoint_x, waypoint_y = ai_comp.path[ai_comp.path_index]
+        if move_towards(pos_comp, ai_comp, waypoint_x, waypoint_y, step):
+            ai_comp.path_index += 1
+        return False
+    reached = move_towards(pos_comp, ai_comp, goal_x, goal_y, step)
+    return reached and ai_comp.path_goal_x == goal_tile_x and ai_comp.path_goal_y == goal_tile_y
+
+def move_towards(pos_comp: PositionComponent, ai_comp: AIComponent, x: float, y: float, step: float) -> bool:
+    """Pede um passo de até `step` em direção a (x, y). True se o passo alcança o ponto."""
+    distance = math.hypot(x - pos_comp.x, y - pos_comp.y)
+    if distance <= step:
+        ai_comp.move_x, ai_comp.move_y = x, y
+    else:
+        ai_comp.move_x = pos_comp.x + (x - pos_comp.x) / distance * step
+        ai_comp.move_y = pos_comp.y + (y - pos_comp.y) / distance * step
+    ai_comp.wants_move = True
+    return distance <= step
+
+def _target_position(ai_system, ai_comp: AIComponent) -> PositionComponent | None:
+    if ai_comp.target_entity_id is None:
+        return None
+    components = ai_system.world.entities.get(ai_comp.target_entity_id)
+    return components.get(PositionComponent) if components is not None else None
@@ -1,54 +1,135 @@
+from server.game_engine.behavior_tree import BehaviorBatch
 from server.game_engine.components.ai import AIComponent
+from server.game_engine.flow_field import FlowFields
+from server.game_engine.pathfinding import Pathfinder
 from server.game_engine.world import World
 from server.game_engine.components.type import TypeComponent
 from server.game_engine.components.position import PositionComponent
+from server.systems.ai_behaviors import get_behavior_tree
 from server.systems.movement_system import MovementSystem
+from shared.constants import AI_THINK_BUDGET
 from shared.logger import get_logger
-from shared.protocol import PACKET_POSITION_UPDATE
 
-import random
-import asyncio
+import math
+from collections import deque
 
 logger = get_logger(__name__)
 
+# A cada quantos ticks procura monstros novos (ainda não agendados) no mundo
+AI_DISCOVERY_TICKS = 60
+# Estados em que o monstro se move todo o tempo: pensam a cada combat_think_interval
+ACTIVE_STATES = ('chasing', 'attacking', 'returning')
+
 class AISystem:
-    def __init__(self, world: World, movement_system: MovementSystem, send_aoi_update_func):
+    def __init__(self, world: World, movement_system: MovementSystem, send_aoi_update_func, pathfinder: Pathfinder, flow_fields: FlowFields, attack_func=None, think_budget: int = AI_THINK_BUDGET):
         self.world = world
         self.movement_system = movement_system
         self.send_aoi_update = send_aoi_update_func # Necessário para o broadcast de posição
-        self.NPC_MOVEMENT_SPEED = 0.5 # Velocidade base de movimento por tick (unidades por segundo)
-        self.WANDER_RADIUS = 5.0      # Raio de patrulha para NPCs
+        self.attack = attack_func                   # CombatSystem.handle_damage_request
+        self.pathfinder = pathfinder
+        self.flow_fields = flow_fields
+        self.default_behavior = get_behavior_tree()
+
+        # Agendamento: cada monstro pensa a cada think_interval ticks, no máximo
+        # think_budget por tick; os vencidos que não couberem passam para o tick seguinte
+        self.think_budget = think_budget
+        self.ticks = 0
+        self.wheel = {}          # {tick: [entity_id]}
+        self.ready = deque()     # vencidos, em ordem de chegada
+        self.scheduled = set()
+        self.batches = {}        # {BehaviorTree: BehaviorBatch}, reaproveitados entre ticks
 
     async def run(self):
-        target_components = (TypeComponent, PositionComponent, AIComponent)
-        
-        for entity_id, components_list in self.world.get_entities_with_components(target_components):
-            type_comp, pos_comp, ai_comp = components_list
-            
-            if type_comp.entity_type == 'monster':
-                await self._process_monster_ai(entity_id, pos_comp, ai_comp)
+        self.ticks += 1
+        if self.ticks % AI_DISCOVERY_TICKS == 1:
+            self._schedule_new_entities()
+
+        due = self.wheel.pop(self.ticks, None)
+        if due:
+            self.ready.extend(due)
+
+        # Separa a fatia deste tick por árvore (monstros do mesmo template avaliam juntos)
+        entities = self.world.entities
+        processed = 0
+        while self.ready and processed < self.think_budget:
+            entity_id = self.ready.popleft()
+            components = entities.get(entity_id)
+            ai_comp = components.get(AIComponent) if components else None
+            pos_comp = components.get(PositionComponent) if components else None
+            if ai_comp is None or pos_comp is None:
+                self.scheduled.discard(entity_id)  # removida (morreu ou saiu do mapa)
+                self.pathfinder.release(entity_id)
+                continue
+
+            # Passos proporcionais ao tempo desde a última avaliação (limitados ao intervalo normal)
+            elapsed = 1 if ai_comp.last_think_tick is None else self.ticks - ai_comp.last_think_tick
+            ai_comp.elapsed = min(elapsed, ai_comp.think_interval)
+            ai_comp.last_think_tick = self.ticks
+
+            tree = ai_comp.behavior or self.default_behavior
+            batch = self.batches.get(tree)
+            if batch is None:
+                batch = self.batches[tree] = BehaviorBatch(tree)
+            batch.add(entity_id, pos_comp, ai_comp)
+            processed += 1
+
+        # A avaliação só escreve intenções no blackboard; movimento e ataque saem depois
+        for batch in self.batches.values():
+            if batch.count:
+                batch.tree.tick_batch(self, batch)
+        for batch in self.batches.values():
+            if batch.count:
+                await self._apply_batch(batch)
+                batch.reset()
+
+        # Campos e buscas pedidos neste tick avançam dentro de um orçamento de nós só;
+        # os caminhos chegam nos próximos ticks
+        budget = self.pathfinder.node_budget
+        budget -= self.flow_fields.run(budget)
+        self.pathfinder.run(budget)
+
+    async def _apply_batch(self, batch: BehaviorBatch):
+        entity_ids, positions, blackboards = batch.entity_ids, batch.positions, batch.blackboards
+        index = 0
+        while index < batch.count:
+            entity_id, pos_comp, ai_comp = entity_ids[index], positions[index], blackboards[index]
+            index += 1
+
+            if ai_comp.wants_move:
+                ai_comp.wants_move = False
+                last_x, last_y = pos_comp.x, pos_comp.y
+                await self.movement_system.handle_npc_move(entity_id, ai_comp.move_x, ai_comp.move_y)
+                if ai_comp.recenter_step and pos_comp.x == last_x and pos_comp.y == last_y:
+                    await self._recenter(entity_id, pos_comp, ai_comp.recenter_step)
+                ai_comp.recenter_step = 0.0
+            if ai_comp.wants_attack:
+                ai_comp.wants_attack = False
+                if self.attack and ai_comp.target_entity_id is not None:
+                    await self.attack(entity_id, ai_comp.target_entity_id)
+
+            interval = ai_comp.combat_think_interval if ai_comp.state in ACTIVE_STATES else ai_comp.think_interval
+            self._schedule(entity_id, self.ticks + interval)
+
+    async def _recenter(self, entity_id: int, pos_comp: PositionComponent, step: float):
+        """Passo de até `step` em direção ao centro do tile atual."""
+        center_x, center_y = int(pos_comp.x) + 0.5, int(pos_comp.y) + 0.5
+        distance = math.hypot(center_x - pos_comp.x, center_y - pos_comp.y)
+        if distance > step:
+            center_x = pos_comp.x + (center_x - pos_comp.x) / distance * step
+            center_y = pos_comp.y + (center_y - pos_comp.y) / distance * step
+        await self.movement_system.handle_npc_move(entity_id, center_x, center_y)
+
+    def _schedule(self, entity_id: int, tick: int):
+        bucket = self.wheel.get(tick)
+        if bucket is None:
+            bucket = self.wheel[tick] = []
+        bucket.append(entity_id)
+
+    def _schedule_new_entities(self):
+        for entity_id, (type_comp, ai_comp) in self.world.get_entities_with_components((TypeComponent, AIComponent)):
+            if entity_id in self.scheduled or type_comp.entity_type != 'monster':
+                continue
             # Adicione 'npc' ou outros tipos de entidades aqui
-            
-    async def _process_monster_ai(self, entity_id: int, pos_comp: PositionComponent, ai_comp: AIComponent):
-        
-        # Lógica baseada no estado da IA
-        if ai_comp.state == 'wandering':
-            
-            if random.random() < 0.1: # 10% de chance de tentar mover
-                
-                # ... (Sua lógica de cálculo delta_x/delta_y existente)
-                delta_x = random.uniform(-self.NPC_MOVEMENT_SPEED, self.NPC_MOVEMENT_SPEED)
-                delta_y = random.uniform(-self.NPC_MOVEMENT_SPEED, self.NPC_MOVEMENT_SPEED)
-                
-                new_x = pos_comp.x + delta_x
-                new_y = pos_comp.y + delta_y
-                
-                await self.movement_system.handle_npc_move(entity_id, new_x, new_y)
-                
-        elif ai_comp.state == 'idle':
-            # Não faz nada
-            pass
-            
-        elif ai_comp.state == 'chasing':
-            # Futura lógica de perseguição de ai_comp.target_entity_id
-            pass
\ No newline at end of file
+            self.scheduled.add(entity_id)
+            # Espalha a primeira avaliação pelo intervalo: monstros criados juntos não pensam juntos
+            self._schedule(entity_id, self.ticks + entity_id % ai_comp.think_interval)
@@ -1,6 +1,6 @@
 import math
 from server.game_engine.components.collision import CollisionComponent
-from server.game_engine.collision.shapes import BoxCollider, CircleCollider, SpriteCollider
+from server.game_engine.collision.shapes import BoxCollider, CircleCollider, SpriteCollider, half_extent
 from server.game_engine.map import GameMap
 from server.game_engine.components.position import PositionComponent
 from server.game_engine.world import World
@@ -47,12 +47,18 @@ class CollisionSystem:
         if not current_collision:
             return False
 
-        entity_iter = world.get_entities_with_components((PositionComponent, CollisionComponent))
+        # Margem: o próprio collider mais o maior do mundo, para não perder nenhum vizinho
+        query_margin = half_extent(current_collision.shape) + world.max_collider_half_extent
 
-        for entity_id, (pos, col) in entity_iter:
+        for entity_id in world.spatial_index.query_radius(target_x, target_y, query_margin):
             if entity_id == current_entity_id:
                 continue
 
+            pos = world.get_component(entity_id, PositionComponent)
+            col = world.get_component(entity_id, CollisionComponent)
+            if not pos or not col:
+                continue
+
             # determina colisão dependendo do tipo de shape
             if isinstance(current_collision.shape, CircleCollider) and isinstance(col.shape, CircleCollider):
                 # círculo vs círculo
@@ -6,7 +6,7 @@ from server.game_engine.components.position import PositionComponent
 from server.game_engine.components.type import TypeComponent
 from server.game_engine.components.network import NetworkComponent
 from server.utils.utils import calculate_distance
-from shared.logger import get_logger
+from shared.logger import get_logger, get_rate_limited_logger
 from shared.constants import ATTACK_RANGE
 from shared.protocol import (
     PACKET_HEALTH_UPDATE,
@@ -17,14 +17,19 @@ from shared.protocol import (
 )
 
 logger = get_logger(__name__)
+attack_log = get_rate_limited_logger(f"{__name__}.attacks")
+damage_log = get_rate_limited_logger(f"{__name__}.damage")
 
 class CombatSystem:
-    def __init__(self, world, network_manager, send_aoi_update_func, send_system_message_func):
+    def __init__(self, world, network_manager, send_aoi_update_func, send_system_message_func, respawn_point=(10.0, 10.0), add_threat_func=None, forget_threat_func=None):
         self.world = world
         self.network_manager = network_manager
         self.send_aoi_update = send_aoi_update_func
         self.send_system_message = send_system_message_func
+        self.add_threat = add_threat_func       # Tabelas de ameaça dos monstros (AggroSystem)
+        self.forget_threat = forget_threat_func
         self.ATTACK_RANGE = 2.0
+        self.respawn_point = respawn_point
 
     async def handle_damage_request(self, source_entity_id: int, target_entity_id: int):
         source_pos = self.world.get_component(source_entity_id, PositionComponent)
@@ -57,7 +62,7 @@ class CombatSystem:
         is_dead = await self._apply_damage(target_entity_id, damage_amount, source_entity_id)
 
         if not is_dead:
-            logger.info(f"Combat: {source_user} (Entity {source_entity_id}) attacked Entity {target_entity_id} for {damage_amount} damage.")
+            attack_log.info("Combat: %s (Entity %s) attacked Entity %s for %s damage.", source_user, source_entity_id, target_entity_id, damage_amount)
 
 
     def _calculate_final_damage(self, source_id: int, target_id: int) -> int:
@@ -87,8 +92,11 @@ class CombatSystem:
             return False
 
         damage_dealt = health_comp.take_damage(damage_amount)
+
+        if self.add_threat:
+            self.add_threat(target_entity_id, source_entity_id, damage_dealt)
         
-        logger.info(f"Entity {target_entity_id} took {damage_dealt} damage. HP: {health_comp.current_health}/{health_comp.max_health}")
+        damage_log.info("Entity %s took %s damage. HP: %s/%s", target_entity_id, damage_dealt, health_comp.current_health, health_comp.max_health)
         
         await self._broadcast_health_update(target_entity_id, health_comp)
         
@@ -112,8 +120,7 @@ class CombatSystem:
             
             await self.network_manager.broadcast_system_message(f"{target_user} has been defeated!", exclude_writer=None)
             
-            RESPAWN_X = 10.0 
-            RESPAWN_Y = 10.0 
+            RESPAWN_X, RESPAWN_Y = self.respawn_point
             
             await self._handle_entity_death(target_entity_id, target_user, RESPAWN_X, RESPAWN_Y, source_id=source_entity_id)
             
@@ -147,8 +154,10 @@ class CombatSystem:
             health_comp = self.world.get_component(entity_id, HealthComponent)
             
             if pos_comp and health_comp:
-                pos_comp.x = initial_x
-                pos_comp.y = initial_y
+                if self.forget_threat:
+                    self.forget_threat(entity_id)
+
+                self.world.move_entity(entity_id, initial_x, initial_y)
                 
                 health_comp.heal_to_full() 
                 
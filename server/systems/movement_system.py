@@ -4,20 +4,26 @@ from server.game_engine.components.position import PositionComponent
 from server.game_engine.components.network import NetworkComponent
 from server.game_engine.components.stats import StatsComponent
 from shared.logger import get_logger
-from shared.protocol import PACKET_POSITION_UPDATE
+from shared.protocol import PACKET_MOVE_ACK, PACKET_POSITION_UPDATE
 from shared.constants import MAX_MOVE_DISTANCE
 
 logger = get_logger(__name__)
 
 class MovementSystem:
+    """
+    MOVE com "seq" vem de cliente com predição: o servidor não ecoa cada passo para quem
+    se moveu, só manda um MOVE_ACK por tick com o último seq processado e a posição
+    autoritativa (flush_acks). MOVE sem "seq" continua recebendo o POS_UPDATE de volta.
+    """
     def __init__(self, world, network_manager, collision_system, send_aoi_update_func):
         self.world = world
         self.network_manager = network_manager
         self.collision_system = collision_system
         self.send_aoi_update = send_aoi_update_func
         self.MAX_MOVE_DISTANCE = MAX_MOVE_DISTANCE
+        self.pending_acks = {}  # {entity_id: último seq processado neste tick}
 
-    async def handle_move_request(self, entity_id: int, writer, dx: float, dy: float):
+    async def handle_move_request(self, entity_id: int, writer, dx: float, dy: float, seq: int | None = None):
         pos_comp = self.world.get_component(entity_id, PositionComponent)
         network_comp = self.world.get_component(entity_id, NetworkComponent)
 
@@ -52,7 +58,7 @@ class MovementSystem:
         distance_moved = (dx ** 2 + dy ** 2) ** 0.5
         if distance_moved > max_allowed_distance:
             logger.warning(f"User {user} attempted invalid move distance ({distance_moved:.2f}) > allowed ({max_allowed_distance:.2f})")
-            await self._resync_position(entity_id, writer, current_x, current_y, user)
+            await self._reject(entity_id, writer, current_x, current_y, user, seq)
             return
 
         # Aplica colisão
@@ -61,12 +67,11 @@ class MovementSystem:
         )
 
         if not moved:
-            await self._resync_position(entity_id, writer, current_x, current_y, user)
+            await self._reject(entity_id, writer, current_x, current_y, user, seq)
             return
 
         # Atualiza posição
-        pos_comp.x = final_x
-        pos_comp.y = final_y
+        self.world.move_entity(entity_id, final_x, final_y)
 
         # logger.debug(f"Updated position for Entity {entity_id} to ({final_x:.1f}, {final_y:.1f})")
 
@@ -80,7 +85,34 @@ class MovementSystem:
 
         # Atualiza clientes na AoI
         await self.send_aoi_update(entity_id, update_packet, exclude_writer=writer)
-        await self.network_manager.send_packet(writer, update_packet)
+        if seq is None:
+            await self.network_manager.send_packet(writer, update_packet)
+        else:
+            self.pending_acks[entity_id] = seq
+
+    async def _reject(self, entity_id, writer, x, y, user, seq):
+        if seq is None:
+            await self._resync_position(entity_id, writer, x, y, user)
+        else:
+            # O ack leva a posição autoritativa; o cliente refaz a partir dela
+            self.pending_acks[entity_id] = seq
+
+    async def flush_acks(self):
+        """Um MOVE_ACK por jogador que se moveu desde o último tick."""
+        if not self.pending_acks:
+            return
+        acks, self.pending_acks = self.pending_acks, {}
+        for entity_id, seq in acks.items():
+            pos_comp = self.world.get_component(entity_id, PositionComponent)
+            network_comp = self.world.get_component(entity_id, NetworkComponent)
+            if not pos_comp or not network_comp:
+                continue
+            await self.network_manager.send_packet(network_comp.writer, {
+                "type": PACKET_MOVE_ACK,
+                "seq": seq,
+                "x": pos_comp.x,
+                "y": pos_comp.y,
+            })
 
     async def _resync_position(self, entity_id, writer, x, y, user):
         await self.network_manager.send_packet(writer, {
@@ -108,8 +140,7 @@ class MovementSystem:
         if not moved:
             return
 
-        pos_comp.x = final_x
-        pos_comp.y = final_y
+        self.world.move_entity(entity_id, final_x, final_y)
         
         update_packet = {
             "type": PACKET_POSITION_UPDATE,
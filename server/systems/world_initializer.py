@@ -1,4 +1,5 @@
 from server.db.npcs import get_initial_spawns
+from server.game_engine.components.aggro import AggroComponent
 from server.game_engine.components.ai import AIComponent
 from server.game_engine.components.collision import CollisionComponent
 from server.game_engine.components.health import HealthComponent
@@ -6,6 +7,8 @@ from server.game_engine.components.stats import StatsComponent
 from server.game_engine.components.type import TypeComponent
 from server.game_engine.components.position import PositionComponent
 from server.game_engine.components.network import NetworkComponent
+from server.systems.ai_behaviors import get_behavior_tree
+from server.utils.metadata_registry import metadata_registry
 from shared.logger import get_logger
 from server.game_engine.components.collision import CollisionComponent
 from server.game_engine.collision.shapes import BoxCollider, CircleCollider, SpriteCollider
@@ -28,7 +31,7 @@ class WorldInitializer:
 
     async def _spawn_initial_npcs(self):
 
-        initial_npcs = await get_initial_spawns(self.db_pool)
+        initial_npcs = await get_initial_spawns(self.db_pool, self.game_map.MAP_NAME)
 
         if not initial_npcs:
             logger.warning("No initial NPC spawn data found in the database. Spawning skipped.")
@@ -93,9 +96,27 @@ class WorldInitializer:
         self.world.add_component(npc_entity_id, TypeComponent(entity_type='monster'))
         self.world.add_component(npc_entity_id, NetworkComponent(writer=None, username=asset_type))
 
+        # Comportamento (árvore, percepção, leash, ritmos) vem do template do monstro
+        template = metadata_registry.get_monster_template(asset_type) or {}
+        ai_info = template.get("ai", {})
+
+        self.world.add_component(
+            npc_entity_id,
+            AIComponent(
+                initial_state='wandering', home_x=x, home_y=y,
+                attack_interval=ai_info.get("attack_interval", 1.5),
+                think_interval=ai_info.get("think_interval", 6),
+                combat_think_interval=ai_info.get("combat_think_interval", 2),
+                behavior=get_behavior_tree(ai_info.get("behavior"))
+            )
+        )
         self.world.add_component(
             npc_entity_id,
-            AIComponent(initial_state='wandering', home_x=x, home_y=y)
+            AggroComponent(
+                aggressive=ai_info.get("aggressive", True),
+                perception_radius=ai_info.get("perception_radius", 6.0),
+                leash_radius=ai_info.get("leash_radius", 15.0)
+            )
         )
 
         logger.info(f"NPC Entity {npc_entity_id} ('{asset_type}') spawned at ({x}, {y}).")
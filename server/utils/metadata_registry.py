@@ -0,0 +1,92 @@
+import json
+import os
+from shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+class MetadataRegistry:
+    """
+    Carrega tilesets.json, map_metadata.json, classes_metadata.json e os templates e
+    behaviors de monster_templates.json uma única vez
+    e os indexa por nome. `reload()` relê os arquivos explicitamente (hot reload);
+    se um arquivo falhar, a versão já carregada é mantida.
+    """
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self.tilesets: dict[str, dict] = {}
+        self.maps: dict[str, dict] = {}
+        self.classes: dict[str, dict] = {}
+        self.monsters: dict[str, dict] = {}
+        self.behaviors: dict[str, dict] = {}
+        self._loaded = False
+
+    def _read_json(self, filename: str):
+        path = os.path.join(self.data_dir, filename)
+        if not os.path.exists(path):
+            logger.error(f"Metadata file not found at {path}")
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding {filename}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error loading {filename}: {e}")
+        return None
+
+    def reload(self):
+        tilesets = self._read_json('tilesets.json')
+        if isinstance(tilesets, dict):
+            self.tilesets = tilesets
+
+        maps = self._read_json('map_metadata.json')
+        if isinstance(maps, list):
+            self.maps = {m["name"]: m for m in maps if "name" in m}
+
+        classes = self._read_json('classes_metadata.json')
+        if isinstance(classes, dict):
+            self.classes = classes
+
+        monsters = self._read_json('monster_templates.json')
+        if isinstance(monsters, dict):
+            self.monsters = {t["asset_type"]: t for t in monsters.get("templates", []) if "asset_type" in t}
+            self.behaviors = monsters.get("behaviors", {})
+
+        self._loaded = True
+        logger.info(f"Metadata loaded: {len(self.tilesets)} tilesets, {len(self.maps)} maps, {len(self.classes)} classes, {len(self.monsters)} monster templates.")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reload()
+
+    def get_tileset(self, key: str) -> dict | None:
+        self._ensure_loaded()
+        return self.tilesets.get(key)
+
+    def get_map(self, map_name: str) -> dict | None:
+        self._ensure_loaded()
+        return self.maps.get(map_name)
+
+    def get_map_names(self) -> list[str]:
+        self._ensure_loaded()
+        return list(self.maps.keys())
+
+    def get_class(self, class_name: str) -> dict | None:
+        self._ensure_loaded()
+        return self.classes.get(class_name)
+
+    def get_all_classes(self) -> dict:
+        self._ensure_loaded()
+        return self.classes
+
+    def get_monster_template(self, asset_type: str) -> dict | None:
+        self._ensure_loaded()
+        return self.monsters.get(asset_type)
+
+    def get_behavior(self, name: str) -> dict | None:
+        self._ensure_loaded()
+        return self.behaviors.get(name)
+
+metadata_registry = MetadataRegistry()
@@ -8,9 +8,69 @@ IP = os.getenv("IP", "localhost")
 PORT = int(os.getenv("PORT", "8080"))
 DATA_PAYLOAD_SIZE = int(os.getenv("DATA_PAYLOAD_SIZE", "262144"))
 
+# Event loop: "auto" usa uvloop quando instalado, "uvloop" exige e "asyncio" força o padrão
+EVENT_LOOP = os.getenv("EVENT_LOOP", "auto")
+# Sockets dos clientes: TCP_NODELAY e marcas d'água do buffer de escrita (drain espera acima de HIGH)
+TCP_NODELAY = os.getenv("TCP_NODELAY", "1") == "1"
+WRITE_BUFFER_HIGH = int(os.getenv("WRITE_BUFFER_HIGH", str(256 * 1024)))
+WRITE_BUFFER_LOW = int(os.getenv("WRITE_BUFFER_LOW", str(64 * 1024)))
+
+# Rate limit por conexão (token bucket "taxa/s:rajada"): total e por tipo de pacote.
+# Pacotes acima do limite são descartados; quem acumula RATE_LIMIT_STRIKES descartes em
+# ~10s é desconectado. Tipos fora de RATE_LIMITS só contam no total.
+RATE_LIMIT_TOTAL = os.getenv("RATE_LIMIT_TOTAL", "120:240")
+RATE_LIMITS = os.getenv("RATE_LIMITS", "MOVE=75:120,DAMAGE=5:10,CHAT_MESSAGE=1:5,EVOLVE=1:3,ITEM_USE=5:10,AUTH=1:5,REGISTER=1:5")
+RATE_LIMIT_STRIKES = int(os.getenv("RATE_LIMIT_STRIKES", "100"))
+
+# Chat: escopo do texto sem comando (say, zone, party, global), intervalo mínimo entre
+# mensagens /global de um mesmo jogador (segundos) e tamanho máximo de grupo
+CHAT_DEFAULT_SCOPE = os.getenv("CHAT_DEFAULT_SCOPE", "say")
+GLOBAL_CHAT_INTERVAL = float(os.getenv("GLOBAL_CHAT_INTERVAL", "10"))
+MAX_PARTY_SIZE = int(os.getenv("MAX_PARTY_SIZE", "5"))
+
+# Logging: nível padrão e níveis por módulo (ex: "server.systems=INFO,shared.protocol=ERROR")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_HOT_RATE = float(os.getenv("LOG_HOT_RATE", "5"))    # mensagens/s por call site quente
+LOG_HOT_BURST = int(os.getenv("LOG_HOT_BURST", "10"))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_HOST = os.getenv("METRICS_HOST", "localhost")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# Multi-processo: 0 = tudo num processo só; N > 0 = processo de frente + N workers de mapas.
+# SHARD_MAPS fixa mapas em workers (ex: "Starting_Area=0,Dark_Forest=1"); o resto é round-robin.
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))
+SHARD_MAPS = os.getenv("SHARD_MAPS", "")
+
+# Gateways: "standalone" (padrão) faz tudo num processo; "simulation" só simula e aceita
+# gateways em GATEWAY_SOCKET; "gateway" atende os clientes e fala com a simulação.
+# GATEWAY_PROCESSES > 0 num processo standalone vira simulação e sobe N gateways locais.
+SERVER_ROLE = os.getenv("SERVER_ROLE", "standalone")
+GATEWAY_SOCKET = os.getenv("GATEWAY_SOCKET", "/tmp/mmo_simulation.sock")
+GATEWAY_PROCESSES = int(os.getenv("GATEWAY_PROCESSES", "0"))
+
+# Processos de login: N > 0 sobe N processos que aceitam e autenticam na mesma porta
+# (SO_REUSEPORT) e passam o socket autenticado ao processo do jogo por LOGIN_HANDOFF_SOCKET.
+LOGIN_ACCEPTORS = int(os.getenv("LOGIN_ACCEPTORS", "0"))
+LOGIN_HANDOFF_SOCKET = os.getenv("LOGIN_HANDOFF_SOCKET", "/tmp/mmo_login.sock")
+
 GAME_TICK_RATE = 60 
 TICK_INTERVAL = 1.0 / GAME_TICK_RATE
 
+# Posições de entidades remotas saem em lote a REMOTE_UPDATE_RATE por segundo (a última de
+# cada entidade); o cliente desenha INTERPOLATION_DELAY segundos no passado, interpolando
+# entre os snapshots recebidos
+REMOTE_UPDATE_RATE = float(os.getenv("REMOTE_UPDATE_RATE", "15"))
+REMOTE_UPDATE_INTERVAL = 1.0 / REMOTE_UPDATE_RATE
+INTERPOLATION_DELAY = float(os.getenv("INTERPOLATION_DELAY", str(round(2 * REMOTE_UPDATE_INTERVAL, 3))))
+
+# Frequência por distância ao observador ("distância:a cada N lotes"): perto (na tela) a
+# cada lote, longe com menos frequência; saltos >= SIGNIFICANT_MOVE_DISTANCE saem na hora
+UPDATE_TIERS = os.getenv("UPDATE_TIERS", "8:1,16:2,25:4")
+SIGNIFICANT_MOVE_DISTANCE = float(os.getenv("SIGNIFICANT_MOVE_DISTANCE", "2.0"))
+
 PLAYER_MOVE_SPEED = 0.2
 
 ATTACK_RANGE = 2.0
@@ -27,6 +87,33 @@ SCALE = 2
 SPRITE_SIZE = TILE_SIZE * SCALE
 
 A_O_I_RANGE = 25.0
+# Histerese da AOI: entidades entram a A_O_I_RANGE e só saem além de A_O_I_RANGE + margem
+AOI_LEAVE_MARGIN = float(os.getenv("AOI_LEAVE_MARGIN", "3.0"))
+
+# Lado (em tiles) de cada célula do índice espacial de cada mapa
+SPATIAL_CELL_SIZE = 4.0
+
+# Pathfinding dos monstros (A* na grade de tiles): nós expandidos por tick somando todas as
+# buscas do mapa, limite por busca (acima disso o destino conta como inalcançável) e
+# quantos caminhos (célula de origem, célula de destino) ficam em cache
+PATHFINDING_NODE_BUDGET = int(os.getenv("PATHFINDING_NODE_BUDGET", "1000"))
+PATHFINDING_MAX_NODES = int(os.getenv("PATHFINDING_MAX_NODES", "8000"))
+PATH_CACHE_SIZE = int(os.getenv("PATH_CACHE_SIZE", "512"))
+# Flow fields: alvos com pelo menos FLOW_FIELD_MIN_PURSUERS perseguidores ganham um campo
+# compartilhado, de FLOW_FIELD_RADIUS tiles em volta do alvo (dentro do mesmo orçamento de nós)
+FLOW_FIELD_MIN_PURSUERS = int(os.getenv("FLOW_FIELD_MIN_PURSUERS", "3"))
+FLOW_FIELD_RADIUS = int(os.getenv("FLOW_FIELD_RADIUS", "16"))
+# Aggro: cada monstro procura jogadores a cada AGGRO_CHECK_INTERVAL ticks (em fatias
+# alternadas, o custo por tick não cresce com o número de monstros). Quem é visto entra
+# na tabela de ameaça com AGGRO_PERCEPTION_THREAT; dano soma 1 de ameaça por ponto.
+AGGRO_CHECK_INTERVAL = max(1, int(os.getenv("AGGRO_CHECK_INTERVAL", "10")))
+AGGRO_PERCEPTION_THREAT = float(os.getenv("AGGRO_PERCEPTION_THREAT", "1.0"))
+# IA dos monstros: no máximo AI_THINK_BUDGET monstros pensam por tick; o resto fica para o
+# tick seguinte. Cada um pensa a cada think_interval ticks (combat_think_interval em combate),
+# valores do bloco "ai" do template
+AI_THINK_BUDGET = max(1, int(os.getenv("AI_THINK_BUDGET", "200")))
+
+DEFAULT_MAP_NAME = "Starting_Area"
 
 DB_NAME = os.getenv("DB_NAME", "mmo_db")
 DB_USER = os.getenv("DB_USER", "postgres")
@@ -34,6 +121,12 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", 5432))
 
+# Backend de armazenamento: "postgres" (asyncpg) ou "memory" (sem banco, para testes de carga/CI)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres")
+DB_SIMULATED_LATENCY_MS = float(os.getenv("DB_SIMULATED_LATENCY_MS", "0"))
+DB_SIMULATED_JITTER_MS = float(os.getenv("DB_SIMULATED_JITTER_MS", "0"))
+DB_SIMULATED_SEED = int(os.getenv("DB_SIMULATED_SEED", "0"))
+
 PLAYER_ATTRS = [
     "level", "experience", "strength", "agility", "vitality",
     "intelligence", "dexterity", "luck", "stat_points", "class_name",
@@ -0,0 +1,228 @@
+"""
+Leitura de frames com tamanho (FRAME_HEADER + corpo) direto de um buffer reutilizável.
+
+FrameDecoder só separa frames; FramedConnection é o asyncio.Protocol das conexões de
+jogo (servidor e cliente): a cada data_received decodifica todos os frames completos e
+entrega um lote de pacotes ao consumidor. Para quem escreve, expõe a mesma interface
+do StreamWriter (write/drain/close/wait_closed/get_extra_info/transport).
+"""
+import asyncio
+from collections import deque
+
+from shared.logger import get_logger
+from shared.protocol import FRAME_HEADER, FRAME_HEADER_SIZE, decode_message, encode_message, peek_packet_type
+
+logger = get_logger(__name__)
+
+# Lotes decodificados e ainda não consumidos antes de pausar a leitura do socket
+MAX_PENDING_BATCHES = 64
+
+class FrameTooLarge(ValueError):
+    pass
+
+class FrameDecoder:
+    """Acumula bytes recebidos e entrega cada frame completo como memoryview."""
+    def __init__(self, max_frame_size: int):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes, on_frame):
+        """Chama on_frame(view) para cada frame completo. A view só vale durante a chamada."""
+        if self.buffer:
+            self.buffer += data
+            consumed = self._parse(self.buffer, on_frame)
+            del self.buffer[:consumed]
+        else:
+            # Caso comum: nada pendente, os frames saem direto dos bytes recebidos
+            consumed = self._parse(data, on_frame)
+            if consumed < len(data):
+                self.buffer += memoryview(data)[consumed:]
+
+    def _parse(self, source, on_frame) -> int:
+        size = len(source)
+        offset = 0
+        with memoryview(source) as view:
+            while size - offset >= FRAME_HEADER_SIZE:
+                (length,) = FRAME_HEADER.unpack_from(source, offset)
+                if length > self.max_frame_size:
+                    raise FrameTooLarge(f"Frame of {length} bytes exceeds the {self.max_frame_size} byte limit")
+                start = offset + FRAME_HEADER_SIZE
+                end = start + length
+                if end > size:
+                    break
+                with view[start:end] as frame:
+                    on_frame(frame)
+                offset = end
+        return offset
+
+class FramedConnection(asyncio.Protocol):
+    def __init__(self, max_frame_size: int, on_connection=None, initial_data: bytes = b''):
+        self.decoder = FrameDecoder(max_frame_size)
+        self.transport = None
+        self._on_connection = on_connection   # coroutine function(connection), lado servidor
+        self._initial_data = initial_data     # bytes já lidos por outro processo (handoff)
+        self._task = None
+        self._batch = None
+        self._batches = deque()               # listas de pacotes
+        self._bytes_received = 0              # bytes desde o último read_batch, com ou sem pacote
+        self._waiter = None
+        self._eof = False
+        self._error = None
+        self._paused_reading = False
+        self._paused_writing = False
+        self._drain_waiters = deque()
+        self._closed = None
+        # admit(pkt_type) -> bool: filtro opcional (rate limit) aplicado antes de decodificar
+        self.admit = None
+
+    # --- asyncio.Protocol ---
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._closed = asyncio.get_running_loop().create_future()
+        if self._initial_data:
+            self.data_received(self._initial_data)
+            self._initial_data = b''
+        if self._on_connection is not None:
+            self._task = asyncio.get_running_loop().create_task(self._on_connection(self))
+
+    def data_received(self, data: bytes):
+        # Conta tudo, inclusive frames incompletos e os descartados por admit (flood)
+        self._bytes_received += len(data)
+        self._batch = []
+        try:
+            self.decoder.feed(data, self._on_frame)
+        except FrameTooLarge as e:
+            self._error = e
+            self.transport.pause_reading()
+        batch, self._batch = self._batch, None
+        if batch:
+            self._batches.append(batch)
+            if len(self._batches) >= MAX_PENDING_BATCHES and not self._paused_reading:
+                self._paused_reading = True
+                self.transport.pause_reading()
+        self._wake()
+
+    def _on_frame(self, frame: memoryview):
+        if self.admit is None:
+            self._batch.append(decode_message(frame))
+            return
+        pkt_type = peek_packet_type(frame)
+        if pkt_type is not None:
+            if self.admit(pkt_type):
+                self._batch.append(decode_message(frame))
+            return
+        # Tipo fora do lugar: só decodificando para saber
+        packet = decode_message(frame)
+        if self.admit(packet.get('type') if isinstance(packet, dict) else None):
+            self._batch.append(packet)
+
+    def eof_received(self):
+        self._eof = True
+        self._wake()
+        return False
+
+    def connection_lost(self, exc):
+        self._eof = True
+        self._wake()
+        if not self._closed.done():
+            self._closed.set_result(None)
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ConnectionResetError('Connection lost'))
+
+    def pause_writing(self):
+        self._paused_writing = True
+
+    def resume_writing(self):
+        self._paused_writing = False
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    # --- Leitura ---
+
+    async def read_batch(self) -> tuple[list, int] | None:
+        """
+        Próximo lote (pacotes, bytes recebidos desde a leitura anterior); None quando a
+        conexão fechou. Bytes que não viraram pacote entram no lote seguinte (ou num lote
+        vazio no fim da conexão).
+        """
+        while not self._batches:
+            if self._error is not None:
+                raise self._error
+            if self._eof:
+                if self._bytes_received:
+                    return [], self._take_bytes_received()
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        packets = self._batches.popleft()
+        if self._paused_reading and len(self._batches) < MAX_PENDING_BATCHES // 2:
+            self._paused_reading = False
+            self.transport.resume_reading()
+        return packets, self._take_bytes_received()
+
+    def _take_bytes_received(self) -> int:
+        size, self._bytes_received = self._bytes_received, 0
+        return size
+
+    def unread(self, packets: list):
+        """Devolve pacotes ainda não tratados para o início da fila."""
+        if packets:
+            self._batches.appendleft(packets)
+
+    def take_unread_bytes(self) -> bytes:
+        """Tudo que chegou e não foi consumido, de volta no formato de fio (handoff do socket)."""
+        pending = [encode_message(packet) for packets in self._batches for packet in packets]
+        self._batches.clear()
+        pending.append(bytes(self.decoder.buffer))
+        self.decoder.buffer.clear()
+        return b''.join(pending)
+
+    # --- Escrita (interface do StreamWriter) ---
+
+    def write(self, data: bytes):
+        self.transport.write(data)
+
+    async def drain(self):
+        if self.transport.is_closing():
+            # Mesmo comportamento do StreamWriter: deixa o connection_lost rodar e avisa
+            await asyncio.sleep(0)
+            raise ConnectionResetError('Connection lost')
+        if not self._paused_writing:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await asyncio.shield(self._closed)
+
+    def get_extra_info(self, name, default=None):
+        return self.transport.get_extra_info(name, default)
+
+async def open_framed_connection(host: str, port: int, max_frame_size: int) -> FramedConnection:
+    loop = asyncio.get_running_loop()
+    _, connection = await loop.create_connection(lambda: FramedConnection(max_frame_size), host, port)
+    return connection
+
+async def start_framed_server(handler, host: str, port: int, max_frame_size: int, **kwargs) -> asyncio.AbstractServer:
+    """Como asyncio.start_server, mas handler(connection) recebe uma FramedConnection."""
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: FramedConnection(max_frame_size, on_connection=handler), host, port, **kwargs)
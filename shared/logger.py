@@ -1,23 +1,150 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
+import time
 
-def get_logger(name: str, level=logging.DEBUG):
+from shared.constants import LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_SIZE, LOG_HOT_RATE, LOG_HOT_BURST
+
+_FORMATTER = logging.Formatter('[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s')
+
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_listener = None
+_listener_lock = threading.Lock()
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloqueia o chamador: se a fila estiver cheia
+    o registro é descartado e contabilizado em `dropped`.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_queue_handler = NonBlockingQueueHandler(_log_queue)
+
+def _parse_level(value, default=logging.DEBUG) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    return level if isinstance(level, int) else default
+
+def _parse_module_levels(spec: str) -> dict[str, int]:
+    """'server.systems=INFO,shared.protocol=ERROR' -> {'server.systems': 20, 'shared.protocol': 40}"""
+    levels = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        module, level = item.split('=', 1)
+        levels[module.strip()] = _parse_level(level)
+    return levels
+
+_DEFAULT_LEVEL = _parse_level(LOG_LEVEL)
+_MODULE_LEVELS = _parse_module_levels(LOG_LEVELS)
+
+def resolve_level(name: str) -> int:
+    """Retorna o nível configurado para o módulo, usando o prefixo mais específico de LOG_LEVELS."""
+    best_match = None
+    for module in _MODULE_LEVELS:
+        if name == module or name.startswith(module + '.'):
+            if best_match is None or len(module) > len(best_match):
+                best_match = module
+    return _MODULE_LEVELS[best_match] if best_match else _DEFAULT_LEVEL
+
+def _ensure_listener():
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(_FORMATTER)
+            _listener = logging.handlers.QueueListener(_log_queue, console_handler)
+            _listener.start()
+            atexit.register(stop_logging)
+
+def stop_logging():
+    """Esvazia a fila e encerra a thread de escrita."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            if _queue_handler.dropped:
+                logging.getLogger(__name__).warning(
+                    f"{_queue_handler.dropped} log records were dropped because the log queue was full."
+                )
+
+def get_logger(name: str, level=None):
     """
     Returns a configured logger.
-    
+
     name: module name (e.g., 'server.network', 'client.main')
-    log_file: optional path to a file. If None, defaults to <LOG_DIR>/<name>.log
-    level: logging level
+    level: logging level. If None, uses LOG_LEVELS/LOG_LEVEL from the environment.
+
+    Records are pushed to a queue and written to stderr by a background thread,
+    so logging never blocks the event loop.
     """
     logger = logging.getLogger(name)
 
     # Avoid adding multiple handlers if logger is already configured
     if not logger.handlers:
-        logger.setLevel(level)
-        formatter = logging.Formatter('[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s')
-
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
+        logger.setLevel(resolve_level(name) if level is None else level)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+        _ensure_listener()
 
     return logger
+
+class RateLimitedLogger:
+    """
+    Logger para call sites quentes (dano de combate, chat, conexões).
+    Cada instância é um token bucket: no máximo `rate` mensagens por segundo
+    (com rajadas de até `burst`). As mensagens descartadas são resumidas na
+    próxima mensagem emitida. Use formatação com argumentos (%s) para que o
+    custo de formatação só seja pago quando a mensagem for realmente emitida.
+    """
+    def __init__(self, logger: logging.Logger, rate: float = LOG_HOT_RATE, burst: int = LOG_HOT_BURST):
+        self.logger = logger
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self.suppressed = 0
+
+    def _allow(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.suppressed += 1
+        return False
+
+    def log(self, level: int, msg: str, *args):
+        if not self.logger.isEnabledFor(level) or not self._allow():
+            return
+        if self.suppressed:
+            msg = f"{msg} ({self.suppressed} similar messages suppressed)"
+            self.suppressed = 0
+        self.logger.log(level, msg, *args)
+
+    def debug(self, msg: str, *args):
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args):
+        self.log(logging.INFO, msg, *args)
+
+    def warning(self, msg: str, *args):
+        self.log(logging.WARNING, msg, *args)
+
+def get_rate_limited_logger(name: str, rate: float = LOG_HOT_RATE, burst: int = LOG_HOT_BURST) -> RateLimitedLogger:
+    return RateLimitedLogger(get_logger(name), rate, burst)
@@ -1,6 +1,11 @@
 import json
+import struct
 from shared.logger import get_logger
 
+# Formato de fio: cada mensagem é FRAME_HEADER (tamanho do corpo, u32 little-endian) + corpo JSON
+FRAME_HEADER = struct.Struct('<I')
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
 PACKET_AUTH_SUCCESS = "AUTH_SUCCESS"
 PACKET_AUTH_FAIL = "AUTH_FAIL"
 PACKET_CHAT_MESSAGE = "CHAT_MESSAGE"
@@ -10,12 +15,15 @@ PACKET_SYSTEM_MESSAGE = "SYSTEM_MESSAGE"
 PACKET_AUTH = "AUTH"
 PACKET_REGISTER = "REGISTER"
 PACKET_MOVE = "MOVE"
+PACKET_MOVE_ACK = "MOVE_ACK"
 PACKET_ITEM_USE = "ITEM_USE"
 PACKET_POSITION_UPDATE = "POS_UPDATE"
 PACKET_WORLD_STATE = "WORLD_STATE"
 PACKET_ENTITY_REMOVE = "ENTITY_REMOVE"
 PACKET_ENTITY_NEW = "ENTITY_NEW"
 PACKET_ENTITY_UPDATE = "ENTITY_UPDATE"
+# Entradas e saídas de AOI de um tick: {"enter": [entidade serializada...], "leave": [entity_id...]}
+PACKET_ENTITY_BATCH = "ENTITY_BATCH"
 PACKET_MAP_DATA = "MAP_DATA"
 PACKET_HEALTH_UPDATE = 'HEALTH_UPDATE'
 PACKET_DAMAGE = "DAMAGE"
@@ -23,21 +31,43 @@ PACKET_EVOLVE = "EVOLVE"
 
 logger = get_logger(__name__)
 
-def encode_message(data) -> bytes:
+def encode_payload(data) -> bytes:
+    """Só o corpo JSON, sem o header (canais internos que já têm o próprio framing)."""
     try:
         if isinstance(data, dict):
-            json_string = json.dumps(data) + '\n' 
-        else:
-            json_string = str(data) + '\n'
-            
-        return json_string.encode('utf-8')
+            return json.dumps(data).encode('utf-8')
+        return str(data).encode('utf-8')
     except Exception as e:
         logger.error(f"Error encoding message: {e}")
         return b''
 
-def decode_message(data: bytes):
+def encode_message(data) -> bytes:
+    payload = encode_payload(data)
+    if not payload:
+        return b''
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+_TYPE_PREFIX = b'{"type": "'
+_TYPE_PREFIX_SIZE = len(_TYPE_PREFIX)
+_MAX_TYPE_SIZE = 32
+
+def peek_packet_type(frame) -> str | None:
+    """Tipo do pacote sem decodificar o JSON, quando ele vem primeiro (como em encode_message)."""
+    if frame[:_TYPE_PREFIX_SIZE] != _TYPE_PREFIX:
+        return None
+    head = bytes(frame[_TYPE_PREFIX_SIZE:_TYPE_PREFIX_SIZE + _MAX_TYPE_SIZE])
+    end = head.find(b'"')
+    if end <= 0 or b'\\' in head[:end]:
+        return None
+    try:
+        return head[:end].decode('ascii')
+    except UnicodeDecodeError:
+        return None
+
+def decode_message(data):
+    """Decodifica o corpo de um frame (bytes ou memoryview, sem cópia intermediária)."""
     try:
-        decoded_string = data.decode('utf-8')
+        decoded_string = str(data, 'utf-8')
         if not decoded_string:
             return None
 
@@ -46,5 +76,4 @@ def decode_message(data: bytes):
         return decoded_string
     except Exception as e:
         logger.error(f"Error decoding message: {e}")
-        return data
-
+        return bytes(data)
@@ -0,0 +1,296 @@
+"""
+Microbenchmarks dos hot paths do engine, sem rede e sem banco de dados.
+
+Uso:
+    python -m tools.bench_engine --densities 50 200 1000 --output bench.json
+
+Para cada densidade é criado um mundo sintético (seed fixa) com jogadores e
+monstros espalhados numa área fixa. O resultado é um JSON com o custo por
+operação de cada hot path, para comparar entre commits.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from server.game_engine.map_instance import MapInstance
+from server.game_engine.serialization import packet_builder
+from server.game_engine.components.aggro import AggroComponent
+from server.game_engine.components.ai import AIComponent
+from server.game_engine.components.collision import CollisionComponent
+from server.game_engine.components.health import HealthComponent
+from server.game_engine.components.network import NetworkComponent
+from server.game_engine.components.player_class import ClassComponent
+from server.game_engine.components.position import PositionComponent
+from server.game_engine.components.stats import StatsComponent
+from server.game_engine.components.type import TypeComponent
+from server.game_engine.components.viewport import ViewportComponent
+from server.game_engine.collision.shapes import BoxCollider
+from server.utils.map_loader import load_map_metadata
+from shared.constants import A_O_I_RANGE, DEFAULT_MAP_NAME, DATA_PAYLOAD_SIZE
+from shared.framing import FrameDecoder
+from shared.protocol import encode_message, decode_message, FRAME_HEADER_SIZE, PACKET_POSITION_UPDATE, PACKET_ENTITY_NEW
+
+class NullWriter:
+    """Substitui o StreamWriter: só contabiliza os bytes 'enviados'."""
+    def __init__(self, name: str):
+        self.name = name
+        self.bytes_written = 0
+
+    def write(self, data: bytes):
+        self.bytes_written += len(data)
+
+    def get_extra_info(self, key, default=None):
+        return (self.name, 0) if key == 'peername' else default
+
+class NullNetworkManager:
+    """Implementa a interface de rede usada pelo engine, codificando os pacotes como o servidor real."""
+    def __init__(self):
+        self.clients = {}
+
+    async def send_packet(self, writer, packet: dict):
+        writer.write(encode_message(packet))
+
+    def get_user_by_writer(self, writer):
+        return self.clients.get(writer)
+
+    async def broadcast_system_message(self, message: str, exclude_writer=None):
+        pass
+
+    async def send_packet_to_many(self, writers, packet: dict):
+        encoded_message = encode_message(packet)
+        for writer in writers:
+            writer.write(encoded_message)
+
+    async def broadcast_game_update(self, packet: dict, exclude_writer=None):
+        pass
+
+def build_world(instance: MapInstance, entity_count: int, area: float, seed: int, player_ratio: float) -> list[int]:
+    rng = random.Random(seed)
+    world = instance.world
+    entity_ids = []
+    for index in range(entity_count):
+        entity_id = world.create_entity()
+        x = rng.uniform(1.0, area)
+        y = rng.uniform(1.0, area)
+        is_player = rng.random() < player_ratio
+
+        world.add_component(entity_id, PositionComponent(x, y))
+        world.add_component(entity_id, CollisionComponent(BoxCollider(0.8, 0.8)))
+        world.add_component(entity_id, StatsComponent(level=rng.randint(1, 10), strength=5, vitality=3))
+        world.add_component(entity_id, HealthComponent(max_health=100))
+
+        if is_player:
+            username = f"bench_{index}"
+            writer = NullWriter(username)
+            world.add_component(entity_id, TypeComponent('player'))
+            world.add_component(entity_id, NetworkComponent(writer, username))
+            world.add_component(entity_id, ViewportComponent(radius=A_O_I_RANGE))
+            world.add_component(entity_id, ClassComponent('Novice'))
+            instance.player_entity_map[username] = entity_id
+            instance.network_manager.clients[writer] = username
+        else:
+            world.add_component(entity_id, TypeComponent('monster'))
+            world.add_component(entity_id, NetworkComponent(None, "Green_Slime"))
+        entity_ids.append(entity_id)
+    return entity_ids
+
+def time_op(func, iterations: int, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations)
+    return {
+        "iterations": iterations,
+        "repeats": repeats,
+        "ns_per_op_min": min(samples) * 1e9,
+        "ns_per_op_median": statistics.median(samples) * 1e9,
+    }
+
+async def time_async_op(func, iterations: int, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await func()
+        samples.append((time.perf_counter() - start) / iterations)
+    return {
+        "iterations": iterations,
+        "repeats": repeats,
+        "ns_per_op_min": min(samples) * 1e9,
+        "ns_per_op_median": statistics.median(samples) * 1e9,
+    }
+
+async def bench_density(entity_count: int, args) -> list[dict]:
+    instance = MapInstance(DEFAULT_MAP_NAME, load_map_metadata(DEFAULT_MAP_NAME), None, NullNetworkManager(), load_from_file=False)
+    entity_ids = build_world(instance, entity_count, args.area, args.seed, args.player_ratio)
+    world = instance.world
+    game_map = instance.map
+    rng = random.Random(args.seed)
+    iterations = args.iterations
+    results = []
+
+    def record(name: str, timing: dict):
+        results.append({"benchmark": name, "entities": entity_count, **timing})
+
+    # --- MapInstance.send_aoi_update ---
+    pick = [rng.choice(entity_ids) for _ in range(1024)]
+    counter = [0]
+    async def aoi_update():
+        entity_id = pick[counter[0] & 1023]
+        counter[0] += 1
+        pos = world.get_component(entity_id, PositionComponent)
+        await instance.send_aoi_update(entity_id, {
+            "type": PACKET_POSITION_UPDATE, "entity_id": entity_id, "x": pos.x, "y": pos.y, "asset_type": "bench"
+        })
+    # aquecimento: todas acabaram de entrar no índice, preenche last_sent_entities/observers
+    instance.update_visibility()
+    await instance.flush_visibility()
+    record("MapInstance.send_aoi_update", await time_async_op(aoi_update, max(1, iterations // 10), args.repeats))
+
+    # --- MapInstance.update_visibility: uma entidade trocando de célula por tick ---
+    cell_size = world.spatial_index.cell_size
+    def update_visibility():
+        entity_id = pick[counter[0] & 1023]
+        counter[0] += 1
+        pos = world.get_component(entity_id, PositionComponent)
+        world.move_entity(entity_id, pos.x + (cell_size if counter[0] & 1 else -cell_size), pos.y)
+        instance.update_visibility()
+    record("MapInstance.update_visibility", time_op(update_visibility, max(1, iterations // 10), args.repeats))
+    for viewport in (world.get_component(player_id, ViewportComponent) for player_id in instance.player_entity_map.values()):
+        viewport.pending_enters.clear()
+        viewport.pending_leaves.clear()
+
+    # --- CollisionSystem.process_movement ---
+    moves = []
+    for _ in range(1024):
+        entity_id = rng.choice(entity_ids)
+        pos = world.get_component(entity_id, PositionComponent)
+        moves.append((entity_id, pos, pos.x + rng.uniform(-0.1, 0.1), pos.y + rng.uniform(-0.1, 0.1)))
+    def process_movement():
+        entity_id, pos, tx, ty = moves[counter[0] & 1023]
+        counter[0] += 1
+        instance.collision_system.process_movement(entity_id, pos, tx, ty, world)
+    record("CollisionSystem.process_movement", time_op(process_movement, iterations, args.repeats))
+
+    # --- PacketBuilder.serialize_entity ---
+    def serialize_entity():
+        entity_id = pick[counter[0] & 1023]
+        counter[0] += 1
+        packet_builder.serialize_entity(world, entity_id)
+    record("PacketBuilder.serialize_entity", time_op(serialize_entity, iterations, args.repeats))
+
+    # --- encode_message / decode_message ---
+    entity_packet = {"type": PACKET_ENTITY_NEW, "is_local_player": False, **packet_builder.serialize_entity(world, entity_ids[0])}
+    position_packet = {"type": PACKET_POSITION_UPDATE, "entity_id": 1, "x": 12.345678, "y": 45.678901, "asset_type": "bench_1"}
+    encoded_entity = encode_message(entity_packet)
+    encoded_position = encode_message(position_packet)
+    record("encode_message[ENTITY_NEW]", time_op(lambda: encode_message(entity_packet), iterations, args.repeats))
+    record("encode_message[POS_UPDATE]", time_op(lambda: encode_message(position_packet), iterations, args.repeats))
+    entity_body = memoryview(encoded_entity)[FRAME_HEADER_SIZE:]
+    position_body = memoryview(encoded_position)[FRAME_HEADER_SIZE:]
+    record("decode_message[ENTITY_NEW]", time_op(lambda: decode_message(entity_body), iterations, args.repeats))
+    record("decode_message[POS_UPDATE]", time_op(lambda: decode_message(position_body), iterations, args.repeats))
+
+    # --- FrameDecoder: um data_received com 32 POS_UPDATE inteiros ---
+    decoder = FrameDecoder(DATA_PAYLOAD_SIZE)
+    position_burst = encoded_position * 32
+    def decode_burst():
+        packets = []
+        decoder.feed(position_burst, lambda frame: packets.append(decode_message(frame)))
+    record("FrameDecoder.feed[32 x POS_UPDATE]", time_op(decode_burst, iterations, args.repeats))
+
+    # --- World.get_entities_with_components (iteração completa) ---
+    query = (PositionComponent, CollisionComponent)
+    def entities_with_components():
+        for _ in world.get_entities_with_components(query):
+            pass
+    record("World.get_entities_with_components", time_op(entities_with_components, max(1, iterations // 100), args.repeats))
+
+    # --- GameMap.is_walkable ---
+    points = [(rng.uniform(-1, game_map.MAP_WIDTH + 1), rng.uniform(-1, game_map.MAP_HEIGHT + 1)) for _ in range(1024)]
+    def is_walkable():
+        x, y = points[counter[0] & 1023]
+        counter[0] += 1
+        game_map.is_walkable(x, y)
+    record("GameMap.is_walkable", time_op(is_walkable, iterations, args.repeats))
+
+    # --- Pathfinder: busca A* completa (sem cache) entre pontos caminháveis ---
+    pathfinder = instance.pathfinder
+    walkable_points = [point for point in points if game_map.is_walkable(*point)]
+    def find_path():
+        start = walkable_points[counter[0] % len(walkable_points)]
+        goal = walkable_points[(counter[0] + 1) % len(walkable_points)]
+        counter[0] += 1
+        pathfinder.cache.clear()
+        while pathfinder.find_path(*start, *goal) is None:
+            pathfinder.run()
+    record("Pathfinder.find_path[cold]", time_op(find_path, max(1, iterations // 100), args.repeats))
+
+    # --- AggroSystem.run: um tick de percepção (uma fatia dos monstros) ---
+    for entity_id in entity_ids:
+        if entity_id not in instance.player_entity_map.values():
+            pos = world.get_component(entity_id, PositionComponent)
+            world.add_component(entity_id, AIComponent('wandering', home_x=pos.x, home_y=pos.y))
+            world.add_component(entity_id, AggroComponent())
+    record("AggroSystem.run", time_op(instance.aggro_system.run, max(1, iterations // 10), args.repeats))
+
+    # --- AISystem.run: um tick de IA (só os monstros agendados para este tick) ---
+    record("AISystem.run", await time_async_op(instance.ai_system.run, max(1, iterations // 10), args.repeats))
+
+    return results
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+async def run_benchmarks(args) -> dict:
+    results = []
+    for density in args.densities:
+        results.extend(await bench_density(density, args))
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "area": args.area,
+            "player_ratio": args.player_ratio,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Engine hot path microbenchmarks (no network, no DB).")
+    parser.add_argument("--densities", type=int, nargs="+", default=[50, 200, 1000], help="Entity counts to benchmark.")
+    parser.add_argument("--area", type=float, default=60.0, help="Side of the square area entities are spread over.")
+    parser.add_argument("--player-ratio", type=float, default=0.3, help="Fraction of entities that are players.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)  # o mapa padrão é gerado com o módulo random global
+    report = asyncio.run(run_benchmarks(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
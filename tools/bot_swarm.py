@@ -0,0 +1,272 @@
+"""
+Gerador de carga headless: N bots que reutilizam o GameClient e o protocolo
+compartilhado (sem pygame).
+
+Uso (servidor local + Postgres do docker-compose, ou DB_BACKEND=memory no servidor):
+    DB_BACKEND=memory python -m server.main &
+    python -m tools.bot_swarm --bots 100 --ramp-up 20 --duration 60 --output swarm.json
+
+Cada bot registra (ou faz login, se já existir), anda com a mesma cadência de
+MOVE do cliente real, ataca monstros próximos e envia mensagens de chat.
+Os MOVEs levam seq e o bot prevê o próprio movimento como o cliente real.
+Ao final é emitido um relatório JSON com latência de login, tempo entre cada
+MOVE e o MOVE_ACK que o confirma, e pacotes por segundo.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import deque
+
+from client.network.client import GameClient
+from shared.constants import IP, PORT, DATA_PAYLOAD_SIZE, TICK_INTERVAL, PLAYER_MOVE_SPEED, ATTACK_RANGE
+from shared.logger import get_logger
+from shared.protocol import (
+    PACKET_AUTH,
+    PACKET_AUTH_SUCCESS,
+    PACKET_REGISTER,
+    PACKET_REGISTER_SUCCESS,
+    PACKET_REGISTER_FAIL,
+    PACKET_MOVE,
+    PACKET_MOVE_ACK,
+    PACKET_DAMAGE,
+    PACKET_CHAT_MESSAGE,
+    PACKET_POSITION_UPDATE,
+    PACKET_ENTITY_NEW,
+    PACKET_ENTITY_UPDATE,
+    PACKET_ENTITY_REMOVE,
+    PACKET_ENTITY_BATCH,
+    PACKET_HEALTH_UPDATE,
+    PACKET_MAP_DATA,
+)
+
+logger = get_logger(__name__)
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+CHAT_LINES = ["hello", "anyone here?", "lfg slimes", "gg", "wolves near the den", "brb"]
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": (sum(values) / len(values)) * 1000 if values else None,
+        "p50_ms": percentile(values, 50) * 1000 if values else None,
+        "p95_ms": percentile(values, 95) * 1000 if values else None,
+        "p99_ms": percentile(values, 99) * 1000 if values else None,
+        "max_ms": max(values) * 1000 if values else None,
+    }
+
+class SwarmStats:
+    def __init__(self):
+        self.login_latencies = []
+        self.move_rtts = []
+        self.login_failures = 0
+        self.packets_out = 0
+        self.packets_in = 0
+        self.packets_in_by_type = {}
+        self.disconnects = 0
+
+class Bot:
+    def __init__(self, index: int, args, stats: SwarmStats):
+        self.args = args
+        self.stats = stats
+        self.username = f"{args.prefix}{index}"
+        self.password = args.password
+        self.client = GameClient(args.host, args.port, DATA_PAYLOAD_SIZE)
+        self.client.username = self.username
+        self.rng = random.Random(args.seed + index)
+        self.pending_moves = deque()  # (seq, instante) de MOVEs ainda sem MOVE_ACK
+        self.last_attack = 0.0
+        self.next_chat = time.monotonic() + self.rng.uniform(*args.chat_interval)
+
+    async def send(self, packet: dict):
+        self.stats.packets_out += 1
+        await self.client.send_message(packet)
+
+    async def login(self) -> bool:
+        start = time.perf_counter()
+        await self.client.connect()
+        if not self.client.connection:
+            self.stats.login_failures += 1
+            return False
+
+        for auth_type in (PACKET_REGISTER, PACKET_AUTH):
+            await self.send({"type": auth_type, "username": self.username, "password": self.password})
+            response = await self.client.receive_message()
+            if not isinstance(response, dict):
+                break
+            if response.get("type") in (PACKET_AUTH_SUCCESS, PACKET_REGISTER_SUCCESS):
+                self.stats.login_latencies.append(time.perf_counter() - start)
+                return True
+            if response.get("type") != PACKET_REGISTER_FAIL:
+                break
+
+        self.stats.login_failures += 1
+        self.client.close()
+        return False
+
+    async def receive_loop(self):
+        world = self.client.world_state
+        while not self.client.is_closed:
+            packet = await self.client.receive_message()
+            if packet is None:
+                break
+            if not isinstance(packet, dict):
+                continue
+
+            ptype = packet.get("type")
+            self.stats.packets_in += 1
+            self.stats.packets_in_by_type[ptype] = self.stats.packets_in_by_type.get(ptype, 0) + 1
+
+            if ptype in (PACKET_ENTITY_NEW, PACKET_ENTITY_UPDATE, PACKET_HEALTH_UPDATE):
+                world.update_entity(packet)
+                if ptype == PACKET_ENTITY_NEW and packet.get("is_local_player"):
+                    world.set_local_player(packet["entity_id"])
+            elif ptype == PACKET_ENTITY_REMOVE:
+                world.remove_entity(packet.get("entity_id"))
+            elif ptype == PACKET_ENTITY_BATCH:
+                world.apply_entity_batch(packet)
+            elif ptype == PACKET_POSITION_UPDATE:
+                world.update_entity(packet)
+            elif ptype == PACKET_MOVE_ACK:
+                world.reconcile(packet)
+                # Um ack confirma todos os MOVEs até o seq dele
+                now = time.perf_counter()
+                seq = packet.get("seq", 0)
+                while self.pending_moves and self.pending_moves[0][0] <= seq:
+                    self.stats.move_rtts.append(now - self.pending_moves.popleft()[1])
+            elif ptype == PACKET_MAP_DATA:
+                world.set_map(packet)
+                self.pending_moves.clear()
+        self.stats.disconnects += 1
+
+    def _nearest_monster(self, player: dict) -> int | None:
+        best_id, best_dist = None, ATTACK_RANGE
+        for ent in self.client.world_state.get_all_entities():
+            if ent["id"] == player["id"] or ent.get("x") is None:
+                continue
+            if ent.get("asset_type") and ent["asset_type"].startswith(self.args.prefix):
+                continue
+            dist = math.hypot(ent["x"] - player["x"], ent["y"] - player["y"])
+            if dist <= best_dist:
+                best_id, best_dist = ent["id"], dist
+        return best_id
+
+    async def behavior_loop(self, deadline: float):
+        direction = None
+        walk_until = 0.0
+        while not self.client.is_closed and time.monotonic() < deadline:
+            now = time.monotonic()
+            player = self.client.world_state.get_local_player()
+
+            if player is not None:
+                if now >= walk_until:
+                    # Alterna entre andar e ficar parado, como um jogador humano
+                    if direction is None and self.rng.random() < 0.7:
+                        direction = self.rng.choice(DIRECTIONS)
+                        walk_until = now + self.rng.uniform(0.5, 2.0)
+                    else:
+                        direction = None
+                        walk_until = now + self.rng.uniform(0.2, 1.0)
+
+                if direction is not None:
+                    speed = player.get("movement_speed") or PLAYER_MOVE_SPEED
+                    step = speed * TICK_INTERVAL / math.hypot(*direction)
+                    move = self.client.world_state.predict_move({"type": PACKET_MOVE, "dx": direction[0] * step, "dy": direction[1] * step})
+                    self.pending_moves.append((move["seq"], time.perf_counter()))
+                    await self.send(move)
+
+                if now - self.last_attack >= self.args.attack_interval:
+                    target_id = self._nearest_monster(player)
+                    if target_id is not None:
+                        self.last_attack = now
+                        await self.send({"type": PACKET_DAMAGE, "target_entity_id": target_id})
+
+                if now >= self.next_chat:
+                    self.next_chat = now + self.rng.uniform(*self.args.chat_interval)
+                    await self.send({"type": PACKET_CHAT_MESSAGE, "sender": self.username, "content": self.rng.choice(CHAT_LINES)})
+
+            await asyncio.sleep(TICK_INTERVAL)
+
+    async def run(self, deadline: float):
+        if not await self.login():
+            return
+        receive_task = asyncio.create_task(self.receive_loop())
+        try:
+            await self.behavior_loop(deadline)
+        finally:
+            self.client.close()
+            receive_task.cancel()
+            try:
+                await receive_task
+            except asyncio.CancelledError:
+                pass
+
+async def run_swarm(args) -> dict:
+    stats = SwarmStats()
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    delay = args.ramp_up / args.bots if args.bots else 0
+
+    tasks = []
+    for index in range(args.bots):
+        bot = Bot(index, args, stats)
+        tasks.append(asyncio.create_task(bot.run(deadline)))
+        if delay:
+            await asyncio.sleep(delay)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.monotonic() - start
+
+    return {
+        "bots": args.bots,
+        "ramp_up_seconds": args.ramp_up,
+        "duration_seconds": round(elapsed, 3),
+        "logged_in": len(stats.login_latencies),
+        "login_failures": stats.login_failures,
+        "login_latency": summarize(stats.login_latencies),
+        "move_ack_rtt": summarize(stats.move_rtts),
+        "packets_out": stats.packets_out,
+        "packets_in": stats.packets_in,
+        "packets_out_per_second": stats.packets_out / elapsed if elapsed else 0,
+        "packets_in_per_second": stats.packets_in / elapsed if elapsed else 0,
+        "packets_in_by_type": stats.packets_in_by_type,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bot swarm load generator.")
+    parser.add_argument("--host", default=IP)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--bots", type=int, default=10, help="Number of bots.")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds to spread bot logins over.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run after ramp-up.")
+    parser.add_argument("--prefix", default="bot_", help="Username prefix for bots.")
+    parser.add_argument("--password", default="bot_password")
+    parser.add_argument("--attack-interval", type=float, default=1.0, help="Minimum seconds between attacks.")
+    parser.add_argument("--chat-interval", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_swarm(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        logger.info(f"Swarm report written to {args.output}")
+    else:
+        sys.stdout.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Compara implementações de event loop do servidor com o mesmo bot swarm.
+
+Para cada loop em --loops sobe um servidor (DB_BACKEND=memory, EVENT_LOOP=<loop>),
+roda tools.bot_swarm contra ele e mede o tempo de CPU do processo do servidor.
+O relatório traz latências do swarm e CPU do servidor por pacote trocado.
+
+Uso:
+    python -m tools.loop_compare --loops asyncio uvloop --bots 100 --duration 30 --output loops.json
+
+Os bots rodam sempre no loop padrão deste processo, para só o servidor variar.
+Loops que não estão instalados aqui (ex.: uvloop) são pulados e listados em "skipped":
+o servidor cairia no asyncio e o relatório compararia asyncio com ele mesmo.
+Linux: o tempo de CPU vem de /proc/<pid>/stat.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from shared.logger import get_logger
+from tools.bot_swarm import parse_args as parse_swarm_args, run_swarm
+
+logger = get_logger(__name__)
+
+SERVER_READY_TIMEOUT = 30.0
+SERVER_STOP_TIMEOUT = 10.0
+
+def process_cpu_seconds(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime e stime são os campos 14 e 15 (contando o pid como 1)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def wait_for_port(host: str, port: int, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def resolve_loop(name: str) -> str | None:
+    """Loop que o servidor vai usar com EVENT_LOOP=`name` (ver install_event_loop); None se não está instalado."""
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    if name == "auto":
+        return "uvloop" if has_uvloop else "asyncio"
+    if name == "uvloop":
+        return "uvloop" if has_uvloop else None
+    return name
+
+def start_server(loop_name: str, args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "EVENT_LOOP": loop_name,
+        "DB_BACKEND": "memory",
+        "METRICS_ENABLED": "0",
+        "PORT": str(args.port),
+        "LOG_LEVEL": args.server_log_level,
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "server.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Sem herdar o SIGINT ignorado de shells em background
+        preexec_fn=lambda: signal.signal(signal.SIGINT, signal.default_int_handler),
+    )
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(SERVER_STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.terminate()
+        process.wait()
+
+def run_one(loop_name: str, args) -> dict:
+    process = start_server(loop_name, args)
+    try:
+        if not wait_for_port(args.host, args.port, SERVER_READY_TIMEOUT):
+            raise RuntimeError(f"Server with EVENT_LOOP={loop_name} did not start listening on {args.host}:{args.port}")
+        # Conta só o trabalho da carga, não a inicialização
+        cpu_before = process_cpu_seconds(process.pid)
+        swarm_args = parse_swarm_args([
+            "--host", args.host, "--port", str(args.port),
+            "--bots", str(args.bots), "--ramp-up", str(args.ramp_up),
+            "--duration", str(args.duration), "--seed", str(args.seed),
+        ])
+        report = asyncio.run(run_swarm(swarm_args))
+        cpu_after = process_cpu_seconds(process.pid)
+    finally:
+        stop_server(process)
+
+    cpu_seconds = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    packets = report["packets_in"] + report["packets_out"]
+    return {
+        "event_loop": loop_name,
+        "logged_in": report["logged_in"],
+        "login_latency": report["login_latency"],
+        "move_ack_rtt": report["move_ack_rtt"],
+        "packets_in_per_second": report["packets_in_per_second"],
+        "packets_out_per_second": report["packets_out_per_second"],
+        "server_cpu_seconds": cpu_seconds,
+        "server_cpu_us_per_packet": cpu_seconds / packets * 1e6 if cpu_seconds is not None and packets else None,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare server event loop implementations under the bot swarm.")
+    parser.add_argument("--loops", nargs="+", default=["asyncio", "uvloop"], help="EVENT_LOOP values to compare.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=18080, help="Port for the temporary servers.")
+    parser.add_argument("--bots", type=int, default=50)
+    parser.add_argument("--ramp-up", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--server-log-level", default="WARNING")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs, skipped = [], []
+    for requested in args.loops:
+        loop_name = resolve_loop(requested)
+        if loop_name is None:
+            logger.warning(f"EVENT_LOOP={requested} is not installed here; skipping that run.")
+            skipped.append(requested)
+            continue
+        logger.info(f"Running the bot swarm against EVENT_LOOP={loop_name}...")
+        runs.append(run_one(loop_name, args))
+
+    report = {"bots": args.bots, "duration_seconds": args.duration, "runs": runs}
+    if skipped:
+        report["skipped"] = skipped
+    baseline = runs[0].get("server_cpu_us_per_packet") if runs else None
+    if baseline:
+        report["cpu_per_packet_vs_first"] = {
+            run["event_loop"]: run["server_cpu_us_per_packet"] / baseline
+            for run in runs if run["server_cpu_us_per_packet"] is not None
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        logger.info(f"Loop comparison written to {args.output}")
+    else:
+        sys.stdout.write(output + "\n")
+
+if __name__ == "__main__":
+    main()